@@ -26,6 +26,8 @@ try:
     from app.models.base import Base
     from app.models.project import Project
     from app.models.task import Task
+    from app.models.quota_counter import QuotaCounter
+    from app.models.project_deletion import ProjectDeletion
     target_metadata = Base.metadata
     print("✓ Successfully imported models using absolute import")
 except ImportError:
@@ -34,6 +36,8 @@ except ImportError:
         from models.base import Base
         from models.project import Project  
         from models.task import Task
+        from models.quota_counter import QuotaCounter
+        from models.project_deletion import ProjectDeletion
         target_metadata = Base.metadata
         print("✓ Successfully imported models using relative import")
     except ImportError as e:
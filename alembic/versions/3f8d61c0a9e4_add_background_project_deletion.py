@@ -0,0 +1,37 @@
+"""Add background project deletion
+
+Revision ID: 3f8d61c0a9e4
+Revises: 9c4e2a7f1b38
+Create Date: 2026-10-18 18:22:09.640317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8d61c0a9e4'
+down_revision: Union[str, None] = '9c4e2a7f1b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('projects', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_table('project_deletions',
+    sa.Column('project_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(length=30), nullable=False),
+    sa.Column('tasks_total', sa.Integer(), nullable=False),
+    sa.Column('tasks_deleted', sa.Integer(), nullable=False),
+    sa.Column('requested_at', sa.DateTime(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('project_deletions')
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('deleted_at')
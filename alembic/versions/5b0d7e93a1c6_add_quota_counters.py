@@ -0,0 +1,46 @@
+"""Add quota counters
+
+Revision ID: 5b0d7e93a1c6
+Revises: e081c2ccd4a0
+Create Date: 2026-10-18 11:04:27.518902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0d7e93a1c6'
+down_revision: Union[str, None] = 'e081c2ccd4a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'projects',
+        sa.Column('task_count', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.create_table('quota_counters',
+    sa.Column('name', sa.String(length=30), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    # Backfill the counters from the existing rows
+    op.execute(
+        "UPDATE projects SET task_count = "
+        "(SELECT COUNT(*) FROM tasks WHERE tasks.project_id = projects.id)"
+    )
+    op.execute(
+        "INSERT INTO quota_counters (name, value) "
+        "SELECT 'projects', COUNT(*) FROM projects"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('quota_counters')
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('task_count')
@@ -0,0 +1,34 @@
+"""Add task list version index
+
+Revision ID: 9c4e2a7f1b38
+Revises: 5b0d7e93a1c6
+Create Date: 2026-10-18 14:37:52.114290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2a7f1b38'
+down_revision: Union[str, None] = '5b0d7e93a1c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on Postgres
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_project_id_updated_at',
+            'tasks',
+            ['project_id', 'updated_at'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_project_id_updated_at', table_name='tasks', postgresql_concurrently=True)
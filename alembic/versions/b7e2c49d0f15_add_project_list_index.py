@@ -0,0 +1,34 @@
+"""Add project list index
+
+Revision ID: b7e2c49d0f15
+Revises: 3f8d61c0a9e4
+Create Date: 2026-10-18 20:41:03.518274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c49d0f15'
+down_revision: Union[str, None] = '3f8d61c0a9e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on Postgres
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_projects_created_at_id',
+            'projects',
+            ['created_at', 'id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_projects_created_at_id', table_name='projects', postgresql_concurrently=True)
@@ -0,0 +1,43 @@
+"""Match the open deadline index to the model
+
+Revision ID: d4a91f6c2e87
+Revises: b7e2c49d0f15
+Create Date: 2026-10-18 21:05:47.902331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a91f6c2e87'
+down_revision: Union[str, None] = 'b7e2c49d0f15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Dialects that support partial indexes (CREATE INDEX ... WHERE)
+PARTIAL_INDEX_DIALECTS = ('postgresql', 'sqlite')
+
+
+def _open_deadline_columns():
+    for index in sa.inspect(op.get_bind()).get_indexes('tasks'):
+        if index['name'] == 'ix_tasks_open_deadline':
+            return index['column_names']
+    return None
+
+
+def upgrade() -> None:
+    # e081c2ccd4a0 used to build (closed_at, deadline) where partial indexes
+    # are missing, while Task declares (deadline)
+    if op.get_bind().dialect.name in PARTIAL_INDEX_DIALECTS:
+        return
+    if _open_deadline_columns() == ['closed_at', 'deadline']:
+        op.drop_index('ix_tasks_open_deadline', table_name='tasks')
+        op.create_index('ix_tasks_open_deadline', 'tasks', ['deadline'])
+
+
+def downgrade() -> None:
+    # The (deadline) index is what e081c2ccd4a0 builds now as well
+    pass
@@ -0,0 +1,52 @@
+"""Add task query indexes
+
+Revision ID: e081c2ccd4a0
+Revises: cee1330df50f
+Create Date: 2026-10-18 09:12:41.302518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e081c2ccd4a0'
+down_revision: Union[str, None] = 'cee1330df50f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Dialects that support partial indexes (CREATE INDEX ... WHERE)
+PARTIAL_INDEX_DIALECTS = ('postgresql', 'sqlite')
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on Postgres
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_project_id_created_at',
+            'tasks',
+            ['project_id', 'created_at'],
+            postgresql_concurrently=True,
+        )
+        if dialect in PARTIAL_INDEX_DIALECTS:
+            op.create_index(
+                'ix_tasks_open_deadline',
+                'tasks',
+                ['deadline'],
+                postgresql_where=sa.text('closed_at IS NULL'),
+                sqlite_where=sa.text('closed_at IS NULL'),
+                postgresql_concurrently=True,
+            )
+        else:
+            # Without partial indexes it covers every task, as Task declares it
+            op.create_index('ix_tasks_open_deadline', 'tasks', ['deadline'])
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_open_deadline', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_project_id_created_at', table_name='tasks', postgresql_concurrently=True)
@@ -1,13 +1,144 @@
 # api/app.py
-from fastapi import FastAPI
+import json
+import logging
+import os
+import threading
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from starlette.routing import Match
+from api.compression import CompressionMiddleware
 from api.routers import api_router
+from app import metrics
+from app.commands.purge_projects import ProjectPurger
+from app.commands.scheduler import DeadlineScheduler
+from app.db.instrumentation import instrument_engine, track_queries
 from app.db.session import db_session
-from app.models.base import Base
+from app.services.project_service import ProjectService
 
 app = FastAPI(title="ToDoList API")
 app.include_router(api_router, prefix="/api")
 
+# Added first, so it sits innermost and the timings below include compression
+if os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true":
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", 1024)),
+    )
+
+# Optional in-process deadline scheduler; tasks written through this process wake it directly
+deadline_scheduler = DeadlineScheduler()
+
+# Purges the tasks of projects deleted in the background
+project_purger = ProjectPurger()
+project_purge_enabled = os.getenv("PROJECT_PURGE_IN_API", "true").lower() == "true"
+
+# Per-request SQL statistics; nothing is hooked up unless enabled
+if os.getenv("SQL_INSTRUMENTATION", "false").lower() == "true":
+    sql_logger = logging.getLogger("api.sql")
+    if not sql_logger.handlers:
+        sql_logger.addHandler(logging.StreamHandler())
+        sql_logger.setLevel(logging.INFO)
+
+    # The sync engine also serves the in-process deadline scheduler
+    instrument_engine(db_session.engine)
+    for engine in db_session.api_engines.values():
+        if engine is not db_session.engine:
+            instrument_engine(engine)
+
+    @app.middleware("http")
+    async def sql_instrumentation(request: Request, call_next):
+        started = time.perf_counter()
+        with track_queries() as stats:
+            response = await call_next(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = stats.total_time * 1000
+        slowest_ms = stats.slowest_time * 1000
+
+        response.headers["Server-Timing"] = (
+            f'db;dur={db_ms:.2f};desc="{stats.count} queries", '
+            f'db-slowest;dur={slowest_ms:.2f}, '
+            f'total;dur={total_ms:.2f}'
+        )
+        sql_logger.info(json.dumps({
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "queries": stats.count,
+            "db_ms": round(db_ms, 2),
+            "total_ms": round(total_ms, 2),
+            "slowest_ms": round(slowest_ms, 2),
+            "slowest_sql": stats.slowest_statement,
+        }))
+        return response
+
+# Prometheus metrics; labelled by route template so the series stay bounded
+metrics_enabled = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+def _route_template(request: Request) -> str:
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "<unmatched>"
+
+def _pool_labels(name: str) -> metrics.LabelKey:
+    # Pool series only carry a database label when there are replicas
+    return (("database", name),) if db_session.replica_engines else ()
+
+def collect_pool_stats() -> None:
+    for name, engine in db_session.api_engines.items():
+        metrics.collect_pool_stats(engine, _pool_labels(name))
+
+if metrics_enabled:
+    for name, engine in db_session.api_engines.items():
+        metrics.instrument_pool(engine, _pool_labels(name))
+
+    @app.middleware("http")
+    async def request_metrics(request: Request, call_next):
+        labels = (("method", request.method), ("route", _route_template(request)))
+        metrics.registry.inc(metrics.HTTP_IN_FLIGHT, labels)
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            metrics.registry.observe(metrics.HTTP_DURATION, time.perf_counter() - started, labels)
+            metrics.registry.inc(metrics.HTTP_REQUESTS, labels + (("status", str(status)),))
+            metrics.registry.inc(metrics.HTTP_IN_FLIGHT, labels, -1)
+
+    @app.get("/metrics", include_in_schema=False)
+    def get_metrics():
+        collect_pool_stats()
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.on_event("startup")
 def on_startup():
     # dev convenience: create tables (production should use alembic)
-    Base.metadata.create_all(bind=db_session.engine)
+    db_session.create_tables()
+    if os.getenv("DEADLINE_SCHEDULER_IN_API", "false").lower() == "true":
+        threading.Thread(target=deadline_scheduler.run, name="deadline-scheduler", daemon=True).start()
+    if project_purge_enabled:
+        ProjectService.add_deletion_listener(project_purger.submit)
+        project_purger.resume()
+    if metrics_enabled:
+        metrics.start_snapshot_writer(before_write=collect_pool_stats)
+
+@app.on_event("shutdown")
+def on_shutdown():
+    deadline_scheduler.stop()
+    if project_purge_enabled:
+        ProjectService.remove_deletion_listener(project_purger.submit)
+        project_purger.stop()
+    if metrics_enabled:
+        metrics.write_snapshot()
+    db_session.close_storage()
+
+@app.on_event("shutdown")
+async def dispose_async_engines():
+    await db_session.dispose_async_engines()
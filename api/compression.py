@@ -0,0 +1,166 @@
+# api/compression.py
+import zlib
+from typing import List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    # Optional: brotli is offered only when the module is installed
+    import brotli
+except ImportError:
+    brotli = None
+
+# Fast settings: the bodies are JSON, which compresses well even at low levels
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+class _Gzip:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+# Bodies that are compressed already and would only grow
+COMPRESSED_TYPES = ("application/gzip", "application/zstd")
+
+ENCODERS = {"gzip": _Gzip}
+if brotli is not None:
+    ENCODERS["br"] = _Brotli
+
+
+def negotiate(accept_encoding: str, available: List[str]) -> Optional[str]:
+    """The preferred encoding of ``available`` (in our order of preference) that Accept-Encoding allows"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for name in available:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionMiddleware:
+    """Compresses response bodies of at least ``minimum_size`` bytes with br or gzip.
+
+    Like starlette's GZipMiddleware, but negotiates brotli (when installed)
+    and gzip by the client's q-values, and turns the ETag of a compressed
+    body into a weak one, since the bytes differ from the identity
+    representation. Responses that already have a Content-Encoding, or
+    are compressed files, are passed through.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        # Brotli first: smaller output at a similar speed
+        self.available = [name for name in ("br", "gzip") if name in ENCODERS]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.available)
+            if encoding is not None:
+                await _CompressionResponder(self.app, self.minimum_size, encoding)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, minimum_size: int, encoding: str):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoding = encoding
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.encoder = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _start(self, streaming: bool) -> None:
+        headers = MutableHeaders(raw=self.initial_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag is not None and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if streaming:
+            del headers["Content-Length"]
+        self.encoder = ENCODERS[self.encoding]()
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Held back until the first body chunk decides the headers
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or headers.get("content-type", "").split(";")[0] in COMPRESSED_TYPES
+            )
+            return
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            if self.passthrough or (len(body) < self.minimum_size and not more_body):
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+            self._start(streaming=more_body)
+            body = self._encode(body, more_body)
+            if not more_body:
+                MutableHeaders(raw=self.initial_message["headers"])["Content-Length"] = str(len(body))
+            await self.send(self.initial_message)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        await self.send({"type": "http.response.body", "body": self._encode(body, more_body), "more_body": more_body})
+
+    def _encode(self, body: bytes, more_body: bool) -> bytes:
+        # Streamed chunks are flushed, so each reaches the client without waiting for the next
+        return self.encoder.compress(body) + (self.encoder.flush() if more_body else self.encoder.finish())
@@ -1,11 +1,23 @@
 # api/controller_schemas/requests/__init__.py
 from .project_requests import CreateProjectRequest, UpdateProjectRequest
-from .task_requests import CreateTaskRequest, UpdateTaskRequest, UpdateTaskStatusRequest
+from .task_requests import (
+    CreateTaskRequest,
+    CreateTaskBatchRequest,
+    UpdateTaskRequest,
+    UpdateTaskStatusRequest,
+    TaskStatusChange,
+    TaskStatusFilter,
+    UpdateTaskStatusBatchRequest,
+)
 
 __all__ = [
     "CreateProjectRequest",
     "UpdateProjectRequest",
     "CreateTaskRequest",
+    "CreateTaskBatchRequest",
     "UpdateTaskRequest",
     "UpdateTaskStatusRequest",
+    "TaskStatusChange",
+    "TaskStatusFilter",
+    "UpdateTaskStatusBatchRequest",
 ]
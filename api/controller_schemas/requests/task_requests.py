@@ -1,6 +1,6 @@
 # api/controller_schemas/requests/task_requests.py
-from pydantic import BaseModel, Field, validator
-from typing import Optional, Union
+from pydantic import BaseModel, Field, root_validator, validator
+from typing import List, Optional, Union
 from datetime import datetime, date
 
 
@@ -37,6 +37,16 @@ class CreateTaskRequest(BaseModel):
         }
 
 
+class CreateTaskBatchRequest(BaseModel):
+    """Request model for creating many tasks in one transaction"""
+    items: List[CreateTaskRequest] = Field(..., min_items=1, max_items=1000, description="Tasks to create")
+
+    class Config:
+        example = {
+            "items": [CreateTaskRequest.Config.example]
+        }
+
+
 class UpdateTaskStatusRequest(BaseModel):
     """Request model for updating task status"""
     status: str = Field(..., description="Task status: 'todo', 'doing', or 'done'")
@@ -47,6 +57,42 @@ class UpdateTaskStatusRequest(BaseModel):
         }
 
 
+class TaskStatusChange(BaseModel):
+    """One status change of a batch status request"""
+    id: int = Field(..., gt=0, description="Task ID")
+    status: str = Field(..., description="Task status: 'todo', 'doing', or 'done'")
+
+
+class TaskStatusFilter(BaseModel):
+    """Selects the tasks of a batch status request"""
+    project_id: int = Field(..., gt=0, description="Tasks of this project")
+    status: Optional[str] = Field(None, description="Only tasks currently in this status")
+
+
+class UpdateTaskStatusBatchRequest(BaseModel):
+    """Request model for changing the status of many tasks in one transaction"""
+    items: Optional[List[TaskStatusChange]] = Field(None, min_items=1, max_items=1000, description="Explicit status changes")
+    filter: Optional[TaskStatusFilter] = Field(None, description="Select tasks instead of listing them")
+    status: Optional[str] = Field(None, description="Target status for the tasks matching filter")
+
+    @root_validator(skip_on_failure=True)
+    def check_mode(cls, values):
+        """Require either items, or a filter together with a target status"""
+        if (values.get('items') is None) == (values.get('filter') is None):
+            raise ValueError("Provide either items or filter")
+        if values.get('filter') is not None and values.get('status') is None:
+            raise ValueError("status is required together with filter")
+        return values
+
+    class Config:
+        example = {
+            "items": [
+                {"id": 1, "status": "doing"},
+                {"id": 2, "status": "done"}
+            ]
+        }
+
+
 class UpdateTaskRequest(BaseModel):
     """Request model for updating an existing task"""
     title: str = Field(..., min_length=1, max_length=30, description="Task title")
@@ -1,9 +1,17 @@
 # api/controller_schemas/responses/__init__.py
-from .project_responses import ProjectResponse
-from .task_responses import TaskResponse
+from .project_responses import ProjectResponse, ProjectPageResponse, ProjectDeletionResponse
+from .task_responses import TaskResponse, TaskPageResponse, TaskBatchItemResponse, TaskBatchResponse
+from .import_responses import ImportRejectedRowResponse, ImportResponse
 
 __all__ = [
     "ProjectResponse",
+    "ProjectPageResponse",
+    "ProjectDeletionResponse",
     "TaskResponse",
+    "TaskPageResponse",
+    "TaskBatchItemResponse",
+    "TaskBatchResponse",
+    "ImportRejectedRowResponse",
+    "ImportResponse",
     "AutoCloseResponse",
 ]
@@ -0,0 +1,32 @@
+# api/controller_schemas/responses/import_responses.py
+from pydantic import BaseModel
+from typing import Any, List
+
+
+class ImportRejectedRowResponse(BaseModel):
+    """A record the import rejected"""
+    line: int
+    error: str
+    record: Any
+
+
+class ImportResponse(BaseModel):
+    """Response model for a bulk import"""
+    projects: int
+    tasks: int
+    rejected: int
+    rejected_rows: List[ImportRejectedRowResponse]
+
+    class Config:
+        example = {
+            "projects": 1,
+            "tasks": 2,
+            "rejected": 1,
+            "rejected_rows": [
+                {
+                    "line": 4,
+                    "error": "Task title cannot exceed 30 characters",
+                    "record": {"type": "task", "project": "Migration", "title": "A title far longer than thirty characters", "description": "..."}
+                }
+            ]
+        }
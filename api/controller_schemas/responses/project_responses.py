@@ -21,3 +21,37 @@ class ProjectResponse(BaseModel):
             "created_at": "2025-12-06T10:00:00",
             "updated_at": "2025-12-06T10:00:00"
         }
+
+
+class ProjectPageResponse(BaseModel):
+    """Response model for one page of projects"""
+    items: List[ProjectResponse]
+    next_cursor: Optional[str]
+
+    class Config:
+        example = {
+            "items": [ProjectResponse.Config.example],
+            "next_cursor": "WyIyMDI1LTEyLTA2VDEwOjAwOjAwIiwxXQ"
+        }
+
+
+class ProjectDeletionResponse(BaseModel):
+    """Response model for the progress of a project's background deletion"""
+    project_id: int
+    name: str
+    status: str
+    tasks_total: int
+    tasks_deleted: int
+    requested_at: datetime
+    completed_at: Optional[datetime]
+
+    class Config:
+        example = {
+            "project_id": 1,
+            "name": "My Project",
+            "status": "in_progress",
+            "tasks_total": 250000,
+            "tasks_deleted": 12000,
+            "requested_at": "2025-12-06T10:00:00",
+            "completed_at": None
+        }
@@ -1,7 +1,7 @@
 # api/controller_schemas/responses/task_responses.py
 from pydantic import BaseModel, validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class TaskResponse(BaseModel):
@@ -37,3 +37,39 @@ class TaskResponse(BaseModel):
             "closed_at": None
         }
 
+
+class TaskPageResponse(BaseModel):
+    """Response model for one page of tasks"""
+    items: List[TaskResponse]
+    next_cursor: Optional[str]
+
+    class Config:
+        example = {
+            "items": [TaskResponse.Config.example],
+            "next_cursor": "WyIyMDI1LTEyLTA2VDEwOjAwOjAwIiwxXQ"
+        }
+
+
+class TaskBatchItemResponse(BaseModel):
+    """Outcome of one item of a batch request"""
+    index: int
+    status_code: int
+    task: Optional[TaskResponse]
+    error: Optional[str]
+
+
+class TaskBatchResponse(BaseModel):
+    """Response model for a batch request, one result per item in request order"""
+    succeeded: int
+    failed: int
+    results: List[TaskBatchItemResponse]
+
+    class Config:
+        example = {
+            "succeeded": 1,
+            "failed": 1,
+            "results": [
+                {"index": 0, "status_code": 201, "task": TaskResponse.Config.example, "error": None},
+                {"index": 1, "status_code": 404, "task": None, "error": "Project with ID 7 not found"}
+            ]
+        }
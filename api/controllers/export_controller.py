@@ -0,0 +1,41 @@
+# api/controllers/export_controller.py
+from datetime import datetime
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from app.db.session import db_session
+from app.services.export_service import ExportService, stream_compressor
+from app.exceptions.service_exceptions import ValidationError
+from typing import Iterator, Optional
+
+
+class ExportController:
+    """Controller for the NDJSON export"""
+
+    async def export(self, updated_since: Optional[datetime] = None, compression: str = "none") -> StreamingResponse:
+        """Stream every project and task changed at or after ``updated_since``"""
+        try:
+            compressor = stream_compressor(compression)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+        if compressor is None:
+            return StreamingResponse(self._stream(updated_since, None), media_type="application/x-ndjson")
+        return StreamingResponse(
+            self._stream(updated_since, compressor),
+            media_type=compressor.media_type,
+            headers={"Content-Disposition": f'attachment; filename="export.ndjson{compressor.extension}"'}
+        )
+
+    @staticmethod
+    def _stream(updated_since: Optional[datetime], compressor) -> Iterator[bytes]:
+        # A sync generator: StreamingResponse pulls each chunk in a worker
+        # thread, and only as fast as the client reads them. The session
+        # outlives the handler, so the export opens (and closes) its own.
+        session = db_session.get_snapshot_session()
+        try:
+            yield from ExportService(session).export(updated_since, compressor)
+        finally:
+            session.close()
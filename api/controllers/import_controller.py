@@ -0,0 +1,71 @@
+# api/controllers/import_controller.py
+import io
+import tempfile
+import zlib
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from app.commands.import_data import import_records
+from app.exceptions.service_exceptions import ValidationError
+from app.services.import_service import IMPORT_FORMATS, RejectedRow
+from api.serialization import APIJSONResponse
+from typing import List, Optional
+
+# Bodies up to this size are spooled in memory, larger ones to a temporary file
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+# The response lists this many rejected rows; the count covers all of them
+MAX_REPORTED_REJECTS = 1000
+
+
+class ImportController:
+    """Controller for bulk imports"""
+
+    async def import_data(self, request: Request, format: Optional[str] = None) -> APIJSONResponse:
+        """Import the NDJSON or CSV request body (an ImportResponse)"""
+        if format is None:
+            format = "csv" if request.headers.get("content-type", "").startswith("text/csv") else "ndjson"
+        if format not in IMPORT_FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown format '{format}', expected one of: {', '.join(IMPORT_FORMATS)}"
+            )
+
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as body:
+            # Received in full first: the import then runs in a worker thread at
+            # database speed, without holding the connection open
+            decompressor = None
+            if request.headers.get("content-encoding", "").lower() == "gzip":
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            try:
+                async for chunk in request.stream():
+                    body.write(decompressor.decompress(chunk) if decompressor is not None else chunk)
+            except zlib.error:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Request body is not valid gzip"
+                )
+            body.seek(0)
+
+            rejected: List[RejectedRow] = []
+
+            def on_rejected(row: RejectedRow) -> None:
+                if len(rejected) < MAX_REPORTED_REJECTS:
+                    rejected.append(row)
+
+            lines = io.TextIOWrapper(body, encoding="utf-8", errors="replace", newline="")
+            try:
+                totals = await run_in_threadpool(import_records, lines, format, on_rejected=on_rejected)
+            except ValidationError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+            finally:
+                lines.detach()
+
+        return APIJSONResponse({
+            "projects": totals["projects"],
+            "tasks": totals["tasks"],
+            "rejected": totals["rejected"],
+            "rejected_rows": [row._asdict() for row in rejected],
+        })
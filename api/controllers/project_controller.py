@@ -1,29 +1,31 @@
 # api/controllers/project_controller.py
-from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-from app.services.project_service import ProjectService
+from fastapi import HTTPException, Response, status
+from app.services.async_project_service import AsyncProjectService
 from app.exceptions.repository_exceptions import ProjectNotFoundError, DuplicateProjectError
 from app.exceptions.service_exceptions import LimitExceededError
 from app.exceptions.base import ToDoListException
 from api.controller_schemas.requests import CreateProjectRequest, UpdateProjectRequest
-from api.controller_schemas.responses import ProjectResponse
-from typing import List
+from api.controller_schemas.responses import ProjectResponse, ProjectDeletionResponse
+from api.pagination import KEYSET_COLUMNS, decode_cursor, split_page
+from api.serialization import APIJSONResponse, row_encoder
+from app.models.project_deletion import ProjectDeletion
+from typing import Optional, Tuple, Union
 
 
 class ProjectController:
     """Controller for handling project operations"""
     
-    def __init__(self, db_session: Session):
-        self.project_service = ProjectService(db_session)
+    def __init__(self, db_session):
+        self.project_service = AsyncProjectService(db_session)
     
-    def create_project(self, request: CreateProjectRequest) -> ProjectResponse:
+    async def create_project(self, request: CreateProjectRequest) -> APIJSONResponse:
         """Create a new project"""
         try:
-            project = self.project_service.create_project(
+            project = await self.project_service.create_project(
                 name=request.name,
                 description=request.description
             )
-            return ProjectResponse.from_orm(project)
+            return row_encoder(ProjectResponse).entity_response(project, status.HTTP_201_CREATED)
         except DuplicateProjectError as e:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -40,37 +42,61 @@ class ProjectController:
                 detail=str(e)
             )
     
-    def get_all_projects(self) -> List[ProjectResponse]:
-        """Get all projects"""
+    async def get_all_projects(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Response:
+        """Get one page of projects (a ProjectPageResponse, with only ``fields`` if given)"""
         try:
-            projects = self.project_service.get_all_projects()
-            return [ProjectResponse.from_orm(project) for project in projects]
+            encoder = row_encoder(ProjectResponse, fields, KEYSET_COLUMNS)
+            rows = await self.project_service.get_project_rows(
+                encoder.columns,
+                after=decode_cursor(cursor),
+                limit=limit + 1
+            )
+            rows, next_cursor = split_page(rows, limit)
+            return encoder.page_response(rows, next_cursor)
+        except ToDoListException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to retrieve projects"
             )
     
-    def get_project(self, project_id: int) -> ProjectResponse:
-        """Get a specific project by ID"""
+    async def get_project(
+        self,
+        project_id: int,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Response:
+        """Get a specific project by ID (only ``fields`` if given)"""
         try:
-            project = self.project_service.get_project(project_id)
-            return ProjectResponse.from_orm(project)
+            if fields is not None:
+                encoder = row_encoder(ProjectResponse, fields)
+                return encoder.response(await self.project_service.get_project_row(project_id, encoder.columns))
+            
+            project = await self.project_service.get_project(project_id)
+            return row_encoder(ProjectResponse).entity_response(project)
         except ProjectNotFoundError as e:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=str(e)
             )
     
-    def update_project(self, project_id: int, request: UpdateProjectRequest) -> ProjectResponse:
+    async def update_project(self, project_id: int, request: UpdateProjectRequest) -> APIJSONResponse:
         """Update an existing project"""
         try:
-            project = self.project_service.update_project(
+            project = await self.project_service.update_project(
                 project_id=project_id,
                 name=request.name,
                 description=request.description
             )
-            return ProjectResponse.from_orm(project)
+            return row_encoder(ProjectResponse).entity_response(project)
         except ProjectNotFoundError as e:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -87,11 +113,17 @@ class ProjectController:
                 detail=str(e)
             )
     
-    def delete_project(self, project_id: int) -> dict:
-        """Delete a project"""
+    async def delete_project(self, project_id: int, background: Optional[bool] = None) -> Union[dict, APIJSONResponse]:
+        """Delete a project, or accept its deletion for the background purge (202)"""
         try:
-            self.project_service.delete_project(project_id)
-            return {"message": f"Project {project_id} deleted successfully"}
+            deletion = await self.project_service.request_project_deletion(project_id, background)
+            if deletion is None:
+                return {"message": f"Project {project_id} deleted successfully"}
+            return APIJSONResponse(
+                self._deletion_response(deletion),
+                status_code=status.HTTP_202_ACCEPTED,
+                headers={"Location": f"/api/projects/{project_id}/deletion"}
+            )
         except ProjectNotFoundError as e:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -102,3 +134,26 @@ class ProjectController:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to delete project"
             )
+    
+    async def get_project_deletion(self, project_id: int) -> APIJSONResponse:
+        """Get the progress of a project's background deletion"""
+        try:
+            deletion = await self.project_service.get_project_deletion(project_id)
+            return APIJSONResponse(self._deletion_response(deletion))
+        except ProjectNotFoundError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e)
+            )
+    
+    @staticmethod
+    def _deletion_response(deletion: ProjectDeletion) -> dict:
+        return ProjectDeletionResponse(
+            project_id=deletion.project_id,
+            name=deletion.name,
+            status="completed" if deletion.completed_at is not None else "in_progress",
+            tasks_total=deletion.tasks_total,
+            tasks_deleted=deletion.tasks_deleted,
+            requested_at=deletion.requested_at,
+            completed_at=deletion.completed_at
+        ).dict()
@@ -1,33 +1,46 @@
 # api/controllers/task_controller.py
-from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import HTTPException, Response, status
 from datetime import datetime
-from app.services.task_service import TaskService
-from app.models.task import TaskStatus
+from app.services.async_task_service import AsyncTaskService
+from app.models.task import Task, TaskStatus
 from app.exceptions.repository_exceptions import TaskNotFoundError, ProjectNotFoundError
 from app.exceptions.service_exceptions import LimitExceededError
 from app.exceptions.base import ToDoListException
-from api.controller_schemas.requests import CreateTaskRequest, UpdateTaskRequest, UpdateTaskStatusRequest
+from api.controller_schemas.requests import (
+    CreateTaskRequest,
+    CreateTaskBatchRequest,
+    UpdateTaskRequest,
+    UpdateTaskStatusRequest,
+    UpdateTaskStatusBatchRequest,
+)
 from api.controller_schemas.responses import TaskResponse
-from typing import List
+from api.etags import etag_matches, make_etag
+from api.pagination import KEYSET_COLUMNS, decode_cursor, split_page
+from api.serialization import APIJSONResponse, row_encoder
+from typing import List, Optional, Tuple, Union
+
+
+def _fields_key(fields: Optional[Tuple[str, ...]]) -> Optional[str]:
+    # Sparse representations get ETags of their own
+    return ",".join(fields) if fields is not None else None
 
 
 class TaskController:
     """Controller for handling task operations"""
     
-    def __init__(self, db_session: Session):
-        self.task_service = TaskService(db_session)
+    def __init__(self, db_session):
+        self.task_service = AsyncTaskService(db_session)
     
-    def create_task(self, request: CreateTaskRequest) -> TaskResponse:
+    async def create_task(self, request: CreateTaskRequest) -> APIJSONResponse:
         """Create a new task"""
         try:
-            task = self.task_service.create_task(
+            task = await self.task_service.create_task(
                 project_id=request.project_id,
                 title=request.title,
                 description=request.description,
                 deadline=request.deadline
             )
-            return TaskResponse.from_orm(task)
+            return row_encoder(TaskResponse).entity_response(task, status.HTTP_201_CREATED)
         except ProjectNotFoundError as e:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -44,34 +57,123 @@ class TaskController:
                 detail=str(e)
             )
     
-    def get_project_tasks(self, project_id: int) -> List[TaskResponse]:
-        """Get all tasks for a specific project"""
+    async def create_tasks(self, request: CreateTaskBatchRequest) -> APIJSONResponse:
+        """Create many tasks in one transaction"""
         try:
-            tasks = self.task_service.get_project_tasks(project_id)
-            return [TaskResponse.from_orm(task) for task in tasks]
+            results = await self.task_service.create_tasks([item.dict() for item in request.items])
+        except ToDoListException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        return self._batch_response(results, status.HTTP_201_CREATED)
+    
+    def _batch_response(
+        self,
+        results: List[Union[Task, ToDoListException]],
+        success_status: int
+    ) -> APIJSONResponse:
+        """Build per-item results (a TaskBatchResponse) using the status codes of the single-item endpoints"""
+        encoder = row_encoder(TaskResponse)
+        items = []
+        for index, result in enumerate(results):
+            if isinstance(result, ToDoListException):
+                not_found = isinstance(result, (ProjectNotFoundError, TaskNotFoundError))
+                items.append({
+                    "index": index,
+                    "status_code": status.HTTP_404_NOT_FOUND if not_found else status.HTTP_400_BAD_REQUEST,
+                    "task": None,
+                    "error": str(result)
+                })
+            else:
+                items.append({
+                    "index": index,
+                    "status_code": success_status,
+                    "task": encoder.entity(result),
+                    "error": None
+                })
+        
+        failed = sum(1 for item in items if item["error"] is not None)
+        return APIJSONResponse({"succeeded": len(items) - failed, "failed": failed, "results": items})
+    
+    async def get_project_tasks(
+        self,
+        project_id: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Response:
+        """Get one page of tasks for a specific project (a TaskPageResponse), or 304 if the client's copy is current"""
+        try:
+            # Taken before the page, so a concurrent write can only make the ETag older
+            version = await self.task_service.get_project_tasks_version(project_id)
+            etag = make_etag("tasks", project_id, *version, limit, cursor, _fields_key(fields))
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            
+            # Plain rows straight to JSON: no ORM entities, no model per task
+            encoder = row_encoder(TaskResponse, fields, KEYSET_COLUMNS)
+            rows = await self.task_service.get_project_task_rows(
+                project_id,
+                encoder.columns,
+                after=decode_cursor(cursor),
+                limit=limit + 1
+            )
+            rows, next_cursor = split_page(rows, limit)
+            response = encoder.page_response(rows, next_cursor)
+            response.headers["ETag"] = etag
+            return response
         except ProjectNotFoundError as e:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=str(e)
             )
+        except ToDoListException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to retrieve tasks"
             )
     
-    def get_task(self, task_id: int) -> TaskResponse:
-        """Get a specific task by ID"""
+    async def get_task(
+        self,
+        task_id: int,
+        if_none_match: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Response:
+        """Get a specific task by ID (only ``fields`` if given), or 304 if the client's copy is current"""
         try:
-            task = self.task_service.get_task(task_id)
-            return TaskResponse.from_orm(task)
+            if if_none_match:
+                updated_at = await self.task_service.get_task_version(task_id)
+                if updated_at is not None:
+                    etag = make_etag("task", task_id, updated_at, _fields_key(fields))
+                    if etag_matches(if_none_match, etag):
+                        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            
+            if fields is not None:
+                # Select only these columns, plus updated_at for the ETag
+                encoder = row_encoder(TaskResponse, fields, ("updated_at",))
+                row = await self.task_service.get_task_row(task_id, encoder.columns)
+                response = encoder.response(row)
+                response.headers["ETag"] = make_etag("task", task_id, row.updated_at, _fields_key(fields))
+                return response
+            
+            task = await self.task_service.get_task(task_id)
+            response = row_encoder(TaskResponse).entity_response(task)
+            response.headers["ETag"] = make_etag("task", task.id, task.updated_at, None)
+            return response
         except TaskNotFoundError as e:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=str(e)
             )
     
-    def update_task_status(self, task_id: int, request: UpdateTaskStatusRequest) -> TaskResponse:
+    async def update_task_status(self, task_id: int, request: UpdateTaskStatusRequest) -> APIJSONResponse:
         """Update task status"""
         try:
             # Convert string status to TaskStatus enum
@@ -88,8 +190,8 @@ class TaskController:
                 )
             
             new_status = status_map[request.status.lower()]
-            task = self.task_service.update_task_status(task_id, new_status)
-            return TaskResponse.from_orm(task)
+            task = await self.task_service.update_task_status(task_id, new_status)
+            return row_encoder(TaskResponse).entity_response(task)
         except TaskNotFoundError as e:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -101,7 +203,32 @@ class TaskController:
                 detail=str(e)
             )
     
-    def update_task(self, task_id: int, request: UpdateTaskRequest) -> TaskResponse:
+    async def update_task_statuses(self, request: UpdateTaskStatusBatchRequest) -> APIJSONResponse:
+        """Update the status of many tasks in one transaction"""
+        try:
+            if request.items is not None:
+                results = await self.task_service.update_task_statuses(
+                    [(item.id, item.status) for item in request.items]
+                )
+            else:
+                results = await self.task_service.update_task_statuses_where(
+                    status=request.status,
+                    project_id=request.filter.project_id,
+                    current_status=request.filter.status
+                )
+        except ProjectNotFoundError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e)
+            )
+        except ToDoListException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        return self._batch_response(results, status.HTTP_200_OK)
+    
+    async def update_task(self, task_id: int, request: UpdateTaskRequest) -> APIJSONResponse:
         """Update an existing task"""
         try:
             # Convert string status to TaskStatus enum
@@ -118,14 +245,14 @@ class TaskController:
                 )
             
             new_status = status_map[request.status.lower()]
-            task = self.task_service.update_task(
+            task = await self.task_service.update_task(
                 task_id=task_id,
                 title=request.title,
                 description=request.description,
                 deadline=request.deadline,
                 status=new_status
             )
-            return TaskResponse.from_orm(task)
+            return row_encoder(TaskResponse).entity_response(task)
         except TaskNotFoundError as e:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -137,10 +264,10 @@ class TaskController:
                 detail=str(e)
             )
     
-    def delete_task(self, task_id: int) -> dict:
+    async def delete_task(self, task_id: int) -> dict:
         """Delete a task"""
         try:
-            self.task_service.delete_task(task_id)
+            await self.task_service.delete_task(task_id)
             return {"message": f"Task {task_id} deleted successfully"}
         except TaskNotFoundError as e:
             raise HTTPException(
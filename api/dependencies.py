@@ -1,12 +1,117 @@
 # api/dependencies.py
-from typing import Generator
+import asyncio
+import math
+import os
+import time
+from typing import AsyncGenerator, Callable
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from sqlalchemy.orm import Session
+from app.db.in_memory_storage import InMemorySession
 from app.db.session import db_session
 
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
-def get_db() -> Generator:
-    """Dependency for getting database session in route handlers."""
-    session = db_session.get_session()
+# After a write, the client reads from the primary for this long (read-your-writes)
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", 5))
+PRIMARY_COOKIE = "db_primary_until"
+
+
+def reads_from_primary(request: Request) -> bool:
+    """Whether the client wrote recently enough that a replica may not have its writes yet"""
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_db(request: Request) -> AsyncGenerator:
+    """Dependency for getting database session in route handlers.
+    
+    An AsyncSession when the async engine is enabled, otherwise a sync
+    Session or an in-memory session; services take any of them. Safe
+    requests read from a replica when DATABASE_REPLICA_URLS is set, unless
+    the client wrote within REPLICA_STICKY_SECONDS.
+    """
+    read_only = request.method in SAFE_METHODS and not reads_from_primary(request)
+    session = db_session.get_api_session(read_only=read_only)
+    # UnitOfWorkRoute commits it once the handler has succeeded
+    request.state.db_session = session
+    if isinstance(session, InMemorySession) and request.method not in SAFE_METHODS:
+        # Wait for the storage lock in a worker thread: a snapshot, an import
+        # batch or the deadline scheduler may hold it for a while, and the
+        # handler's writes run on the event loop
+        await run_in_threadpool(session.lock)
     try:
         yield session
     finally:
-        session.close()
+        if isinstance(session, InMemorySession):
+            session.close()
+        elif isinstance(session, Session):
+            await run_in_threadpool(session.close)
+        else:
+            await session.close()
+
+
+class UnitOfWorkRoute(APIRoute):
+    """Route that commits the request's session once, after the handler.
+    
+    Repositories only flush, so a request performs a single commit. The
+    commit runs after the response is built but before it is sent, so a
+    failing commit still turns into an error response; dependency teardown
+    would run too late for that. A handler that raises is rolled back when
+    get_db closes the session.
+    
+    With STORAGE_BACKEND=memory a writing session holds the storage lock
+    until it commits, while the request still needs worker threads (the
+    handler, response validation). So write requests queue on the event
+    loop, one at a time, instead of each parking a worker thread on the
+    lock; get_db then takes the lock in a worker thread, as other threads
+    of the process may hold it, and the commit or rollback runs on the
+    loop.
+    
+    With read replicas, a committed write sets a cookie that keeps the
+    client's reads on the primary for REPLICA_STICKY_SECONDS.
+    """
+    
+    # Created on first use, inside the running event loop
+    memory_write_lock: asyncio.Lock = None
+    
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        
+        async def unit_of_work_handler(request: Request) -> Response:
+            if db_session.backend == "memory" and request.method not in SAFE_METHODS:
+                if UnitOfWorkRoute.memory_write_lock is None:
+                    UnitOfWorkRoute.memory_write_lock = asyncio.Lock()
+                async with UnitOfWorkRoute.memory_write_lock:
+                    return await run_unit_of_work(request)
+            return await run_unit_of_work(request)
+        
+        async def run_unit_of_work(request: Request) -> Response:
+            try:
+                response = await handler(request)
+            except Exception:
+                session = getattr(request.state, "db_session", None)
+                if isinstance(session, InMemorySession):
+                    session.rollback()
+                raise
+            session = getattr(request.state, "db_session", None)
+            if isinstance(session, InMemorySession):
+                session.commit()
+            elif isinstance(session, Session):
+                await run_in_threadpool(session.commit)
+            elif session is not None:
+                await session.commit()
+            if db_session.replica_sessions and request.method not in SAFE_METHODS:
+                response.set_cookie(
+                    PRIMARY_COOKIE,
+                    f"{time.time() + REPLICA_STICKY_SECONDS:.3f}",
+                    max_age=math.ceil(REPLICA_STICKY_SECONDS),
+                    httponly=True,
+                    samesite="lax",
+                )
+            return response
+        
+        return unit_of_work_handler
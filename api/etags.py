@@ -0,0 +1,21 @@
+# api/etags.py
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag for a representation identified by ``parts`` (ids, versions, query parameters)"""
+    key = "\x1f".join("" if part is None else part.isoformat() if isinstance(part, datetime) else str(part) for part in parts)
+    return f'"{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag`` (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,47 @@
+# api/pagination.py
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple, TypeVar
+from app.exceptions.service_exceptions import ValidationError
+from app.repositories.base import Keyset
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_ID = 2 ** 63 - 1
+
+RowType = TypeVar("RowType")
+
+# Columns a page's cursor is built from; row selects of a page must include them
+KEYSET_COLUMNS = ("created_at", "id")
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor"""
+    payload = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Keyset]:
+    """Decode a cursor produced by encode_cursor"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at, id = datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError, OverflowError):
+        raise ValidationError("Invalid pagination cursor")
+    # Ids are 64-bit; a larger one would only fail in the database driver
+    if not 0 <= id <= MAX_ID:
+        raise ValidationError("Invalid pagination cursor")
+    return created_at, id
+
+
+def split_page(rows: List[RowType], limit: int) -> Tuple[List[RowType], Optional[str]]:
+    """Trim rows fetched with ``limit + 1`` and build the cursor of the next page"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
@@ -1,20 +1,41 @@
 # api/routers.py
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from api.dependencies import get_db
+from fastapi import APIRouter, Depends, Header, Query, Request, status
+from fastapi.responses import StreamingResponse
+from api.dependencies import UnitOfWorkRoute, get_db
 from api.controllers.project_controller import ProjectController
 from api.controllers.task_controller import TaskController
+from api.controllers.export_controller import ExportController
+from api.controllers.import_controller import ImportController
 from api.controller_schemas.requests import (
     CreateProjectRequest,
     UpdateProjectRequest,
     CreateTaskRequest,
+    CreateTaskBatchRequest,
     UpdateTaskRequest,
     UpdateTaskStatusRequest,
+    UpdateTaskStatusBatchRequest,
 )
-from api.controller_schemas.responses import ProjectResponse, TaskResponse
-from typing import List
+from api.controller_schemas.responses import (
+    ProjectResponse,
+    ProjectPageResponse,
+    ProjectDeletionResponse,
+    TaskResponse,
+    TaskPageResponse,
+    TaskBatchResponse,
+    ImportResponse,
+)
+from api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from api.serialization import APIJSONResponse, fields_query
+from datetime import datetime
+from typing import Optional, Tuple
+
+# Handlers build their JSON with precompiled field writers and return it as a
+# response, so response_model only documents the body and is not re-validated
+api_router = APIRouter(route_class=UnitOfWorkRoute, default_response_class=APIJSONResponse)
 
-api_router = APIRouter()
+# Sparse fieldsets: ?fields=id,title narrows both the SELECT and the payload
+project_fields = fields_query(ProjectResponse)
+task_fields = fields_query(TaskResponse)
 
 
 # ============================================================================
@@ -28,9 +49,9 @@ api_router = APIRouter()
     summary="Create a new project",
     tags=["Projects"]
 )
-def create_project(
+async def create_project(
     request: CreateProjectRequest,
-    db: Session = Depends(get_db)
+    db = Depends(get_db)
 ):
     """
     Create a new project.
@@ -39,19 +60,30 @@ def create_project(
     - **description**: Project description
     """
     controller = ProjectController(db)
-    return controller.create_project(request)
+    return await controller.create_project(request)
 
 
 @api_router.get(
     "/projects",
-    response_model=List[ProjectResponse],
+    response_model=ProjectPageResponse,
     summary="List all projects",
     tags=["Projects"]
 )
-def list_projects(db: Session = Depends(get_db)):
-    """Get all projects in the system."""
+async def list_projects(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[Tuple[str, ...]] = Depends(project_fields),
+    db = Depends(get_db)
+):
+    """
+    Get one page of projects, oldest first.
+    
+    - **limit**: Page size
+    - **cursor**: Pass the previous page's `next_cursor` to get the next page
+    - **fields**: Only return these fields of each project
+    """
     controller = ProjectController(db)
-    return controller.get_all_projects()
+    return await controller.get_all_projects(limit, cursor, fields)
 
 
 @api_router.get(
@@ -60,10 +92,18 @@ def list_projects(db: Session = Depends(get_db)):
     summary="Get a specific project",
     tags=["Projects"]
 )
-def get_project(project_id: int, db: Session = Depends(get_db)):
-    """Get details of a specific project by ID."""
+async def get_project(
+    project_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(project_fields),
+    db = Depends(get_db)
+):
+    """
+    Get details of a specific project by ID.
+    
+    - **fields**: Only return these fields
+    """
     controller = ProjectController(db)
-    return controller.get_project(project_id)
+    return await controller.get_project(project_id, fields)
 
 
 @api_router.put(
@@ -72,14 +112,14 @@ def get_project(project_id: int, db: Session = Depends(get_db)):
     summary="Update a project",
     tags=["Projects"]
 )
-def update_project(
+async def update_project(
     project_id: int,
     request: UpdateProjectRequest,
-    db: Session = Depends(get_db)
+    db = Depends(get_db)
 ):
     """Update an existing project."""
     controller = ProjectController(db)
-    return controller.update_project(project_id, request)
+    return await controller.update_project(project_id, request)
 
 
 @api_router.delete(
@@ -87,10 +127,36 @@ def update_project(
     summary="Delete a project",
     tags=["Projects"]
 )
-def delete_project(project_id: int, db: Session = Depends(get_db)):
-    """Delete a project and all its associated tasks."""
+async def delete_project(
+    project_id: int,
+    background: Optional[bool] = Query(
+        None,
+        description="Purge the tasks in the background (default: only for projects with many tasks)"
+    ),
+    db = Depends(get_db)
+):
+    """
+    Delete a project and all its associated tasks.
+    
+    A background deletion hides the project at once and answers 202 with
+    its progress (also at the `Location` header's URL); the tasks are then
+    deleted in small batches. The project's name stays taken until that
+    finishes.
+    """
     controller = ProjectController(db)
-    return controller.delete_project(project_id)
+    return await controller.delete_project(project_id, background)
+
+
+@api_router.get(
+    "/projects/{project_id}/deletion",
+    response_model=ProjectDeletionResponse,
+    summary="Get the progress of a project's background deletion",
+    tags=["Projects"]
+)
+async def get_project_deletion(project_id: int, db = Depends(get_db)):
+    """Get how many of the deleted project's tasks have been purged so far."""
+    controller = ProjectController(db)
+    return await controller.get_project_deletion(project_id)
 
 
 # ============================================================================
@@ -104,9 +170,9 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
     summary="Create a new task",
     tags=["Tasks"]
 )
-def create_task(
+async def create_task(
     request: CreateTaskRequest,
-    db: Session = Depends(get_db)
+    db = Depends(get_db)
 ):
     """
     Create a new task in a project.
@@ -117,19 +183,57 @@ def create_task(
     - **deadline**: Optional deadline (ISO 8601 format)
     """
     controller = TaskController(db)
-    return controller.create_task(request)
+    return await controller.create_task(request)
+
+
+@api_router.post(
+    "/tasks:batch",
+    response_model=TaskBatchResponse,
+    summary="Create many tasks",
+    tags=["Tasks"]
+)
+async def create_tasks(
+    request: CreateTaskBatchRequest,
+    db = Depends(get_db)
+):
+    """
+    Create up to 1000 tasks in one transaction.
+    
+    - **items**: Tasks to create, each shaped like the body of `POST /tasks`
+    
+    Every item gets its own result with the status code `POST /tasks` would
+    have returned; invalid items do not prevent the others from being created.
+    """
+    controller = TaskController(db)
+    return await controller.create_tasks(request)
 
 
 @api_router.get(
     "/projects/{project_id}/tasks",
-    response_model=List[TaskResponse],
+    response_model=TaskPageResponse,
     summary="Get tasks for a project",
     tags=["Tasks"]
 )
-def get_project_tasks(project_id: int, db: Session = Depends(get_db)):
-    """Get all tasks for a specific project."""
+async def get_project_tasks(
+    project_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    if_none_match: Optional[str] = Header(None),
+    fields: Optional[Tuple[str, ...]] = Depends(task_fields),
+    db = Depends(get_db)
+):
+    """
+    Get one page of tasks for a specific project, oldest first.
+    
+    - **limit**: Page size
+    - **cursor**: Pass the previous page's `next_cursor` to get the next page
+    - **fields**: Only return these fields of each task
+    
+    The `ETag` changes whenever any task of the project changes; send it back
+    in `If-None-Match` to get `304 Not Modified` while it is current.
+    """
     controller = TaskController(db)
-    return controller.get_project_tasks(project_id)
+    return await controller.get_project_tasks(project_id, limit, cursor, if_none_match, fields)
 
 
 @api_router.get(
@@ -138,10 +242,22 @@ def get_project_tasks(project_id: int, db: Session = Depends(get_db)):
     summary="Get a specific task",
     tags=["Tasks"]
 )
-def get_task(task_id: int, db: Session = Depends(get_db)):
-    """Get details of a specific task by ID."""
+async def get_task(
+    task_id: int,
+    if_none_match: Optional[str] = Header(None),
+    fields: Optional[Tuple[str, ...]] = Depends(task_fields),
+    db = Depends(get_db)
+):
+    """
+    Get details of a specific task by ID.
+    
+    - **fields**: Only return these fields
+    
+    Send the `ETag` back in `If-None-Match` to get `304 Not Modified` while
+    the task is unchanged.
+    """
     controller = TaskController(db)
-    return controller.get_task(task_id)
+    return await controller.get_task(task_id, if_none_match, fields)
 
 
 @api_router.patch(
@@ -150,10 +266,10 @@ def get_task(task_id: int, db: Session = Depends(get_db)):
     summary="Change task status",
     tags=["Tasks"]
 )
-def update_task_status(
+async def update_task_status(
     task_id: int,
     request: UpdateTaskStatusRequest,
-    db: Session = Depends(get_db)
+    db = Depends(get_db)
 ):
     """
     Update the status of a task.
@@ -161,7 +277,30 @@ def update_task_status(
     - **status**: One of 'todo', 'doing', or 'done'
     """
     controller = TaskController(db)
-    return controller.update_task_status(task_id, request)
+    return await controller.update_task_status(task_id, request)
+
+
+@api_router.patch(
+    "/tasks/status:batch",
+    response_model=TaskBatchResponse,
+    summary="Change the status of many tasks",
+    tags=["Tasks"]
+)
+async def update_task_statuses(
+    request: UpdateTaskStatusBatchRequest,
+    db = Depends(get_db)
+):
+    """
+    Update the status of many tasks in one transaction.
+    
+    - **items**: List of `{id, status}` changes, or
+    - **filter** + **status**: Move every task of `project_id` (currently in `status`, if given) to `status`
+    
+    Moving a task to 'done' sets its `closed_at`, as the autoclose job does;
+    moving it to another status clears it.
+    """
+    controller = TaskController(db)
+    return await controller.update_task_statuses(request)
 
 
 @api_router.put(
@@ -170,10 +309,10 @@ def update_task_status(
     summary="Update a task",
     tags=["Tasks"]
 )
-def update_task(
+async def update_task(
     task_id: int,
     request: UpdateTaskRequest,
-    db: Session = Depends(get_db)
+    db = Depends(get_db)
 ):
     """
     Update an existing task.
@@ -184,7 +323,7 @@ def update_task(
     - **deadline**: Optional deadline (ISO 8601 format)
     """
     controller = TaskController(db)
-    return controller.update_task(task_id, request)
+    return await controller.update_task(task_id, request)
 
 
 @api_router.delete(
@@ -192,7 +331,62 @@ def update_task(
     summary="Delete a task",
     tags=["Tasks"]
 )
-def delete_task(task_id: int, db: Session = Depends(get_db)):
+async def delete_task(task_id: int, db = Depends(get_db)):
     """Delete a specific task."""
     controller = TaskController(db)
-    return controller.delete_task(task_id)
\ No newline at end of file
+    return await controller.delete_task(task_id)
+
+
+# ============================================================================
+# IMPORT / EXPORT ENDPOINTS
+# ============================================================================
+
+@api_router.get(
+    "/export",
+    summary="Export all projects and tasks as NDJSON",
+    tags=["Import/Export"],
+    response_class=StreamingResponse
+)
+async def export(
+    updated_since: Optional[datetime] = Query(None, description="Only rows changed at or after this time"),
+    compression: str = Query("none", description="none, gzip or zstd (when installed)")
+):
+    """
+    Stream every project and task, one JSON object per line.
+    
+    Each line has a `type` of `project` or `task`; a project comes before
+    its tasks. The rows are read in batches through server-side cursors,
+    so exports of any size stream with flat memory use.
+    
+    - **updated_since**: Incremental export of the rows changed since then
+      (deleted rows are not included)
+    - **compression**: `gzip` or `zstd` returns a compressed file download
+    """
+    controller = ExportController()
+    return await controller.export(updated_since, compression)
+
+
+@api_router.post(
+    "/import",
+    response_model=ImportResponse,
+    summary="Bulk import projects and tasks from NDJSON or CSV",
+    tags=["Import/Export"]
+)
+async def import_data(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson or csv (default: csv for a text/csv body, else ndjson)")
+):
+    """
+    Import the request body, one record per line (or CSV row), in the
+    shape of the export: a `type` of `project` or `task` and its fields.
+    
+    - Tasks name their project with `project` (its name) or `project_id`
+      (the `id` of a project imported before them)
+    - The body may be sent with `Content-Encoding: gzip`
+    
+    Records are validated like single creates and committed in batches.
+    Invalid records are skipped and reported in `rejected_rows` (the first
+    1000) with their line number and the reason; the rest are imported.
+    """
+    controller = ImportController()
+    return await controller.import_data(request, format)
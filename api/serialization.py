@@ -0,0 +1,119 @@
+# api/serialization.py
+import functools
+import operator
+import os
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, Tuple, Type
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.json_encoding import NATIVE_DATETIMES, dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by ``dumps`` (orjson when installed)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class EncodedJSONResponse(JSONResponse):
+    """JSONResponse rendered like FastAPI's own responses, through ``jsonable_encoder``"""
+
+    def render(self, content: Any) -> bytes:
+        return super().render(jsonable_encoder(content))
+
+
+# Opt-in: FAST_JSON_RESPONSES=true renders the API's bodies with FastJSONResponse
+fast_json_responses = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+APIJSONResponse = FastJSONResponse if fast_json_responses else EncodedJSONResponse
+
+
+class RowEncoder:
+    """Precompiled writer of a response model's fields.
+
+    Builds the body the model would, from rows of columns or from entities,
+    without creating and validating a model instance per item. ``fields``
+    defaults to all fields of ``model``, in declaration order; rows hold
+    ``columns``: the fields, followed by any ``extra`` columns the caller
+    needs (such as the keyset of a page), which are not encoded.
+    """
+
+    def __init__(self, model: Type[BaseModel], fields: Optional[Sequence[str]] = None, extra: Sequence[str] = ()):
+        self.fields = tuple(fields or model.__fields__)
+        self.columns = self.fields + tuple(column for column in extra if column not in self.fields)
+        self._values = operator.attrgetter(*self.fields)
+        # orjson writes datetimes itself; json needs them as strings first
+        self._datetimes = [] if NATIVE_DATETIMES else [
+            index for index, field in enumerate(self.fields)
+            if model.__fields__[field].type_ is datetime
+        ]
+
+    def items(self, rows: Sequence[tuple]) -> list:
+        fields, datetimes = self.fields, self._datetimes
+        # zip stops at the last field, leaving out the extra columns
+        if not datetimes:
+            return [dict(zip(fields, row)) for row in rows]
+        items = []
+        for row in rows:
+            values = list(row)
+            for index in datetimes:
+                value = values[index]
+                if value is not None:
+                    values[index] = value.isoformat()
+            items.append(dict(zip(fields, values)))
+        return items
+
+    def entity(self, entity: Any) -> dict:
+        """The fields of an entity (ORM object or cached snapshot)"""
+        values = self._values(entity)
+        return self.items([values if len(self.fields) > 1 else (values,)])[0]
+
+    def response(self, row: tuple, status_code: int = status.HTTP_200_OK) -> APIJSONResponse:
+        """JSON response of one row"""
+        return APIJSONResponse(self.items([row])[0], status_code=status_code)
+
+    def entity_response(self, entity: Any, status_code: int = status.HTTP_200_OK) -> APIJSONResponse:
+        """JSON response of one entity"""
+        return APIJSONResponse(self.entity(entity), status_code=status_code)
+
+    def page_response(self, rows: Sequence[tuple], next_cursor: Optional[str]) -> APIJSONResponse:
+        """JSON response of a ``*PageResponse`` body with ``rows`` as its items"""
+        return APIJSONResponse({"items": self.items(rows), "next_cursor": next_cursor})
+
+
+@functools.lru_cache(maxsize=1024)
+def row_encoder(model: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None, extra: Tuple[str, ...] = ()) -> RowEncoder:
+    """Shared RowEncoder of ``model`` for a fieldset (fieldsets come from ``fields_query``, so there are few)"""
+    return RowEncoder(model, fields, extra)
+
+
+def fields_query(model: Type[BaseModel]) -> Callable[..., Optional[Tuple[str, ...]]]:
+    """Dependency parsing the ``fields`` query parameter against the fields of ``model``.
+
+    Resolves to the requested fields in the model's order, or None when the
+    parameter is absent; unknown fields are rejected with 400 before the
+    handler runs.
+    """
+    valid = tuple(model.__fields__)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description=f"Comma-separated subset of the fields to return: {', '.join(valid)}"
+        )
+    ) -> Optional[Tuple[str, ...]]:
+        if fields is None:
+            return None
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = sorted(requested.difference(valid))
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Valid fields: {', '.join(valid)}"
+                if unknown else "fields must name at least one field"
+            )
+        return tuple(field for field in valid if field in requested)
+
+    return dependency
@@ -0,0 +1,149 @@
+"""
+Read-through cache of project and task snapshots, keyed by id.
+
+Services read single entities through ``entity_cache`` and invalidate the
+ids they write, both immediately and again once the transaction commits.
+Entries are immutable snapshots of the row's columns, never session-bound
+ORM objects, so they can be shared by all requests of a process. Each
+process has its own cache: writes made by another process (another
+uvicorn worker, the autoclose command) are only seen once the entry
+expires after ENTITY_CACHE_TTL_SECONDS. ENTITY_CACHE_SIZE=0 disables it.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from sqlalchemy import inspect
+from app import metrics
+from app.db.in_memory_storage import InMemorySession
+from app.db.session import on_commit
+from app.models.project import Project
+from app.models.task import Task
+
+def _snapshot_type(model):
+    # Field names match the model's columns, so snapshots read like the model
+    # (including for pydantic's from_orm)
+    return namedtuple(f"{model.__name__}Snapshot", [attr.key for attr in inspect(model).column_attrs])
+
+ProjectSnapshot = _snapshot_type(Project)
+TaskSnapshot = _snapshot_type(Task)
+
+_SNAPSHOT_TYPES = {"project": ProjectSnapshot, "task": TaskSnapshot}
+
+CacheKey = Tuple[str, int]
+
+# Invalidations are tracked per stripe of keys rather than per key, so the
+# bookkeeping stays bounded; a collision only costs a skipped fill
+_STRIPES = 4096
+
+class EntityCache:
+    """Bounded LRU of snapshots by ``(kind, id)``, each kept for ``ttl`` seconds.
+
+    A fill is dropped when the key was invalidated while the value was being
+    loaded, so a reader racing a writer's commit cannot put the old row back.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (expires at, snapshot), least recently used first
+        self._entries: "OrderedDict[CacheKey, Tuple[float, tuple]]" = OrderedDict()
+        self._generations = [0] * _STRIPES
+
+    def get(self, kind: str, id: int, load: Callable[[], Optional[object]], fill: bool = True) -> Optional[tuple]:
+        """The cached snapshot, or a snapshot of ``load()`` (stored when ``fill``)"""
+        key = (kind, id)
+        stripe = hash(key) % _STRIPES
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                hit = True
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                generation = self._generations[stripe]
+                hit = False
+        labels = (("kind", kind),)
+        if hit:
+            metrics.registry.inc(metrics.CACHE_HITS, labels)
+            return entry[1]
+
+        metrics.registry.inc(metrics.CACHE_MISSES, labels)
+        entity = load()
+        if entity is None:
+            return None
+        snapshot_type = _SNAPSHOT_TYPES[kind]
+        value = snapshot_type(*(getattr(entity, field) for field in snapshot_type._fields))
+        if fill:
+            evicted = 0
+            with self._lock:
+                if self._generations[stripe] == generation:
+                    self._entries[key] = (time.monotonic() + self.ttl, value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+                        evicted += 1
+                size = len(self._entries)
+            if evicted:
+                metrics.registry.inc(metrics.CACHE_EVICTIONS, amount=evicted)
+            metrics.registry.set(metrics.CACHE_ENTRIES, size)
+        return value
+
+    def peek(self, kind: str, id: int) -> Optional[tuple]:
+        """The cached snapshot, if any, without loading on a miss"""
+        with self._lock:
+            entry = self._entries.get((kind, id))
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self._entries.move_to_end((kind, id))
+        metrics.registry.inc(metrics.CACHE_HITS, (("kind", kind),))
+        return entry[1]
+
+    def invalidate(self, kind: str, ids: Iterable[int], session=None) -> None:
+        """Drop the entries now and, given the writing ``session``, again after it commits"""
+        ids = list(ids)
+        if not ids:
+            return
+        self._drop(kind, ids)
+        if session is not None:
+            on_commit(session, lambda: self._drop(kind, ids))
+
+    def invalidate_project_tasks(self, project_id: int, session=None) -> None:
+        """Drop every cached task of a project (its tasks are deleted by cascade)"""
+        with self._lock:
+            ids = [id for (kind, id), (_, task) in self._entries.items() if kind == "task" and task.project_id == project_id]
+        self.invalidate("task", ids, session)
+
+    def _drop(self, kind: str, ids: Iterable[int]) -> None:
+        with self._lock:
+            for id in ids:
+                key = (kind, id)
+                self._generations[hash(key) % _STRIPES] += 1
+                self._entries.pop(key, None)
+            size = len(self._entries)
+        metrics.registry.inc(metrics.CACHE_INVALIDATIONS, (("kind", kind),))
+        metrics.registry.set(metrics.CACHE_ENTRIES, size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generations = [generation + 1 for generation in self._generations]
+            self._entries.clear()
+        metrics.registry.set(metrics.CACHE_ENTRIES, 0)
+
+def _create_cache() -> Optional[EntityCache]:
+    max_size = int(os.getenv("ENTITY_CACHE_SIZE", 10000))
+    if max_size <= 0:
+        return None
+    return EntityCache(max_size, float(os.getenv("ENTITY_CACHE_TTL_SECONDS", 30)))
+
+entity_cache = _create_cache()
+
+def cache_for(db_session) -> Optional[EntityCache]:
+    """The entity cache for services on ``db_session``; none for the in-memory backend, whose reads are dict lookups"""
+    if isinstance(db_session, InMemorySession):
+        return None
+    return entity_cache
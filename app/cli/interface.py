@@ -98,7 +98,8 @@ class ToDoListCLI:
         description = click.prompt("Project description")
         
         try:
-            project = self.project_service.create_project(name, description)
+            with db_session.unit_of_work(self.db_session):
+                project = self.project_service.create_project(name, description)
             self.display_success(f"Project '{project.name}' created successfully!")
             click.pause()
         except ToDoListException as e:
@@ -147,7 +148,8 @@ class ToDoListCLI:
             description = click.prompt("New project description", default=project.description)
             
             # Update the project
-            updated_project = self.project_service.update_project(project_id, name, description)
+            with db_session.unit_of_work(self.db_session):
+                updated_project = self.project_service.update_project(project_id, name, description)
             self.display_success(f"Project '{updated_project.name}' updated successfully!")
             
             click.pause()
@@ -175,7 +177,8 @@ class ToDoListCLI:
             click.echo()
             
             if click.confirm("Are you sure you want to delete this project and all its tasks?"):
-                self.project_service.delete_project(project_id)
+                with db_session.unit_of_work(self.db_session):
+                    self.project_service.delete_project(project_id)
                 self.display_success("Project deleted successfully!")
             else:
                 self.display_info("Deletion cancelled")
@@ -202,7 +205,8 @@ class ToDoListCLI:
             
             deadline_date = self.parse_date(deadline)
             
-            task = self.task_service.create_task(project_id, title, description, deadline_date)
+            with db_session.unit_of_work(self.db_session):
+                task = self.task_service.create_task(project_id, title, description, deadline_date)
             self.display_success(f"Task '{task.title}' created successfully!")
             click.pause()
             
@@ -279,7 +283,8 @@ class ToDoListCLI:
             
             if status_choice in status_map:
                 new_status = status_map[status_choice]
-                updated_task = self.task_service.update_task_status(task_id, new_status)
+                with db_session.unit_of_work(self.db_session):
+                    updated_task = self.task_service.update_task_status(task_id, new_status)
                 self.display_success(f"Task status updated to: {new_status.value}")
             else:
                 self.display_error("Invalid choice")
@@ -324,9 +329,10 @@ class ToDoListCLI:
             new_status = status_map.get(status_choice, task.status)
             deadline_date = self.parse_date(new_deadline)
             
-            updated_task = self.task_service.update_task(
-                task_id, new_title, new_description, deadline_date, new_status
-            )
+            with db_session.unit_of_work(self.db_session):
+                updated_task = self.task_service.update_task(
+                    task_id, new_title, new_description, deadline_date, new_status
+                )
             self.display_success(f"Task '{updated_task.title}' updated successfully!")
             click.pause()
             
@@ -353,7 +359,8 @@ class ToDoListCLI:
             click.echo()
             
             if click.confirm("Are you sure you want to delete this task?"):
-                self.task_service.delete_task(task_id)
+                with db_session.unit_of_work(self.db_session):
+                    self.task_service.delete_task(task_id)
                 self.display_success("Task deleted successfully!")
             else:
                 self.display_info("Deletion cancelled")
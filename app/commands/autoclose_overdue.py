@@ -1,22 +1,86 @@
 import click
+import os
+import time
+from typing import Optional
+from app import metrics
 from app.db.session import db_session
 from app.services.task_service import TaskService
 
-def autoclose_overdue_tasks():
-    """Automatically close overdue tasks"""
+def _checkpoint_path() -> str:
+    return os.getenv('AUTOCLOSE_CHECKPOINT_FILE', '.autoclose_checkpoint')
+
+def load_checkpoint() -> int:
+    """Return the task ID an interrupted run stopped at, or 0"""
+    try:
+        with open(_checkpoint_path()) as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def save_checkpoint(last_id: int) -> None:
+    """Atomically record the high-water mark of the last committed batch"""
+    path = _checkpoint_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(str(last_id))
+    os.replace(tmp_path, path)
+
+def clear_checkpoint() -> None:
+    try:
+        os.remove(_checkpoint_path())
+    except FileNotFoundError:
+        pass
+
+def autoclose_overdue_tasks(
+    verbose: bool = False,
+    batch_size: Optional[int] = None,
+    max_runtime: Optional[float] = None,
+    sleep_between: float = 0.0
+):
+    """Automatically close overdue tasks in keyset batches on tasks.id.
+    
+    Every batch is committed on its own and its last task ID is saved as a
+    checkpoint, so an interrupted run resumes where it stopped. Re-closing a
+    batch after a crash is harmless because closed tasks no longer match.
+    """
+    if batch_size is None:
+        batch_size = int(os.getenv('AUTOCLOSE_BATCH_SIZE', 1000))
+    
     session = db_session.get_session()
     try:
         task_service = TaskService(session)
-        overdue_tasks = task_service.get_overdue_tasks()
+        after_id = load_checkpoint()
+        if after_id:
+            click.echo(f"Resuming after task ID {after_id}")
         
+        started = time.monotonic()
         closed_count = 0
-        for task in overdue_tasks:
-            try:
-                task_service.close_overdue_task(task.id)
-                closed_count += 1
-                click.echo(f"Closed overdue task: {task.title} (ID: {task.id})")
-            except Exception as e:
-                click.echo(f"Error closing task {task.id}: {str(e)}")
+        while True:
+            batch_count, closed_tasks, last_id = task_service.close_overdue_tasks(
+                with_rows=verbose,
+                after_id=after_id,
+                batch_size=batch_size
+            )
+            session.commit()
+            if last_id is None:
+                clear_checkpoint()
+                break
+            
+            for task_id, title in closed_tasks:
+                click.echo(f"Closed overdue task: {title} (ID: {task_id})")
+            
+            closed_count += batch_count
+            after_id = last_id
+            save_checkpoint(after_id)
+            
+            if max_runtime is not None and time.monotonic() - started >= max_runtime:
+                click.echo(f"Max runtime reached, next run resumes after task ID {after_id}")
+                break
+            if sleep_between:
+                time.sleep(sleep_between)
+        
+        metrics.record_autoclose(closed_count, time.monotonic() - started, time.time())
+        metrics.write_snapshot()
         
         if closed_count == 0:
             click.echo("No overdue tasks found")
@@ -30,9 +94,18 @@ def autoclose_overdue_tasks():
         session.close()
 
 @click.command()
-def autoclose_overdue():
+@click.option("--verbose", is_flag=True, help="Print every closed task")
+@click.option("--batch-size", type=int, default=None, help="Tasks closed per transaction")
+@click.option("--max-runtime", type=float, default=None, help="Stop after this many seconds")
+@click.option("--sleep", "sleep_between", type=float, default=0.0, help="Seconds to sleep between batches")
+def autoclose_overdue(verbose, batch_size, max_runtime, sleep_between):
     """Command to close overdue tasks"""
-    autoclose_overdue_tasks()
+    autoclose_overdue_tasks(
+        verbose=verbose,
+        batch_size=batch_size,
+        max_runtime=max_runtime,
+        sleep_between=sleep_between
+    )
 
 if __name__ == '__main__':
-    autoclose_overdue()
\ No newline at end of file
+    autoclose_overdue()
@@ -0,0 +1,36 @@
+import click
+import time
+from datetime import datetime
+from typing import Optional
+from app.db.session import db_session
+from app.exceptions.service_exceptions import ValidationError
+from app.services.export_service import ExportService, stream_compressor
+
+def export_data(
+    output: str,
+    updated_since: Optional[datetime] = None,
+    compression: str = "none",
+    batch_size: int = 1000
+) -> None:
+    """Write the NDJSON export to the file ``output``.
+
+    Streams batch by batch, so the file can be far larger than memory; a
+    failed export leaves a partial file behind.
+    """
+    try:
+        compressor = stream_compressor(compression)
+    except ValidationError as e:
+        raise click.ClickException(str(e))
+
+    started = time.monotonic()
+    written = 0
+    session = db_session.get_snapshot_session()
+    try:
+        with open(output, "wb") as target:
+            for chunk in ExportService(session, batch_size).export(updated_since, compressor):
+                target.write(chunk)
+                written += len(chunk)
+    finally:
+        session.close()
+
+    click.echo(f"Exported {written} bytes to {output} in {time.monotonic() - started:.1f} s")
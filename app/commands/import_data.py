@@ -0,0 +1,104 @@
+import click
+import gzip
+import io
+import itertools
+import time
+from typing import Callable, Iterable, Optional, TextIO
+from app.db.session import db_session
+from app.exceptions.service_exceptions import ValidationError
+from app.json_encoding import dumps
+from app.services.import_service import ImportService, RejectedRow, read_records
+
+def import_records(
+    lines: Iterable[str],
+    format: str,
+    batch_size: int = 5000,
+    ignore_limits: bool = False,
+    on_rejected: Optional[Callable[[RejectedRow], None]] = None,
+    on_progress: Optional[Callable[[dict], None]] = None
+) -> dict:
+    """Import NDJSON or CSV ``lines``, committing every ``batch_size`` records.
+
+    Returns the totals: imported projects and tasks, rejected rows and the
+    last line read. Rejected rows go to ``on_rejected``, the running totals
+    to ``on_progress`` after each committed batch. An interrupted import
+    keeps its committed batches; a database error (such as a project name
+    taken concurrently) stops it at the failing batch.
+    """
+    records = read_records(lines, format)
+    totals = {"projects": 0, "tasks": 0, "rejected": 0, "lines": 0}
+    project_ids = None
+    source_names = {}
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if not batch:
+            return totals
+        with db_session.unit_of_work() as session:
+            service = ImportService(session, ignore_limits)
+            if project_ids is None:
+                # The one lookup of existing names; imported projects are added to it
+                project_ids = service.get_project_ids()
+            projects, tasks, rejected = service.import_batch(batch, project_ids, source_names)
+        totals["projects"] += projects
+        totals["tasks"] += tasks
+        totals["rejected"] += len(rejected)
+        totals["lines"] = batch[-1][0]
+        if on_rejected is not None:
+            for row in rejected:
+                on_rejected(row)
+        if on_progress is not None:
+            on_progress(totals)
+
+def _open_text(path: str) -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise click.ClickException("Reading .zst files requires the zstandard package")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True), encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+def import_file(
+    path: str,
+    format: Optional[str] = None,
+    rejected_path: Optional[str] = None,
+    batch_size: int = 5000,
+    ignore_limits: bool = False
+) -> None:
+    """Import an NDJSON or CSV file (optionally .gz or .zst compressed).
+
+    The format defaults to csv for .csv files and ndjson otherwise. Rows
+    failing validation are written to ``rejected_path`` as NDJSON, each with
+    its line number and the reason, instead of stopping the import.
+    """
+    if format is None:
+        format = "csv" if path.removesuffix(".gz").removesuffix(".zst").endswith(".csv") else "ndjson"
+
+    started = time.monotonic()
+    rejected_file = open(rejected_path, "wb") if rejected_path else None
+
+    def on_rejected(row: RejectedRow) -> None:
+        if rejected_file is not None:
+            rejected_file.write(dumps(row._asdict()) + b"\n")
+
+    def on_progress(totals: dict) -> None:
+        click.echo(
+            f"Line {totals['lines']}: imported {totals['projects']} projects and {totals['tasks']} tasks, "
+            f"rejected {totals['rejected']} rows ({time.monotonic() - started:.1f} s)"
+        )
+
+    try:
+        with _open_text(path) as lines:
+            totals = import_records(lines, format, batch_size, ignore_limits, on_rejected, on_progress)
+    except ValidationError as e:
+        raise click.ClickException(str(e))
+    finally:
+        if rejected_file is not None:
+            rejected_file.close()
+
+    summary = f"Imported {totals['projects']} projects and {totals['tasks']} tasks in {time.monotonic() - started:.1f} s"
+    if totals["rejected"]:
+        summary += f", rejected {totals['rejected']} rows" + (f" (see {rejected_path})" if rejected_path else "")
+    click.echo(summary)
@@ -0,0 +1,96 @@
+import click
+import os
+import queue
+import threading
+import time
+from typing import Optional
+
+class ProjectPurger:
+    """Deletes the tasks of projects deleted in the background, one bounded batch per transaction.
+    
+    Runs in a daemon thread started on the first ``submit``. Each batch is
+    a short transaction, and the purger pauses between batches, so other
+    writers are never locked out for long. Deletions that were pending when
+    a process stopped are picked up again by ``resume`` (or the
+    ``purge-projects`` command); concurrent purges of one project take turns
+    on its deletion record, so resuming in several processes is safe.
+    """
+    
+    def __init__(self, batch_size: Optional[int] = None, pause: Optional[float] = None):
+        self.batch_size = batch_size or int(os.getenv('PROJECT_PURGE_BATCH_SIZE', 1000))
+        self.pause = pause if pause is not None else float(os.getenv('PROJECT_PURGE_PAUSE_SECONDS', 0.05))
+        self._queue: "queue.Queue[Optional[int]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+    
+    def submit(self, project_id: int) -> None:
+        """ProjectService listener: purge the project in the background"""
+        from app import metrics
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="project-purger", daemon=True)
+                self._thread.start()
+        self._queue.put(project_id)
+        metrics.registry.inc(metrics.PURGE_PENDING)
+    
+    def resume(self) -> int:
+        """Submit every deletion that has not completed; returns how many"""
+        from app.db.session import db_session
+        from app.services.project_service import ProjectService
+        
+        with db_session.unit_of_work() as session:
+            pending = ProjectService(session).get_pending_deletions()
+        for project_id in pending:
+            self.submit(project_id)
+        return len(pending)
+    
+    def purge(self, project_id: int) -> None:
+        """Delete the project's tasks batch by batch, then the project"""
+        from app import metrics
+        from app.db.session import db_session
+        from app.services.project_service import ProjectService
+        
+        while not self._stopped.is_set():
+            with db_session.unit_of_work() as session:
+                service = ProjectService(session)
+                deleted, done = service.purge_project_tasks(project_id, self.batch_size)
+            if deleted:
+                metrics.registry.inc(metrics.PURGE_TASKS_DELETED, amount=deleted)
+            if done:
+                return
+            time.sleep(self.pause)
+    
+    def _run(self) -> None:
+        from app import metrics
+        while not self._stopped.is_set():
+            project_id = self._queue.get()
+            if project_id is None:
+                return
+            try:
+                self.purge(project_id)
+            except Exception as e:
+                # Stays pending, so the next resume retries it
+                click.echo(f"Error purging project {project_id}: {str(e)}")
+            finally:
+                metrics.registry.inc(metrics.PURGE_PENDING, amount=-1)
+    
+    def stop(self) -> None:
+        self._stopped.set()
+        self._queue.put(None)
+
+def purge_pending_projects(batch_size: Optional[int] = None, pause: float = 0.0) -> None:
+    """Complete every pending background deletion in this process"""
+    from app.db.session import db_session
+    from app.services.project_service import ProjectService
+    
+    purger = ProjectPurger(batch_size, pause)
+    with db_session.unit_of_work() as session:
+        pending = ProjectService(session).get_pending_deletions()
+    if not pending:
+        click.echo("No pending project deletions.")
+        return
+    for project_id in pending:
+        started = time.monotonic()
+        purger.purge(project_id)
+        click.echo(f"Purged project {project_id} in {time.monotonic() - started:.1f} s")
@@ -1,11 +1,137 @@
+import heapq
 import schedule
+import threading
 import time
 import click
 import os
 import sys
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 
-def run_scheduler():
+class DeadlineScheduler:
+    """Close overdue tasks at their deadline instead of polling.
+    
+    Open tasks whose deadline falls within the horizon are kept in a min-heap
+    loaded by a deadline range query. The loop sleeps until the earliest
+    deadline or the end of the horizon, whichever comes first, and closes
+    exactly the tasks that are due. The horizon reload picks up writes made
+    by other processes; writes made through TaskService in this process are
+    pushed onto the heap immediately and wake the loop up.
+    """
+    
+    def __init__(self, horizon_seconds: Optional[int] = None):
+        if horizon_seconds is None:
+            horizon_seconds = int(os.getenv('DEADLINE_SCHEDULER_HORIZON_SECONDS', 60))
+        self.horizon = timedelta(seconds=horizon_seconds)
+        self._heap: List[Tuple[datetime, int]] = []
+        self._horizon_end = datetime.min
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+    
+    def notify(self, task_id: int, deadline: Optional[datetime]) -> None:
+        """TaskService listener: schedule a created or edited task"""
+        if deadline is None:
+            return
+        with self._lock:
+            if deadline >= self._horizon_end:
+                return
+            heapq.heappush(self._heap, (deadline, task_id))
+        self._wakeup.set()
+    
+    def reload(self, task_service) -> None:
+        """Replace the heap with the open deadlines up to the new horizon"""
+        horizon_end = datetime.now() + self.horizon
+        # Rows come back ordered by deadline, which is already a valid heap
+        heap = [(deadline, task_id) for task_id, deadline in task_service.get_upcoming_deadlines(horizon_end)]
+        with self._lock:
+            self._heap = heap
+            self._horizon_end = horizon_end
+    
+    def pop_due(self, now: datetime) -> List[int]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+        return due
+    
+    def seconds_until_wakeup(self, now: datetime) -> float:
+        with self._lock:
+            wake_at = self._horizon_end
+            if self._heap and self._heap[0][0] < wake_at:
+                wake_at = self._heap[0][0]
+        return max((wake_at - now).total_seconds(), 0.0)
+    
+    def run_once(self, task_service) -> int:
+        """Reload the horizon if it ran out and close the tasks that are due"""
+        now = datetime.now()
+        if now >= self._horizon_end:
+            self.reload(task_service)
+        
+        due = self.pop_due(now)
+        if not due:
+            return 0
+        
+        # Stale heap entries (edited or already closed tasks) no longer match
+        closed_count, _, _ = task_service.close_overdue_tasks(task_ids=due)
+        return closed_count
+    
+    def run(self) -> None:
+        from app import metrics
+        from app.db.session import db_session
+        from app.services.task_service import TaskService
+        
+        TaskService.add_deadline_listener(self.notify)
+        try:
+            while not self._stopped.is_set():
+                try:
+                    with db_session.unit_of_work() as session:
+                        closed_count = self.run_once(TaskService(session))
+                    if closed_count:
+                        metrics.registry.inc(metrics.AUTOCLOSE_CLOSED, amount=closed_count)
+                        metrics.write_snapshot()
+                        click.echo(f"Closed {closed_count} overdue tasks")
+                except Exception as e:
+                    click.echo(f"Error in deadline scheduler: {str(e)}")
+                
+                self._wakeup.wait(self.seconds_until_wakeup(datetime.now()))
+                self._wakeup.clear()
+        finally:
+            TaskService.remove_deadline_listener(self.notify)
+    
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+
+def run_deadline_scheduler():
+    """Run the deadline-driven scheduler for auto-closing overdue tasks"""
+    from app.commands.autoclose_overdue import autoclose_overdue_tasks
+    
+    deadline_scheduler = DeadlineScheduler()
+    
+    click.echo(
+        "Deadline scheduler started. Closing tasks at their deadline "
+        f"(horizon {int(deadline_scheduler.horizon.total_seconds())} seconds)."
+    )
+    click.echo("Press Ctrl+C to stop.")
+    
+    # Clear the backlog in batches before tracking individual deadlines
+    click.echo("Running initial check...")
+    autoclose_overdue_tasks()
+    
+    try:
+        deadline_scheduler.run()
+    except KeyboardInterrupt:
+        click.echo("Scheduler stopped.")
+
+def run_scheduler(mode: Optional[str] = None):
     """Run the scheduled task for auto-closing overdue tasks"""
+    if mode is None:
+        mode = os.getenv('SCHEDULER_MODE', 'interval')
+    if mode == 'deadline':
+        run_deadline_scheduler()
+        return
+    
     # Import inside function to avoid circular imports
     from app.commands.autoclose_overdue import autoclose_overdue_tasks
     
@@ -28,13 +154,14 @@ def run_scheduler():
     except KeyboardInterrupt:
         click.echo("Scheduler stopped.")
 
-def start_scheduler():
+def start_scheduler(mode: Optional[str] = None):
     """Start the scheduler for auto-closing overdue tasks"""
-    run_scheduler()
+    run_scheduler(mode)
 
 if __name__ == '__main__':
     @click.command()
-    def standalone_scheduler():
-        start_scheduler()
+    @click.option("--mode", type=click.Choice(["interval", "deadline"]), default=None)
+    def standalone_scheduler(mode):
+        start_scheduler(mode)
     
     standalone_scheduler()
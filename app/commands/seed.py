@@ -0,0 +1,164 @@
+import click
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+from app.db.session import db_session
+from app.models.project import Project
+from app.models.quota_counter import QuotaCounter
+from app.models.task import TaskStatus
+from app.repositories.project_repository import ProjectRepository
+from app.repositories.task_repository import TaskRepository
+
+TASK_COLUMNS = ("project_id", "title", "description", "status", "deadline", "created_at", "updated_at", "closed_at")
+
+# Projects per transaction never exceed this, whatever the chunk size
+MAX_PROJECTS_PER_CHUNK = 1000
+
+def generate_task(rng: random.Random, project_id: int, number: int, now: datetime, history_days: int) -> tuple:
+    """One task row (in TASK_COLUMNS order) with a plausible life cycle.
+
+    Tasks are created over the last ``history_days``; a quarter has no
+    deadline, the rest are due a few weeks after creation. Most tasks whose
+    deadline has passed are done, leaving a small overdue backlog for the
+    autoclose job; done tasks always carry ``closed_at``.
+    """
+    created_at = now - timedelta(seconds=rng.random() * history_days * 86400)
+    deadline = None
+    if rng.random() >= 0.25:
+        deadline = created_at + timedelta(days=rng.expovariate(1 / 21))
+
+    roll = rng.random()
+    if deadline is not None and deadline < now:
+        status = TaskStatus.DONE if roll < 0.9 else (TaskStatus.TODO if roll < 0.95 else TaskStatus.DOING)
+    else:
+        status = TaskStatus.TODO if roll < 0.5 else (TaskStatus.DOING if roll < 0.75 else TaskStatus.DONE)
+
+    closed_at = None
+    updated_at = created_at
+    if status is TaskStatus.DONE:
+        latest = min(now, deadline + timedelta(days=2)) if deadline is not None else now
+        closed_at = created_at + (latest - created_at) * rng.random()
+        updated_at = closed_at
+    elif status is TaskStatus.DOING:
+        updated_at = created_at + (now - created_at) * rng.random()
+
+    return (project_id, f"task-{number}", "Seeded task", status, deadline, created_at, updated_at, closed_at)
+
+def _check_limits(session: Session, projects: int, tasks_per_project: int) -> None:
+    max_projects = int(os.getenv('MAX_NUMBER_OF_PROJECTS', 100))
+    max_tasks = int(os.getenv('MAX_NUMBER_OF_TASKS', 1000))
+    existing = ProjectRepository(session).count_for_update()
+    if existing + projects > max_projects:
+        raise click.ClickException(
+            f"{existing} + {projects} projects exceeds MAX_NUMBER_OF_PROJECTS={max_projects} "
+            "(use --ignore-limits to seed anyway)"
+        )
+    if tasks_per_project > max_tasks:
+        raise click.ClickException(
+            f"{tasks_per_project} tasks per project exceeds MAX_NUMBER_OF_TASKS={max_tasks} "
+            "(use --ignore-limits to seed anyway)"
+        )
+
+def seed_database(
+    projects: int,
+    tasks_per_project: int,
+    seed: int = 0,
+    ignore_limits: bool = False,
+    name_prefix: str = "seed",
+    chunk_size: int = 50_000,
+    history_days: int = 365,
+    now: Optional[datetime] = None
+) -> Tuple[int, int]:
+    """Bulk insert synthetic projects and tasks; returns (projects, tasks).
+
+    Rows bypass the services and are written in chunks of about
+    ``chunk_size`` tasks. Every chunk inserts whole projects together with
+    their tasks, ``task_count`` and the project quota counter, and commits,
+    so the counters stay exact even if the run is interrupted. The same
+    seed and ``now`` always produce the same rows.
+    """
+    if db_session.backend == "memory":
+        raise click.ClickException("seed writes to the database; it cannot fill the process-local STORAGE_BACKEND=memory")
+
+    now = now or datetime.now()
+    rng = random.Random(seed)
+    projects_per_chunk = max(1, min(chunk_size // max(tasks_per_project, 1), MAX_PROJECTS_PER_CHUNK))
+
+    if len(f"{name_prefix}-{projects - 1}") > 30:
+        raise click.ClickException("Project names would exceed 30 characters, use a shorter --name-prefix")
+
+    with db_session.unit_of_work() as session:
+        taken = session.execute(
+            select(func.count()).select_from(Project).where(Project.name.like(f"{name_prefix}-%"))
+        ).scalar_one()
+        if taken:
+            raise click.ClickException(
+                f"{taken} projects named '{name_prefix}-*' already exist, use another --name-prefix"
+            )
+        if not ignore_limits:
+            _check_limits(session, projects, tasks_per_project)
+
+    task_number = 0
+    for first in range(0, projects, projects_per_chunk):
+        names = [f"{name_prefix}-{i}" for i in range(first, min(first + projects_per_chunk, projects))]
+        with db_session.unit_of_work() as session:
+            # Creates the counter row if the database was not migrated
+            ProjectRepository(session).count_for_update()
+            session.execute(insert(Project), [
+                {
+                    "name": name,
+                    "description": "Seeded project",
+                    "created_at": now - timedelta(days=history_days),
+                    "updated_at": now,
+                    "task_count": tasks_per_project,
+                }
+                for name in names
+            ])
+            session.execute(
+                update(QuotaCounter)
+                .where(QuotaCounter.name == QuotaCounter.PROJECTS)
+                .values(value=QuotaCounter.value + len(names))
+            )
+            project_ids = session.execute(
+                select(Project.id).where(Project.name.in_(names)).order_by(Project.id)
+            ).scalars().all()
+
+            rows = []
+            for project_id in project_ids:
+                for _ in range(tasks_per_project):
+                    rows.append(generate_task(rng, project_id, task_number, now, history_days))
+                    task_number += 1
+            TaskRepository(session).insert_rows(TASK_COLUMNS, rows)
+
+        click.echo(f"Seeded {first + len(names)}/{projects} projects, {task_number} tasks")
+
+    return projects, task_number
+
+@click.command()
+@click.option("--projects", type=int, required=True, help="Number of projects to create")
+@click.option("--tasks-per-project", type=int, required=True, help="Number of tasks per project")
+@click.option("--seed", "seed", type=int, default=0, show_default=True, help="Random seed")
+@click.option("--ignore-limits", is_flag=True, help="Bypass MAX_NUMBER_OF_PROJECTS and MAX_NUMBER_OF_TASKS")
+@click.option("--name-prefix", default="seed", show_default=True, help="Projects are named <prefix>-<n>")
+@click.option("--chunk-size", type=int, default=50_000, show_default=True, help="Tasks per transaction")
+@click.option("--as-of", type=click.DateTime(), default=None, help="Reference time for generated dates (default: now)")
+def seed(projects, tasks_per_project, seed, ignore_limits, name_prefix, chunk_size, as_of):
+    """Command to bulk insert synthetic projects and tasks"""
+    started = time.monotonic()
+    project_count, task_count = seed_database(
+        projects=projects,
+        tasks_per_project=tasks_per_project,
+        seed=seed,
+        ignore_limits=ignore_limits,
+        name_prefix=name_prefix,
+        chunk_size=chunk_size,
+        now=as_of
+    )
+    click.echo(f"Seeded {project_count} projects and {task_count} tasks in {time.monotonic() - started:.1f} s")
+
+if __name__ == '__main__':
+    seed()
@@ -0,0 +1,47 @@
+import click
+import os
+from typing import Optional
+from app.db.durable_storage import DurableStorage
+
+def _size(num_bytes: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+def storage_stats(directory: Optional[str] = None) -> None:
+    """Print sizes, recovery time and write amplification of a durable memory storage.
+
+    Recovers a read-only copy, so it works while a server owns the directory
+    (a record being written at that moment is simply not counted).
+    """
+    directory = directory or os.getenv("MEMORY_STORAGE_DIR")
+    if not directory:
+        raise click.ClickException("No storage directory, pass --dir or set MEMORY_STORAGE_DIR")
+    if not os.path.isdir(directory):
+        raise click.ClickException(f"Storage directory '{directory}' does not exist")
+
+    storage = DurableStorage(directory, read_only=True)
+    stats = storage.recovery_stats
+
+    click.echo(f"Directory: {directory} (generation {storage.generation})")
+    click.echo(f"Contents: {len(storage.projects)} projects, {len(storage.tasks)} tasks")
+    if stats["snapshot"]:
+        click.echo(f"Snapshot: {os.path.basename(stats['snapshot'])}, {_size(stats['snapshot_bytes'])}")
+    else:
+        click.echo("Snapshot: none yet")
+    click.echo(
+        f"Log: {stats['log_files']} file(s), {_size(stats['log_tail_bytes'])}, {stats['log_records']} commits"
+        + (f", {stats['truncated_bytes']} bytes of torn tail" if stats["truncated_bytes"] else "")
+    )
+    click.echo(
+        f"Recovery: {stats['recovery_seconds'] * 1000:.1f} ms "
+        f"(snapshot load {stats['snapshot_seconds'] * 1000:.1f} ms, log replay {stats['replay_seconds'] * 1000:.1f} ms)"
+    )
+    click.echo(
+        f"Written since creation: {_size(storage.logical_bytes)} committed, "
+        f"{_size(storage.log_bytes)} to logs, {_size(storage.snapshot_bytes)} to snapshots"
+    )
+    if storage.logical_bytes:
+        amplification = (storage.log_bytes + storage.snapshot_bytes) / storage.logical_bytes
+        click.echo(f"Write amplification: {amplification:.2f}x")
@@ -1,5 +1,7 @@
 from app.models.base import Base
 from app.models.project import Project
 from app.models.task import Task
+from app.models.quota_counter import QuotaCounter
+from app.models.project_deletion import ProjectDeletion
 
-__all__ = ["Base", "Project", "Task"]
\ No newline at end of file
+__all__ = ["Base", "Project", "Task", "QuotaCounter", "ProjectDeletion"]
\ No newline at end of file
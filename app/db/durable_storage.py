@@ -0,0 +1,447 @@
+import atexit
+import fcntl
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from app.db.in_memory_storage import InMemoryStorage
+from app.models.project import Project
+from app.models.task import Task, TaskStatus
+
+# Binary encoding shared by the log and the snapshots. Datetimes are
+# microseconds since 1970-01-01 (naive, like the models), NULL is INT64_MIN.
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NULL_TIME = -(2 ** 63)
+_STATUSES = list(TaskStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+
+_OP = struct.Struct("<B")
+_ID = struct.Struct("<q")
+_TEXT = struct.Struct("<I")
+# id, created_at, updated_at, task_count; then name, description
+_PROJECT = struct.Struct("<qqqq")
+# id, project_id, status, deadline, created_at, updated_at, closed_at; then title, description
+_TASK = struct.Struct("<qqBqqqq")
+# payload length, crc32 of the payload
+_RECORD_HEADER = struct.Struct("<II")
+
+_SNAPSHOT_MAGIC = b"TDLSNAP1"
+# generation, last project id, last task id, projects, tasks,
+# then the cumulative logical, log and snapshot bytes written before it
+_SNAPSHOT_HEADER = struct.Struct("<qqqqqqqq")
+# crc32 of everything before it
+_SNAPSHOT_TRAILER = struct.Struct("<I")
+
+_OPERATIONS = {"put_project": 0, "remove_project": 1, "put_task": 2, "remove_task": 3}
+_SNAPSHOT_FILE = re.compile(r"^snapshot-(\d+)\.bin$")
+_LOG_FILE = re.compile(r"^log-(\d+)\.wal$")
+
+def _encode_time(value: Optional[datetime]) -> int:
+    return _NULL_TIME if value is None else (value - _EPOCH) // _MICROSECOND
+
+def _decode_time(value: int) -> Optional[datetime]:
+    return None if value == _NULL_TIME else _EPOCH + value * _MICROSECOND
+
+def _encode_text(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return _TEXT.pack(len(data)) + data
+
+def _decode_text(buffer, offset: int) -> Tuple[str, int]:
+    (length,) = _TEXT.unpack_from(buffer, offset)
+    start = offset + _TEXT.size
+    return bytes(buffer[start:start + length]).decode("utf-8"), start + length
+
+def encode_project(project: Project) -> bytes:
+    return (
+        _PROJECT.pack(
+            project.id,
+            _encode_time(project.created_at),
+            _encode_time(project.updated_at),
+            project.task_count,
+        )
+        + _encode_text(project.name)
+        + _encode_text(project.description)
+    )
+
+def decode_project(buffer, offset: int) -> Tuple[Project, int]:
+    id, created_at, updated_at, task_count = _PROJECT.unpack_from(buffer, offset)
+    name, offset = _decode_text(buffer, offset + _PROJECT.size)
+    description, offset = _decode_text(buffer, offset)
+    project = Project(
+        id=id,
+        name=name,
+        description=description,
+        created_at=_decode_time(created_at),
+        updated_at=_decode_time(updated_at),
+        task_count=task_count,
+    )
+    return project, offset
+
+def encode_task(task: Task) -> bytes:
+    return (
+        _TASK.pack(
+            task.id,
+            task.project_id,
+            _STATUS_CODES[task.status],
+            _encode_time(task.deadline),
+            _encode_time(task.created_at),
+            _encode_time(task.updated_at),
+            _encode_time(task.closed_at),
+        )
+        + _encode_text(task.title)
+        + _encode_text(task.description)
+    )
+
+def decode_task(buffer, offset: int) -> Tuple[Task, int]:
+    id, project_id, status, deadline, created_at, updated_at, closed_at = _TASK.unpack_from(buffer, offset)
+    title, offset = _decode_text(buffer, offset + _TASK.size)
+    description, offset = _decode_text(buffer, offset)
+    task = Task(
+        id=id,
+        project_id=project_id,
+        title=title,
+        description=description,
+        status=_STATUSES[status],
+        deadline=_decode_time(deadline),
+        created_at=_decode_time(created_at),
+        updated_at=_decode_time(updated_at),
+        closed_at=_decode_time(closed_at),
+    )
+    return task, offset
+
+def encode_changes(changes: List[Tuple[str, object]]) -> bytes:
+    """Payload of one log record: the writes of one committed session"""
+    parts = []
+    for operation, value in changes:
+        code = _OPERATIONS[operation]
+        parts.append(_OP.pack(code))
+        if operation == "put_project":
+            parts.append(encode_project(value))
+        elif operation == "put_task":
+            parts.append(encode_task(value))
+        else:
+            parts.append(_ID.pack(value))
+    return b"".join(parts)
+
+def _read_log(buffer) -> Tuple[List[bytes], int]:
+    """Complete, intact record payloads and the offset just past the last one"""
+    payloads = []
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(buffer):
+        length, crc = _RECORD_HEADER.unpack_from(buffer, offset)
+        start = offset + _RECORD_HEADER.size
+        payload = bytes(buffer[start:start + length])
+        # A torn or corrupt tail is where the last crash interrupted a write
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        payloads.append(payload)
+        offset = start + length
+    return payloads, offset
+
+def _fsync_directory(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class DurableStorage(InMemoryStorage):
+    """InMemoryStorage that survives restarts.
+
+    Every commit appends one CRC-checked record with the session's writes
+    to ``log-<generation>.wal``. The write reaches the OS before the commit
+    returns (surviving a process crash); a background thread fsyncs the log
+    every ``fsync_interval`` seconds, which bounds what a power loss can
+    take. Every ``snapshot_interval`` seconds (if the log grew) the log is
+    rotated to the next generation and a compact binary snapshot of the
+    state at that point is written next to it; older files are then
+    deleted. Recovery memory-maps the newest snapshot and replays the logs
+    of its generation and later, dropping a torn tail record; the logs
+    after a torn one are dropped too, so the state is always a prefix of
+    the commits.
+
+    A directory belongs to one process at a time (an exclusive flock);
+    ``read_only`` opens only recover, for inspecting a live directory.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fsync_interval: Optional[float] = None,
+        snapshot_interval: Optional[float] = None,
+        read_only: bool = False
+    ):
+        super().__init__()
+        self.directory = directory
+        self.fsync_interval = fsync_interval if fsync_interval is not None else float(
+            os.getenv("MEMORY_STORAGE_FSYNC_INTERVAL", 0.05)
+        )
+        self.snapshot_interval = snapshot_interval if snapshot_interval is not None else float(
+            os.getenv("MEMORY_STORAGE_SNAPSHOT_SECONDS", 300)
+        )
+        self.read_only = read_only
+        self.generation = 0
+        # Cumulative bytes: committed payloads, written to logs, written to snapshots
+        self.logical_bytes = 0
+        self.log_bytes = 0
+        self.snapshot_bytes = 0
+        self._log_fd: Optional[int] = None
+        self._log_size = 0
+        self._dirty = False
+        self._log_lock = threading.Lock()
+        # Held by sync() and while a rotated log is fsynced, so a new log is
+        # never synced before the one it replaced
+        self._sync_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._lock_file = None
+
+        if not read_only:
+            os.makedirs(directory, exist_ok=True)
+            self._lock_file = open(os.path.join(directory, "LOCK"), "w")
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._lock_file.close()
+                raise RuntimeError(f"Storage directory '{directory}' is in use by another process")
+
+        self.recovery_stats = self._recover()
+
+        if not read_only:
+            self._open_log(self.generation)
+            threading.Thread(target=self._flush_loop, name="storage-fsync", daemon=True).start()
+            threading.Thread(target=self._snapshot_loop, name="storage-snapshot", daemon=True).start()
+            atexit.register(self.close)
+
+    def _files(self, pattern) -> Dict[int, str]:
+        if not os.path.isdir(self.directory):
+            return {}
+        files = {}
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                files[int(match.group(1))] = os.path.join(self.directory, name)
+        return files
+
+    def _recover(self) -> dict:
+        started = time.perf_counter()
+        stats = {
+            "snapshot": None,
+            "snapshot_bytes": 0,
+            "log_files": 0,
+            "log_tail_bytes": 0,
+            "log_records": 0,
+            "truncated_bytes": 0,
+        }
+
+        snapshots = self._files(_SNAPSHOT_FILE)
+        if snapshots:
+            self.generation = max(snapshots)
+            stats["snapshot"] = snapshots[self.generation]
+            stats["snapshot_bytes"] = self._load_snapshot(snapshots[self.generation])
+        stats["snapshot_seconds"] = time.perf_counter() - started
+
+        logs = self._files(_LOG_FILE)
+        generations = sorted(g for g in logs if g >= self.generation)
+        for index, generation in enumerate(generations):
+            path = logs[generation]
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    payloads, end = [], 0
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                        payloads, end = _read_log(buffer)
+            for payload in payloads:
+                self._replay(payload)
+                self.logical_bytes += len(payload)
+            self.log_bytes += end
+            self.generation = generation
+            stats["log_files"] += 1
+            stats["log_tail_bytes"] += end
+            stats["log_records"] += len(payloads)
+            if end < size:
+                stats["truncated_bytes"] += size - end
+                # Later logs were never synced (see _sync_lock); replaying
+                # them after the gap would apply commits out of order
+                later = [logs[g] for g in generations[index + 1:]]
+                stats["truncated_bytes"] += sum(os.path.getsize(p) for p in later)
+                if not self.read_only:
+                    os.truncate(path, end)
+                    for later_path in later:
+                        os.remove(later_path)
+                break
+
+        stats["recovery_seconds"] = time.perf_counter() - started
+        stats["replay_seconds"] = stats["recovery_seconds"] - stats["snapshot_seconds"]
+        return stats
+
+    def _load_snapshot(self, path: str) -> int:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            body_end = len(buffer) - _SNAPSHOT_TRAILER.size
+            (crc,) = _SNAPSHOT_TRAILER.unpack_from(buffer, body_end)
+            with memoryview(buffer) as view:
+                intact = buffer[:len(_SNAPSHOT_MAGIC)] == _SNAPSHOT_MAGIC and zlib.crc32(view[:body_end]) == crc
+            if not intact:
+                raise RuntimeError(f"Snapshot '{path}' is corrupt")
+
+            offset = len(_SNAPSHOT_MAGIC)
+            (
+                _, self.last_project_id, self.last_task_id, project_count, task_count,
+                self.logical_bytes, self.log_bytes, self.snapshot_bytes
+            ) = _SNAPSHOT_HEADER.unpack_from(buffer, offset)
+            offset += _SNAPSHOT_HEADER.size
+            for _ in range(project_count):
+                project, offset = decode_project(buffer, offset)
+                self.put_project(project)
+            for _ in range(task_count):
+                task, offset = decode_task(buffer, offset)
+                self.put_task(task)
+            self.snapshot_bytes += len(buffer)
+            return len(buffer)
+
+    def _replay(self, payload: bytes) -> None:
+        offset = 0
+        while offset < len(payload):
+            (code,) = _OP.unpack_from(payload, offset)
+            offset += _OP.size
+            if code == _OPERATIONS["put_project"]:
+                project, offset = decode_project(payload, offset)
+                self.put_project(project)
+                self.last_project_id = max(self.last_project_id, project.id)
+            elif code == _OPERATIONS["put_task"]:
+                task, offset = decode_task(payload, offset)
+                self.put_task(task)
+                self.last_task_id = max(self.last_task_id, task.id)
+            else:
+                (id,) = _ID.unpack_from(payload, offset)
+                offset += _ID.size
+                if code == _OPERATIONS["remove_project"]:
+                    self.remove_project(id)
+                else:
+                    self.remove_task(id)
+
+    def _open_log(self, generation: int) -> None:
+        self._retire_log(self._swap_log(generation))
+
+    def _swap_log(self, generation: int) -> Optional[int]:
+        """Append commits to the log of ``generation`` from now on; returns the previous log's fd"""
+        path = os.path.join(self.directory, f"log-{generation:010d}.wal")
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        with self._log_lock:
+            old_fd, self._log_fd = self._log_fd, fd
+            self._log_size = os.fstat(fd).st_size
+            self._dirty = False
+        return old_fd
+
+    def _retire_log(self, old_fd: Optional[int]) -> None:
+        """fsync and close the log _swap_log replaced, and the directory entry of the new one"""
+        with self._sync_lock:
+            if old_fd is not None:
+                os.fsync(old_fd)
+                os.close(old_fd)
+            _fsync_directory(self.directory)
+
+    def commit_changes(self, changes: List[Tuple[str, object]]) -> None:
+        payload = encode_changes(changes)
+        record = _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._log_lock:
+            written = 0
+            while written < len(record):
+                written += os.write(self._log_fd, record[written:])
+            self._log_size += len(record)
+            self._dirty = True
+        self.logical_bytes += len(payload)
+        self.log_bytes += len(record)
+
+    def sync(self) -> None:
+        """fsync the log if anything was appended since the last sync"""
+        with self._sync_lock:
+            with self._log_lock:
+                if not self._dirty or self._log_fd is None:
+                    return
+                # fsync a duplicate outside the lock so commits never wait for the disk
+                fd = os.dup(self._log_fd)
+                self._dirty = False
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def snapshot(self) -> int:
+        """Rotate the log and write a snapshot of the state at the rotation; returns its size"""
+        # Only shallow copies and the log swap happen under the lock; writers
+        # never wait for the disk
+        with self.lock:
+            generation = self.generation + 1
+            projects = list(self.projects.values())
+            task_map = self.tasks.copy()
+            task_ids = [list(ids) for ids in self.project_tasks.values()]
+            header = _SNAPSHOT_HEADER.pack(
+                generation, self.last_project_id, self.last_task_id, len(projects), len(task_map),
+                self.logical_bytes, self.log_bytes, self.snapshot_bytes
+            )
+            old_fd = self._swap_log(generation)
+            self.generation = generation
+        self._retire_log(old_fd)
+
+        # Entities are never modified in place, so the copies stay consistent;
+        # tasks go out in each project's order, which loading restores
+        tasks = [task_map[id] for ids in task_ids for id in ids]
+        del task_map, task_ids
+        path = os.path.join(self.directory, f"snapshot-{generation:010d}.bin")
+        tmp_path = f"{path}.tmp"
+        crc = 0
+        size = 0
+        with open(tmp_path, "wb") as f:
+            def write(chunk: bytes) -> None:
+                nonlocal crc, size
+                f.write(chunk)
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+
+            write(_SNAPSHOT_MAGIC + header)
+            for start in range(0, len(projects), 10_000):
+                write(b"".join(encode_project(project) for project in projects[start:start + 10_000]))
+            for start in range(0, len(tasks), 10_000):
+                write(b"".join(encode_task(task) for task in tasks[start:start + 10_000]))
+            f.write(_SNAPSHOT_TRAILER.pack(crc))
+            size += _SNAPSHOT_TRAILER.size
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_directory(self.directory)
+        self.snapshot_bytes += size
+
+        for pattern in (_SNAPSHOT_FILE, _LOG_FILE):
+            for old_generation, old_path in self._files(pattern).items():
+                if old_generation < generation:
+                    os.remove(old_path)
+        return size
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.fsync_interval):
+            self.sync()
+
+    def _snapshot_loop(self) -> None:
+        while not self._closed.wait(self.snapshot_interval):
+            if self._log_size > 0:
+                self.snapshot()
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self.read_only:
+            return
+        self.sync()
+        with self._log_lock:
+            if self._log_fd is not None:
+                os.close(self._log_fd)
+                self._log_fd = None
+        self._lock_file.close()
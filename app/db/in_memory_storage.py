@@ -1,84 +1,274 @@
-from typing import Dict, List, Optional
+import heapq
+import itertools
+import threading
 from datetime import datetime
-import os
-from dotenv import load_dotenv
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from sqlalchemy import inspect
+from app.models.project import Project
+from app.models.task import Task, TaskStatus
 
-from ..core.entities.project import Project
-from ..core.entities.task import Task, TaskStatus
-from ..exceptions.exceptions import LimitExceededError
+EntityType = TypeVar("EntityType", Project, Task)
 
-load_dotenv()
+def _column_values(entity) -> Dict[str, object]:
+    return {attr.key: getattr(entity, attr.key) for attr in inspect(type(entity)).column_attrs}
+
+def detached_copy(entity: EntityType) -> EntityType:
+    """Copy of a project or task (column values only) for the storage to keep"""
+    return type(entity)(**_column_values(entity))
+
+def copy_entity(entity: EntityType) -> EntityType:
+    """Copy handed to a caller; remembers its values so ``apply_changes`` can find edits"""
+    values = _column_values(entity)
+    copy = type(entity)(**values)
+    copy._loaded_values = values
+    return copy
+
+def apply_changes(current: EntityType, changed: EntityType) -> EntityType:
+    """New version of ``current`` with the columns ``changed`` modified since it was copied.
+
+    Like an ORM flush, which only writes dirty columns, this keeps
+    concurrent changes to the other columns (such as ``task_count``).
+    """
+    loaded = getattr(changed, "_loaded_values", None)
+    if current is None or loaded is None:
+        return detached_copy(changed)
+    merged = detached_copy(current)
+    for key, value in _column_values(changed).items():
+        if value != loaded[key]:
+            setattr(merged, key, value)
+    return merged
+
+def _sort_key(entity) -> Tuple[datetime, int]:
+    return (entity.created_at, entity.id)
+
+def _is_open(task: Task) -> bool:
+    return task.deadline is not None and task.status != TaskStatus.DONE and task.closed_at is None
 
 class InMemoryStorage:
+    """Projects and tasks of one process, indexed for the repository queries.
+
+    Stored entities are never modified in place: every write stores a new
+    object. Readers therefore need no lock; they see each entity either
+    before or after a write, and must treat it as read-only (the
+    repositories hand out copies of anything a service may modify).
+
+    Indexes:
+    - ``projects`` and ``project_tasks[project_id]`` are dicts used as
+      insertion-ordered sets, kept in (created_at, id) order, so listing and
+      keyset pagination need no sorting and deletes are O(1)
+    - ``project_ids_by_name`` for the unique-name check
+    - a min-heap of (deadline, seq, task_id) over open tasks with a deadline.
+      Entries are invalidated lazily: only the entry recorded in
+      ``_deadline_entries`` for a task is live.
+    """
+
     def __init__(self):
-        self._projects: Dict[str, Project] = {}
-        self._tasks: Dict[str, Task] = {}
-        self._project_tasks: Dict[str, List[str]] = {}
-        
-        self.max_projects = int(os.getenv('MAX_NUMBER_OF_PROJECTS', 100))
-        self.max_tasks_per_project = int(os.getenv('MAX_NUMBER_OF_TASKS', 1000))
-    
-    def create_project(self, project: Project) -> None:
-        if len(self._projects) >= self.max_projects:
-            raise LimitExceededError(f"Cannot exceed maximum of {self.max_projects} projects")
-        
-        self._projects[project.id] = project
-        self._project_tasks[project.id] = []
-    
-    def get_project(self, project_id: str) -> Optional[Project]:
-        return self._projects.get(project_id)
-    
-    def get_all_projects(self) -> List[Project]:
-        return sorted(
-            list(self._projects.values()), 
-            key=lambda p: p.created_at
-        )
-    
-    def update_project(self, project: Project) -> None:
-        if project.id in self._projects:
-            self._projects[project.id] = project
-    
-    def delete_project(self, project_id: str) -> None:
-        if project_id in self._projects:
-            task_ids = self._project_tasks.get(project_id, [])
-            for task_id in task_ids:
-                del self._tasks[task_id]
-            
-            del self._projects[project_id]
-            del self._project_tasks[project_id]
-    
-    def project_name_exists(self, name: str, exclude_project_id: str = None) -> bool:
-        for project in self._projects.values():
-            if project.name == name and project.id != exclude_project_id:
-                return True
-        return False
-    
-    def create_task(self, task: Task) -> None:
-        project_tasks = self._project_tasks.get(task.project_id, [])
-        if len(project_tasks) >= self.max_tasks_per_project:
-            raise LimitExceededError(f"Cannot exceed maximum of {self.max_tasks_per_project} tasks per project")
-        
-        self._tasks[task.id] = task
-        self._project_tasks[task.project_id].append(task.id)
-    
-    def get_task(self, task_id: str) -> Optional[Task]:
-        return self._tasks.get(task_id)
-    
-    def get_project_tasks(self, project_id: str) -> List[Task]:
-        task_ids = self._project_tasks.get(project_id, [])
-        tasks = [self._tasks[task_id] for task_id in task_ids if task_id in self._tasks]
-        return sorted(tasks, key=lambda t: t.created_at)
-    
-    def update_task(self, task: Task) -> None:
-        if task.id in self._tasks:
-            self._tasks[task.id] = task
-    
-    def delete_task(self, task_id: str) -> None:
-        if task_id in self._tasks:
-            task = self._tasks[task_id]
-            if task.project_id in self._project_tasks:
-                self._project_tasks[task.project_id] = [
-                    tid for tid in self._project_tasks[task.project_id] 
-                    if tid != task_id
-                ]
-            del self._tasks[task_id]
\ No newline at end of file
+        # Held by a session from its first write until commit or rollback;
+        # the deadline heap is only touched while holding it
+        self.lock = threading.Lock()
+        self.projects: Dict[int, Project] = {}
+        self.project_ids_by_name: Dict[str, int] = {}
+        self.tasks: Dict[int, Task] = {}
+        self.project_tasks: Dict[int, Dict[int, None]] = {}
+        self._deadline_heap: List[Tuple[datetime, int, int]] = []
+        self._deadline_entries: Dict[int, Tuple[datetime, int]] = {}
+        self._heap_seq = itertools.count()
+        self.last_project_id = 0
+        self.last_task_id = 0
+
+    # ID allocation and every put/remove happen under ``lock``
+
+    def next_project_id(self) -> int:
+        self.last_project_id += 1
+        return self.last_project_id
+
+    def next_task_id(self) -> int:
+        self.last_task_id += 1
+        return self.last_task_id
+
+    def commit_changes(self, changes: List[Tuple[str, object]]) -> None:
+        """Called with a session's writes, in order, before its commit releases the lock"""
+
+    def close(self) -> None:
+        pass
+
+    def put_project(self, project: Project) -> None:
+        old = self.projects.get(project.id)
+        if old is not None and old.name != project.name:
+            del self.project_ids_by_name[old.name]
+        self.project_ids_by_name[project.name] = project.id
+        if old is None:
+            self.project_tasks.setdefault(project.id, {})
+        self.projects[project.id] = project
+        if old is None:
+            self.projects = self._keep_ordered(self.projects, self.projects)
+
+    def remove_project(self, project_id: int) -> None:
+        project = self.projects.pop(project_id)
+        del self.project_ids_by_name[project.name]
+        del self.project_tasks[project_id]
+
+    def put_task(self, task: Task) -> None:
+        old = self.tasks.get(task.id)
+        self.tasks[task.id] = task
+        if old is None:
+            ids = self.project_tasks[task.project_id]
+            ids[task.id] = None
+            self.project_tasks[task.project_id] = self._keep_ordered(ids, self.tasks)
+
+        if _is_open(task):
+            entry = self._deadline_entries.get(task.id)
+            if entry is None or entry[0] != task.deadline:
+                seq = next(self._heap_seq)
+                self._deadline_entries[task.id] = (task.deadline, seq)
+                heapq.heappush(self._deadline_heap, (task.deadline, seq, task.id))
+                self._compact_heap()
+        else:
+            self._deadline_entries.pop(task.id, None)
+
+    def remove_task(self, task_id: int) -> None:
+        task = self.tasks.pop(task_id)
+        del self.project_tasks[task.project_id][task_id]
+        self._deadline_entries.pop(task_id, None)
+
+    def _keep_ordered(self, ids: Dict[int, object], entities: Dict[int, object]) -> Dict[int, object]:
+        """Re-sort ``ids`` only when its newest key broke the (created_at, id) order"""
+        if len(ids) < 2:
+            return ids
+        keys = reversed(ids)
+        last, previous = next(keys), next(keys)
+        if _sort_key(entities[previous]) <= _sort_key(entities[last]):
+            return ids
+        return {key: ids[key] for key in sorted(ids, key=lambda key: _sort_key(entities[key]))}
+
+    def page(
+        self,
+        ids: Iterable[int],
+        entities: Dict[int, EntityType],
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None
+    ) -> List[EntityType]:
+        """Up to ``limit`` entities of the ordered ``ids`` that come after ``after``"""
+        # list() copies atomically, so concurrent writers cannot break the iteration
+        rows = (entity for entity in map(entities.get, list(ids)) if entity is not None)
+        if after is not None:
+            rows = itertools.dropwhile(lambda entity: _sort_key(entity) <= after, rows)
+        if limit is not None:
+            rows = itertools.islice(rows, limit)
+        return list(rows)
+
+    def due_task_ids(self, until: datetime, limit: Optional[int] = None) -> List[int]:
+        """IDs of open tasks with a deadline before ``until``, earliest first"""
+        heap = self._deadline_heap
+        live = []
+        while heap and heap[0][0] < until and (limit is None or len(live) < limit):
+            deadline, seq, task_id = heapq.heappop(heap)
+            if self._deadline_entries.get(task_id) == (deadline, seq):
+                live.append((deadline, seq, task_id))
+        for entry in live:
+            heapq.heappush(heap, entry)
+        return [task_id for _, _, task_id in live]
+
+    def _compact_heap(self) -> None:
+        # Stale entries are dropped lazily; rebuild once they dominate the heap
+        if len(self._deadline_heap) > 2 * len(self._deadline_entries) + 1024:
+            self._deadline_heap = [
+                (deadline, seq, task_id) for task_id, (deadline, seq) in self._deadline_entries.items()
+            ]
+            heapq.heapify(self._deadline_heap)
+
+class InMemorySession:
+    """Unit of work over an InMemoryStorage, used where a SQLAlchemy Session would be.
+
+    The first write (or ``lock``) takes the storage lock and holds it until
+    ``commit`` or ``rollback``, so writers are serialized. Reads take no
+    lock and may see another session's uncommitted write. Every write
+    records how to undo itself, and ``rollback`` replays the undo log
+    backwards.
+    """
+
+    def __init__(self, storage: InMemoryStorage):
+        self.storage = storage
+        self._holds_lock = False
+        self._undo: List[Callable[[], None]] = []
+        # (operation, entity or ID), for storages that persist commits
+        self._changes: List[Tuple[str, object]] = []
+        self._after_commit: List[Callable[["InMemorySession"], None]] = []
+
+    def lock(self) -> None:
+        if not self._holds_lock:
+            self.storage.lock.acquire()
+            self._holds_lock = True
+
+    def put_project(self, project: Project) -> None:
+        self.lock()
+        old = self.storage.projects.get(project.id)
+        self.storage.put_project(project)
+        if old is None:
+            self._undo.append(lambda: self.storage.remove_project(project.id))
+        else:
+            self._undo.append(lambda: self.storage.put_project(old))
+        self._changes.append(("put_project", project))
+
+    def remove_project(self, project_id: int) -> None:
+        self.lock()
+        for task_id in list(self.storage.project_tasks[project_id]):
+            self.remove_task(task_id)
+        old = self.storage.projects[project_id]
+        self.storage.remove_project(project_id)
+        self._undo.append(lambda: self.storage.put_project(old))
+        self._changes.append(("remove_project", project_id))
+
+    def put_task(self, task: Task) -> None:
+        self.lock()
+        old = self.storage.tasks.get(task.id)
+        self.storage.put_task(task)
+        if old is None:
+            self._undo.append(lambda: self.storage.remove_task(task.id))
+        else:
+            self._undo.append(lambda: self.storage.put_task(old))
+        self._changes.append(("put_task", task))
+
+    def remove_task(self, task_id: int) -> None:
+        self.lock()
+        old = self.storage.tasks[task_id]
+        self.storage.remove_task(task_id)
+        self._undo.append(lambda: self.storage.put_task(old))
+        self._changes.append(("remove_task", task_id))
+
+    def after_commit(self, callback: Callable[["InMemorySession"], None]) -> None:
+        """Run ``callback(session)`` once, after the next successful commit"""
+        self._after_commit.append(callback)
+
+    def flush(self) -> None:
+        pass
+
+    def commit(self) -> None:
+        if self._changes:
+            try:
+                self.storage.commit_changes(self._changes)
+            except Exception:
+                self.rollback()
+                raise
+        self._changes = []
+        self._undo.clear()
+        self._release()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback(self)
+
+    def rollback(self) -> None:
+        for undo in reversed(self._undo):
+            undo()
+        self._undo.clear()
+        self._changes = []
+        self._after_commit.clear()
+        self._release()
+
+    def close(self) -> None:
+        self.rollback()
+
+    def _release(self) -> None:
+        if self._holds_lock:
+            self._holds_lock = False
+            self.storage.lock.release()
@@ -0,0 +1,63 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryStats:
+    """Statements executed while tracking, with their total and slowest time"""
+    __slots__ = ("count", "total_time", "slowest_time", "slowest_statement")
+    
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+    
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+# Set per request; worker threads get a copy of the context, so they share the object
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect QueryStats for every statement executed inside the block"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on ``engine`` into the active QueryStats, if any"""
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, time.perf_counter() - started)
+    
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute; without this
+        # its start time would stay on the pooled connection
+        conn = exception_context.connection
+        starts = conn.info.get("query_start_time") if conn is not None else None
+        if not starts:
+            return
+        started = starts.pop()
+        stats = _current_stats.get()
+        if stats is not None and exception_context.statement is not None:
+            stats.record(exception_context.statement, time.perf_counter() - started)
@@ -1,12 +1,52 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, TypeVar
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+import importlib
+import itertools
+import logging
 import os
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
+ResultType = TypeVar("ResultType")
+
+logger = logging.getLogger(__name__)
+
+# Backend name -> (driver module, async drivername) for the API's async engine
+ASYNC_DRIVERS = {
+    "postgresql": ("asyncpg", "postgresql+asyncpg"),
+    "sqlite": ("aiosqlite", "sqlite+aiosqlite"),
+}
+
+def enable_sqlite_foreign_keys(engine: Engine) -> None:
+    """Have SQLite enforce foreign keys, so ON DELETE CASCADE deletes a project's tasks"""
+    if engine.dialect.name != "sqlite":
+        return
+    
+    @event.listens_for(engine, "connect")
+    def set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 class DatabaseSession:
     def __init__(self):
+        # "sql" (default) or "memory": a process-local store without a database
+        self.backend = os.getenv("STORAGE_BACKEND", "sql").lower()
+        if self.backend not in ("sql", "memory"):
+            raise ValueError(f"Unknown STORAGE_BACKEND '{self.backend}', expected 'sql' or 'memory'")
+        # With MEMORY_STORAGE_DIR the memory backend persists to a log and snapshots
+        self.storage_dir = os.getenv("MEMORY_STORAGE_DIR") or None
+        self._storage = None
+        self._storage_lock = threading.Lock()
+        if self.backend == "memory":
+            logger.info("Storage backend: memory%s", f" (durable in {self.storage_dir})" if self.storage_dir else "")
+        
         self.database_url = os.getenv("DATABASE_URL")
         
         # Provide a default SQLite URL if DATABASE_URL is not set
@@ -17,14 +57,205 @@ class DatabaseSession:
         print(f"Database URL: {self.database_url}")  # Debug line
         
         self.engine = create_engine(self.database_url)
+        enable_sqlite_foreign_keys(self.engine)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        
+        # Async engine for the API; the CLI and schedulers keep the sync engine
+        self.async_engine = None
+        self.AsyncSessionLocal = None
+        if self.backend == "sql" and os.getenv("ASYNC_DATABASE", "true").lower() == "true":
+            self.async_engine, self.AsyncSessionLocal = self._create_async_engine(self.database_url)
+        
+        # Read replicas (comma-separated DATABASE_REPLICA_URLS) for read-only API
+        # sessions, used round-robin. Each gets the async driver when the primary does.
+        self.replica_engines = []
+        self.replica_sessions = []
+        self.async_replica_engines = []
+        self._replica_counter = itertools.count()
+        replica_urls = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+        if self.backend == "sql":
+            for replica_url in replica_urls:
+                async_engine, async_sessions = (
+                    self._create_async_engine(replica_url) if self.async_engine is not None else (None, None)
+                )
+                if async_engine is not None:
+                    self.async_replica_engines.append(async_engine)
+                    self.replica_engines.append(async_engine.sync_engine)
+                    self.replica_sessions.append(async_sessions)
+                else:
+                    engine = create_engine(replica_url)
+                    enable_sqlite_foreign_keys(engine)
+                    self.replica_engines.append(engine)
+                    self.replica_sessions.append(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+            if replica_urls:
+                logger.info("Read replicas: %d", len(replica_urls))
+    
+    def _create_async_engine(self, database_url: str):
+        """``(AsyncEngine, async_sessionmaker)`` for the URL, or ``(None, None)`` without an async driver"""
+        url = make_url(database_url)
+        driver = ASYNC_DRIVERS.get(url.get_backend_name())
+        if driver is None or url.database in (None, "", ":memory:"):
+            # An in-memory SQLite database would not be shared between the engines
+            logger.info("Async database: not available for %s, API uses the sync engine", url.drivername)
+            return None, None
+        module, drivername = driver
+        try:
+            # sqlalchemy.ext.asyncio itself needs greenlet
+            importlib.import_module("greenlet")
+            importlib.import_module(module)
+        except ImportError:
+            logger.warning("Async database: install greenlet and %s to enable it, API uses the sync engine", module)
+            return None, None
+        
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        async_engine = create_async_engine(url.set(drivername=drivername))
+        enable_sqlite_foreign_keys(async_engine.sync_engine)
+        logger.info("Async database: %s", drivername)
+        # Repositories only flush and responses are built before the commit,
+        # but nothing may lazy-load afterwards without a greenlet either
+        return async_engine, async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    
+    @property
+    def storage(self):
+        """The InMemoryStorage of the memory backend (None for SQL), opened on first use.
+
+        A durable storage locks its directory, so it is only opened by
+        processes that actually read or write through it.
+        """
+        if self.backend != "memory":
+            return None
+        with self._storage_lock:
+            if self._storage is None:
+                if self.storage_dir:
+                    from app.db.durable_storage import DurableStorage
+                    self._storage = DurableStorage(self.storage_dir)
+                    stats = self._storage.recovery_stats
+                    logger.info(
+                        "Recovered %d projects and %d tasks in %.1f ms",
+                        len(self._storage.projects), len(self._storage.tasks), stats["recovery_seconds"] * 1000
+                    )
+                else:
+                    from app.db.in_memory_storage import InMemoryStorage
+                    self._storage = InMemoryStorage()
+            return self._storage
+    
+    def close_storage(self):
+        """Flush and release a storage opened by this process"""
+        if self._storage is not None:
+            self._storage.close()
     
     def get_session(self):
+        if self.backend == "memory":
+            from app.db.in_memory_storage import InMemorySession
+            return InMemorySession(self.storage)
         return self.SessionLocal()
     
+    def get_snapshot_session(self):
+        """Session for long reads that should see one consistent state, such as exports.
+        
+        On PostgreSQL its transaction is REPEATABLE READ, so every statement
+        reads the snapshot taken by the first one; other backends may see
+        writes that commit while it reads.
+        """
+        session = self.get_session()
+        if self.backend == "sql" and self.engine.dialect.name == "postgresql":
+            session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        return session
+    
+    @property
+    def api_engine(self):
+        """The (sync) Engine behind API sessions, for event hooks and pool statistics"""
+        if self.async_engine is not None:
+            return self.async_engine.sync_engine
+        return self.engine
+    
+    @property
+    def api_engines(self) -> Dict[str, Engine]:
+        """``api_engine`` and the replica engines, by name ("primary", "replica-1", ...)"""
+        engines = {"primary": self.api_engine}
+        for number, engine in enumerate(self.replica_engines, 1):
+            engines[f"replica-{number}"] = engine
+        return engines
+    
+    async def dispose_async_engines(self):
+        for async_engine in [self.async_engine, *self.async_replica_engines]:
+            if async_engine is not None:
+                await async_engine.dispose()
+    
+    def get_api_session(self, read_only: bool = False):
+        """Session for API handlers: an AsyncSession when the async engine is enabled.
+        
+        ``read_only`` sessions go to the next replica, if any; the caller
+        decides whether replica lag is acceptable.
+        """
+        if read_only and self.replica_sessions:
+            session = self.replica_sessions[next(self._replica_counter) % len(self.replica_sessions)]()
+            session.info["replica"] = True
+            return session
+        if self.AsyncSessionLocal is not None:
+            return self.AsyncSessionLocal()
+        return self.get_session()
+    
+    @contextmanager
+    def unit_of_work(self, session: Optional[Session] = None) -> Iterator[Session]:
+        """Commit once when the block succeeds, roll back when it raises.
+        
+        Opens (and closes) its own session unless an existing one is given.
+        """
+        owns_session = session is None
+        if owns_session:
+            session = self.get_session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            if owns_session:
+                session.close()
+    
     def create_tables(self):
-        from app.models.base import Base
+        if self.backend == "memory":
+            # No tables; opening the storage recovers a durable one up front
+            self.storage
+            return
+        # app.db.base imports every model so all tables are registered
+        from app.db.base import Base
         Base.metadata.create_all(bind=self.engine)
+        # Seed the project counter, which migrations insert
+        from app.repositories.project_repository import ProjectRepository
+        with self.unit_of_work() as session:
+            ProjectRepository(session).count_for_update()
+
+async def run_sync(session, fn: Callable[..., ResultType], *args) -> ResultType:
+    """Await ``fn(sync_session, *args)`` for any session get_api_session returns.
+    
+    An AsyncSession runs it on the event loop, its I/O awaiting the async
+    driver (SQLAlchemy's run_sync); a sync Session runs it in a worker
+    thread; an in-memory session runs it inline, as it never blocks on I/O
+    and a writing API session already holds the storage lock (get_db).
+    So the synchronous repositories and services serve every backend.
+    """
+    from app.db.in_memory_storage import InMemorySession
+    if isinstance(session, InMemorySession):
+        return fn(session, *args)
+    if isinstance(session, Session):
+        return await run_in_threadpool(fn, session, *args)
+    return await session.run_sync(fn, *args)
+
+def is_replica_session(session) -> bool:
+    """Whether ``session`` reads from a replica, which may lag behind the primary"""
+    info = getattr(session, "info", None)
+    return bool(info and info.get("replica"))
+
+def on_commit(session, callback: Callable[[], None]) -> None:
+    """Run ``callback()`` once, after the next successful commit of ``session``"""
+    from app.db.in_memory_storage import InMemorySession
+    if isinstance(session, InMemorySession):
+        session.after_commit(lambda _: callback())
+    else:
+        event.listen(session, "after_commit", lambda _: callback(), once=True)
 
 # Global database session instance
 db_session = DatabaseSession()
\ No newline at end of file
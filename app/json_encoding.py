@@ -0,0 +1,47 @@
+"""
+Compact JSON encoding shared by the API responses and the NDJSON export,
+and decoding for the import.
+
+Uses orjson when it is installed, which encodes datetimes and enums
+natively and several times faster; the standard json module otherwise.
+Both write datetimes as ISO 8601 and enums as their values, like the
+pydantic response models.
+"""
+
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Whether dumps() writes datetimes itself; callers preformatting them can skip it
+NATIVE_DATETIMES = orjson is not None
+
+def _encode(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON of ``content``"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content,
+        default=_encode,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+def loads(content: Union[str, bytes]) -> Any:
+    """The value of the JSON document ``content``; raises ValueError if it is invalid"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
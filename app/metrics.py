@@ -0,0 +1,278 @@
+"""
+Process-local metrics with Prometheus text exposition.
+
+Every process records into its own in-memory registry; a recording is a
+dict update under one uncontended lock, and a scrape only copies the
+dicts and never blocks request handling. When
+METRICS_DIR is set, each process also writes a snapshot to
+<METRICS_DIR>/<pid>.json every METRICS_FLUSH_SECONDS (and when a command
+finishes). A scrape merges the snapshots of all processes: uvicorn
+workers, the autoclose command and the scheduler. Counters and
+histograms are summed, live gauges are summed over running processes
+only, and "max" gauges keep the largest value. Clear METRICS_DIR on
+deploy, as with any multiprocess Prometheus setup.
+"""
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUESTS = "todolist_http_requests_total"
+HTTP_DURATION = "todolist_http_request_duration_seconds"
+HTTP_IN_FLIGHT = "todolist_http_requests_in_flight"
+POOL_SIZE = "todolist_db_pool_size"
+POOL_CHECKED_OUT = "todolist_db_pool_checked_out"
+POOL_CHECKED_IN = "todolist_db_pool_checked_in"
+POOL_OVERFLOW = "todolist_db_pool_overflow"
+POOL_CHECKOUTS = "todolist_db_pool_checkouts_total"
+POOL_EXHAUSTED = "todolist_db_pool_exhausted_total"
+AUTOCLOSE_RUNS = "todolist_autoclose_runs_total"
+AUTOCLOSE_CLOSED = "todolist_autoclose_tasks_closed_total"
+AUTOCLOSE_DURATION = "todolist_autoclose_run_duration_seconds"
+AUTOCLOSE_LAST_RUN = "todolist_autoclose_last_run_timestamp_seconds"
+CACHE_HITS = "todolist_entity_cache_hits_total"
+CACHE_MISSES = "todolist_entity_cache_misses_total"
+CACHE_EVICTIONS = "todolist_entity_cache_evictions_total"
+CACHE_INVALIDATIONS = "todolist_entity_cache_invalidations_total"
+CACHE_ENTRIES = "todolist_entity_cache_entries"
+PURGE_TASKS_DELETED = "todolist_project_purge_tasks_deleted_total"
+PURGE_PENDING = "todolist_project_purge_pending"
+
+# name -> (kind, help); kind decides how snapshots of several processes merge
+METRICS = {
+    HTTP_REQUESTS: ("counter", "HTTP requests by method, route and status"),
+    HTTP_DURATION: ("histogram", "HTTP request latency by method and route"),
+    HTTP_IN_FLIGHT: ("gauge", "HTTP requests currently being served"),
+    POOL_SIZE: ("gauge", "Configured size of the database connection pool"),
+    POOL_CHECKED_OUT: ("gauge", "Database connections currently checked out"),
+    POOL_CHECKED_IN: ("gauge", "Idle database connections in the pool"),
+    POOL_OVERFLOW: ("gauge", "Database connections open beyond the pool size"),
+    POOL_CHECKOUTS: ("counter", "Database connection checkouts"),
+    POOL_EXHAUSTED: ("counter", "Checkouts that left no idle or overflow connection, so further checkouts wait"),
+    AUTOCLOSE_RUNS: ("counter", "Autoclose runs"),
+    AUTOCLOSE_CLOSED: ("counter", "Overdue tasks closed by autoclose and the deadline scheduler"),
+    AUTOCLOSE_DURATION: ("histogram", "Duration of autoclose runs"),
+    AUTOCLOSE_LAST_RUN: ("max", "Unix time the last autoclose run finished"),
+    CACHE_HITS: ("counter", "Entity cache lookups served from the cache, by kind"),
+    CACHE_MISSES: ("counter", "Entity cache lookups that loaded from the database, by kind"),
+    CACHE_EVICTIONS: ("counter", "Entity cache entries evicted to stay within ENTITY_CACHE_SIZE"),
+    CACHE_INVALIDATIONS: ("counter", "Entity cache invalidations by writes, by kind"),
+    CACHE_ENTRIES: ("gauge", "Entries currently in the entity cache"),
+    PURGE_TASKS_DELETED: ("counter", "Tasks deleted by background project deletions"),
+    PURGE_PENDING: ("gauge", "Background project deletions queued or running in this process"),
+}
+
+
+class MetricsRegistry:
+    """Counters, gauges and fixed-bucket histograms of one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values: Dict[Tuple[str, LabelKey], float] = {}
+        # Per-bucket counts (the last bucket is +Inf) followed by the sum
+        self.histograms: Dict[Tuple[str, LabelKey], List[float]] = {}
+
+    def inc(self, name: str, labels: LabelKey = (), amount: float = 1.0) -> None:
+        key = (name, labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, labels: LabelKey = ()) -> None:
+        self.values[(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels: LabelKey = ()) -> None:
+        key = (name, labels)
+        bucket = bisect.bisect_left(BUCKETS, value)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0.0] * (len(BUCKETS) + 2)
+            histogram[bucket] += 1
+            histogram[-1] += value
+
+    def copy(self) -> Tuple[Dict[Tuple[str, LabelKey], float], Dict[Tuple[str, LabelKey], List[float]]]:
+        with self._lock:
+            values = dict(self.values)
+            histograms = {key: list(counts) for key, counts in self.histograms.items()}
+        return values, histograms
+
+    def snapshot(self) -> dict:
+        values, histograms = self.copy()
+        return {
+            "values": [[name, labels, value] for (name, labels), value in values.items()],
+            "histograms": [[name, labels, counts] for (name, labels), counts in histograms.items()],
+        }
+
+
+registry = MetricsRegistry()
+
+
+def _metrics_dir() -> Optional[str]:
+    return os.getenv("METRICS_DIR") or None
+
+
+def write_snapshot() -> None:
+    """Write this process's snapshot to METRICS_DIR (no-op when unset)"""
+    metrics_dir = _metrics_dir()
+    if metrics_dir is None:
+        return
+    os.makedirs(metrics_dir, exist_ok=True)
+    path = os.path.join(metrics_dir, f"{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def start_snapshot_writer(before_write=None) -> None:
+    """Periodically write snapshots from a daemon thread (no-op without METRICS_DIR)"""
+    if _metrics_dir() is None:
+        return
+    interval = float(os.getenv("METRICS_FLUSH_SECONDS", 5))
+
+    def loop():
+        while True:
+            if before_write is not None:
+                before_write()
+            write_snapshot()
+            time.sleep(interval)
+
+    threading.Thread(target=loop, name="metrics-writer", daemon=True).start()
+
+
+def record_autoclose(closed_count: int, duration: float, finished_at: float) -> None:
+    registry.inc(AUTOCLOSE_RUNS)
+    registry.inc(AUTOCLOSE_CLOSED, amount=closed_count)
+    registry.observe(AUTOCLOSE_DURATION, duration)
+    registry.set(AUTOCLOSE_LAST_RUN, finished_at)
+
+
+def collect_pool_stats(engine, labels: LabelKey = ()) -> None:
+    """Copy the current state of ``engine.pool`` into the registry"""
+    pool = engine.pool
+    for name, attribute in (
+        (POOL_SIZE, "size"),
+        (POOL_CHECKED_OUT, "checkedout"),
+        (POOL_CHECKED_IN, "checkedin"),
+        (POOL_OVERFLOW, "overflow"),
+    ):
+        # Only QueuePool exposes these; NullPool/StaticPool have nothing to report
+        if hasattr(pool, attribute):
+            registry.set(name, max(getattr(pool, attribute)(), 0), labels)
+
+
+def instrument_pool(engine, labels: LabelKey = ()) -> None:
+    """Count checkouts of ``engine.pool`` and the ones that exhaust it"""
+    from sqlalchemy import event
+
+    pool = engine.pool
+    # QueuePool only; a negative max_overflow means unlimited overflow
+    max_overflow = getattr(pool, "_max_overflow", -1)
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        registry.inc(POOL_CHECKOUTS, labels)
+        if max_overflow >= 0 and pool.checkedin() == 0 and pool.overflow() >= max_overflow:
+            registry.inc(POOL_EXHAUSTED, labels)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merged_snapshot() -> dict:
+    """This process's live values merged with every other process's snapshot"""
+    values, histograms = registry.copy()
+
+    metrics_dir = _metrics_dir()
+    if metrics_dir is None:
+        return {"values": values, "histograms": histograms}
+
+    own_pid = os.getpid()
+    for path in glob.glob(os.path.join(metrics_dir, "*.json")):
+        try:
+            pid = int(os.path.basename(path)[:-len(".json")])
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (ValueError, OSError):
+            continue
+        if pid == own_pid:
+            continue
+        alive = None
+
+        for name, labels, value in snapshot["values"]:
+            kind = METRICS.get(name, ("gauge", ""))[0]
+            key = (name, tuple(tuple(pair) for pair in labels))
+            if kind == "gauge":
+                if alive is None:
+                    alive = _process_alive(pid)
+                if not alive:
+                    continue
+            if kind == "max":
+                values[key] = max(values.get(key, value), value)
+            else:
+                values[key] = values.get(key, 0.0) + value
+
+        for name, labels, counts in snapshot["histograms"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            merged = histograms.setdefault(key, [0.0] * len(counts))
+            for i, count in enumerate(counts):
+                merged[i] += count
+
+    return {"values": values, "histograms": histograms}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelKey, extra: LabelKey = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def render() -> str:
+    """Render all metrics in the Prometheus text exposition format"""
+    merged = _merged_snapshot()
+    by_name: Dict[str, List[str]] = {}
+
+    for (name, labels), value in sorted(merged["values"].items()):
+        by_name.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    for (name, labels), counts in sorted(merged["histograms"].items()):
+        lines = by_name.setdefault(name, [])
+        cumulative = 0.0
+        for bound, count in zip(BUCKETS + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', le),))} {_format_value(cumulative)}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {repr(counts[-1])}")
+        lines.append(f"{name}_count{_format_labels(labels)} {_format_value(cumulative)}")
+
+    output = []
+    for name, lines in by_name.items():
+        kind, help_text = METRICS.get(name, ("gauge", name))
+        output.append(f"# HELP {name} {help_text}")
+        output.append(f"# TYPE {name} {'gauge' if kind == 'max' else kind}")
+        output.extend(lines)
+    return "\n".join(output) + "\n"
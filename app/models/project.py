@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer
+from sqlalchemy import Column, String, Text, DateTime, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
@@ -11,9 +11,19 @@ class Project(Base):
     description = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # Maintained by TaskService on every task insert/delete
+    task_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Set while its tasks are purged in the background; the project is hidden from then on
+    deleted_at = Column(DateTime, nullable=True)
     
-    # Relationship with tasks
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    # Relationship with tasks; the database's ON DELETE CASCADE deletes them,
+    # so deleting a project never loads its tasks
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    
+    __table_args__ = (
+        # Keyset pages of the project list, ordered by (created_at, id)
+        Index("ix_projects_created_at_id", "created_at", "id"),
+    )
     
     def __repr__(self):
         return f"<Project(id={self.id}, name='{self.name}')>"
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime, Integer
+from datetime import datetime
+from .base import Base
+
+class ProjectDeletion(Base):
+    """Progress of a project deleted in the background, kept after it completes"""
+    __tablename__ = "project_deletions"
+    
+    # No foreign key: the record outlives the project
+    project_id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(30), nullable=False)
+    tasks_total = Column(Integer, nullable=False)
+    tasks_deleted = Column(Integer, nullable=False, default=0)
+    requested_at = Column(DateTime, nullable=False, default=datetime.now)
+    completed_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<ProjectDeletion(project_id={self.project_id}, tasks_deleted={self.tasks_deleted}/{self.tasks_total})>"
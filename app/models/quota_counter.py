@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer
+from .base import Base
+
+class QuotaCounter(Base):
+    """Named counter maintained in the same transaction as the rows it counts"""
+    __tablename__ = "quota_counters"
+    
+    PROJECTS = "projects"
+    
+    name = Column(String(30), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<QuotaCounter(name='{self.name}', value={self.value})>"
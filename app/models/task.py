@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, Enum
+from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -25,5 +25,19 @@ class Task(Base):
     # Relationship with project
     project = relationship("Project", back_populates="tasks")
     
+    __table_args__ = (
+        # Per-project listing (ordered by created_at) and counting
+        Index("ix_tasks_project_id_created_at", "project_id", "created_at"),
+        # Version of a project's task list: max(updated_at) and count, index-only
+        Index("ix_tasks_project_id_updated_at", "project_id", "updated_at"),
+        # Overdue scans only ever look at open tasks
+        Index(
+            "ix_tasks_open_deadline",
+            "deadline",
+            postgresql_where=text("closed_at IS NULL"),
+            sqlite_where=text("closed_at IS NULL"),
+        ),
+    )
+    
     def __repr__(self):
         return f"<Task(id={self.id}, title='{self.title}', status='{self.status.value}')>"
\ No newline at end of file
@@ -1,9 +1,30 @@
-from typing import TypeVar, Generic, List, Optional
-from sqlalchemy.orm import Session
+import functools
+import operator
+from collections import namedtuple
+from typing import TypeVar, Generic, Iterable, Iterator, List, Optional, Sequence, Tuple
+from datetime import datetime
+from sqlalchemy import Row, and_, or_, select
+from sqlalchemy.orm import Session, Query
 from app.models.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Keyset position of the last row a client has seen: (created_at, id)
+Keyset = Tuple[datetime, int]
+
+@functools.lru_cache(maxsize=None)
+def _row_type(fields: Tuple[str, ...]):
+    return namedtuple("Row", fields)
+
+def rows_of(entities: Iterable[object], fields: Sequence[str]) -> List[tuple]:
+    """The ``fields`` of each entity (or snapshot) as named tuples, like the rows of a column select"""
+    fields = tuple(fields)
+    row_type = _row_type(fields)
+    values = operator.attrgetter(*fields)
+    if len(fields) == 1:
+        return [row_type(values(entity)) for entity in entities]
+    return [row_type._make(values(entity)) for entity in entities]
+
 class BaseRepository(Generic[ModelType]):
     def __init__(self, model: type[ModelType], db_session: Session):
         self.model = model
@@ -15,19 +36,92 @@ class BaseRepository(Generic[ModelType]):
     def get_all(self) -> List[ModelType]:
         return self.db_session.query(self.model).all()
     
+    def get_row(self, id: int, fields: Sequence[str], *criteria) -> Optional[Row]:
+        """The columns ``fields`` of one row (also matching ``criteria``), without loading the entity"""
+        columns = self.model.__table__.c
+        return self.db_session.execute(
+            select(*(columns[field] for field in fields)).where(columns.id == id, *criteria)
+        ).first()
+    
+    def paginate(self, query: Query, after: Optional[Keyset] = None, limit: Optional[int] = None) -> List[ModelType]:
+        """Order by (created_at, id) and return up to ``limit`` rows after ``after``"""
+        if after is not None:
+            query = query.filter(self._after(self.model, after))
+        query = query.order_by(self.model.created_at, self.model.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+    
+    def paginate_rows(
+        self,
+        fields: Sequence[str],
+        *criteria,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        """Like ``paginate``, but select only the columns ``fields`` as plain rows.
+        
+        ``criteria`` must use table columns (``Model.__table__.c``) as well:
+        any model attribute makes it an ORM select, which processes every row
+        through the ORM even without entities.
+        """
+        columns = self.model.__table__.c
+        stmt = select(*(columns[field] for field in fields)).where(*criteria)
+        if after is not None:
+            stmt = stmt.where(self._after(columns, after))
+        stmt = stmt.order_by(columns.created_at, columns.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return self.db_session.execute(stmt).all()
+    
+    def iter_row_batches(
+        self,
+        fields: Sequence[str],
+        *criteria,
+        order_by: Sequence[str] = ("id",),
+        batch_size: int = 1000
+    ) -> Iterator[List[Row]]:
+        """All rows of the columns ``fields`` matching ``criteria`` (table columns), ``batch_size`` at a time.
+        
+        ``yield_per`` streams them through a server-side cursor where the
+        driver has one (psycopg2 named cursors), so memory stays bounded by
+        one batch however many rows match.
+        """
+        columns = self.model.__table__.c
+        stmt = (
+            select(*(columns[field] for field in fields))
+            .where(*criteria)
+            .order_by(*(columns[column] for column in order_by))
+        )
+        result = self.db_session.execute(stmt, execution_options={"yield_per": batch_size})
+        try:
+            yield from result.partitions()
+        finally:
+            result.close()
+    
+    @staticmethod
+    def _after(columns, after: Keyset):
+        created_at, id = after
+        return or_(
+            columns.created_at > created_at,
+            and_(columns.created_at == created_at, columns.id > id)
+        )
+    
+    # Writes are only flushed; the caller's unit of work commits once at the end.
+    # Column defaults are Python-side, so the flush itself populates them and
+    # no refresh is needed.
+    
     def create(self, obj: ModelType) -> ModelType:
         self.db_session.add(obj)
-        self.db_session.commit()
-        self.db_session.refresh(obj)
+        self.db_session.flush()
         return obj
     
     def update(self, obj: ModelType) -> ModelType:
-        self.db_session.commit()
-        self.db_session.refresh(obj)
+        self.db_session.flush()
         return obj
     
     def delete(self, id: int) -> None:
         obj = self.get(id)
         if obj:
             self.db_session.delete(obj)
-            self.db_session.commit()
\ No newline at end of file
+            self.db_session.flush()
@@ -0,0 +1,26 @@
+from typing import Union
+from sqlalchemy.orm import Session
+from app.db.in_memory_storage import InMemorySession
+from app.repositories.in_memory_project_repository import InMemoryProjectRepository
+from app.repositories.in_memory_task_repository import InMemoryTaskRepository
+from app.repositories.project_deletion_repository import ProjectDeletionRepository
+from app.repositories.project_repository import ProjectRepository
+from app.repositories.task_repository import TaskRepository
+
+# Services receive whatever db_session.get_session() returned for STORAGE_BACKEND
+
+def project_repository_for(db_session: Union[Session, InMemorySession]):
+    if isinstance(db_session, InMemorySession):
+        return InMemoryProjectRepository(db_session)
+    return ProjectRepository(db_session)
+
+def task_repository_for(db_session: Union[Session, InMemorySession]):
+    if isinstance(db_session, InMemorySession):
+        return InMemoryTaskRepository(db_session)
+    return TaskRepository(db_session)
+
+def project_deletion_repository_for(db_session: Union[Session, InMemorySession]):
+    """None for the in-memory backend, which deletes projects at once (dict operations)"""
+    if isinstance(db_session, InMemorySession):
+        return None
+    return ProjectDeletionRepository(db_session)
@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from app.db.in_memory_storage import InMemorySession, apply_changes, copy_entity, detached_copy
+from app.models.project import Project
+from app.repositories.base import Keyset, rows_of
+from app.exceptions.repository_exceptions import DuplicateProjectError
+
+class InMemoryProjectRepository:
+    """ProjectRepository over an InMemoryStorage.
+
+    Single-entity getters return copies the caller may modify and hand back
+    to ``update``; lists return the stored (read-only) entities.
+    """
+
+    def __init__(self, db_session: InMemorySession):
+        self.db_session = db_session
+
+    def get(self, id: int) -> Optional[Project]:
+        project = self.db_session.storage.projects.get(id)
+        return copy_entity(project) if project is not None else None
+
+    def get_row(self, id: int, fields: Sequence[str]) -> Optional[tuple]:
+        project = self.db_session.storage.projects.get(id)
+        return rows_of([project], fields)[0] if project is not None else None
+
+    def get_all(self) -> List[Project]:
+        return list(self.db_session.storage.projects.values())
+
+    def get_by_name(self, name: str) -> Optional[Project]:
+        project_id = self.db_session.storage.project_ids_by_name.get(name)
+        return self.get(project_id) if project_id is not None else None
+
+    def get_all_ordered(self, after: Optional[Keyset] = None, limit: Optional[int] = None) -> List[Project]:
+        storage = self.db_session.storage
+        return storage.page(storage.projects, storage.projects, after, limit)
+
+    def get_rows_ordered(self, fields: Sequence[str], after: Optional[Keyset] = None, limit: Optional[int] = None) -> List[tuple]:
+        return rows_of(self.get_all_ordered(after, limit), fields)
+
+    def iter_row_batches_by_id(
+        self,
+        fields: Sequence[str],
+        updated_since: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[tuple]]:
+        storage = self.db_session.storage
+        ids = sorted(storage.projects)
+        for start in range(0, len(ids), batch_size):
+            projects = [storage.projects.get(id) for id in ids[start:start + batch_size]]
+            yield rows_of([
+                project for project in projects
+                if project is not None and (updated_since is None or project.updated_at >= updated_since)
+            ], fields)
+    
+    def get_ids_by_name(self) -> Dict[str, int]:
+        return dict(self.db_session.storage.project_ids_by_name)
+
+    def insert_rows(self, rows: List[dict]) -> Dict[str, int]:
+        return {project.name: project.id for project in (self.create(Project(**row)) for row in rows)}
+
+    def create(self, project: Project) -> Project:
+        self.db_session.lock()
+        if project.name in self.db_session.storage.project_ids_by_name:
+            raise DuplicateProjectError(f"Project with name '{project.name}' already exists")
+
+        now = datetime.now()
+        project.id = self.db_session.storage.next_project_id()
+        project.created_at = project.created_at or now
+        project.updated_at = project.updated_at or now
+        project.task_count = project.task_count or 0
+        self.db_session.put_project(detached_copy(project))
+        return project
+
+    def update(self, project: Project) -> Project:
+        self.db_session.lock()
+        existing_id = self.db_session.storage.project_ids_by_name.get(project.name)
+        if existing_id is not None and existing_id != project.id:
+            raise DuplicateProjectError(f"Project with name '{project.name}' already exists")
+
+        self.db_session.put_project(apply_changes(self.db_session.storage.projects.get(project.id), project))
+        return project
+
+    def delete(self, id: int) -> None:
+        self.db_session.lock()
+        if id in self.db_session.storage.projects:
+            # Cascades to the project's tasks
+            self.db_session.remove_project(id)
+
+    def count_for_update(self) -> int:
+        """Return the project count, holding the storage lock until the unit of work ends"""
+        self.db_session.lock()
+        return len(self.db_session.storage.projects)
+
+    def get_for_update(self, project_id: int) -> Optional[Project]:
+        self.db_session.lock()
+        return self.get(project_id)
+
+    def get_many_for_update(self, project_ids: Iterable[int]) -> Dict[int, Project]:
+        self.db_session.lock()
+        projects = self.db_session.storage.projects
+        return {id: copy_entity(projects[id]) for id in set(project_ids) if id in projects}
+
+    def adjust_task_count(self, project_id: int, delta: int) -> None:
+        self.db_session.lock()
+        project = self.db_session.storage.projects.get(project_id)
+        if project is not None:
+            project = detached_copy(project)
+            project.task_count += delta
+            self.db_session.put_project(project)
+
+    def get_with_tasks(self, project_id: int) -> Optional[Project]:
+        return self.get(project_id)
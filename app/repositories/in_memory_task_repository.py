@@ -0,0 +1,212 @@
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from app.db.in_memory_storage import InMemorySession, apply_changes, copy_entity, detached_copy
+from app.models.task import Task, TaskStatus
+from app.repositories.base import Keyset, rows_of
+from app.exceptions.repository_exceptions import TaskNotFoundError
+
+def _is_overdue(task: Optional[Task], now: datetime) -> bool:
+    return (
+        task is not None
+        and task.deadline is not None
+        and task.deadline < now
+        and task.status != TaskStatus.DONE
+        and task.closed_at is None
+    )
+
+class InMemoryTaskRepository:
+    """TaskRepository over an InMemoryStorage.
+
+    Single-entity getters return copies the caller may modify and hand back
+    to ``update``; lists return the stored (read-only) entities.
+    """
+
+    def __init__(self, db_session: InMemorySession):
+        self.db_session = db_session
+
+    def get(self, id: int) -> Optional[Task]:
+        task = self.db_session.storage.tasks.get(id)
+        return copy_entity(task) if task is not None else None
+
+    def get_row(self, id: int, fields: Sequence[str]) -> Optional[tuple]:
+        task = self.db_session.storage.tasks.get(id)
+        return rows_of([task], fields)[0] if task is not None else None
+
+    def get_all(self) -> List[Task]:
+        return list(self.db_session.storage.tasks.values())
+
+    def get_by_project(
+        self,
+        project_id: int,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
+        storage = self.db_session.storage
+        return storage.page(storage.project_tasks.get(project_id, {}), storage.tasks, after, limit)
+
+    def get_rows_by_project(
+        self,
+        project_id: int,
+        fields: Sequence[str],
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None
+    ) -> List[tuple]:
+        return rows_of(self.get_by_project(project_id, after, limit), fields)
+    
+    def iter_row_batches_by_project(
+        self,
+        fields: Sequence[str],
+        updated_since: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[tuple]]:
+        storage = self.db_session.storage
+        batch = []
+        for project_id in sorted(storage.projects):
+            for task in storage.page(storage.project_tasks.get(project_id, {}), storage.tasks):
+                if updated_since is None or task.updated_at >= updated_since:
+                    batch.append(task)
+                    if len(batch) >= batch_size:
+                        yield rows_of(batch, fields)
+                        batch = []
+        if batch:
+            yield rows_of(batch, fields)
+    
+    def get_updated_at(self, id: int) -> Optional[datetime]:
+        task = self.db_session.storage.tasks.get(id)
+        return task.updated_at if task is not None else None
+    
+    def get_project_version(self, project_id: int) -> Tuple[Optional[datetime], int]:
+        storage = self.db_session.storage
+        tasks = [task for task in map(storage.tasks.get, list(storage.project_tasks.get(project_id, {}))) if task is not None]
+        return max((task.updated_at for task in tasks), default=None), len(tasks)
+    
+    def create(self, task: Task) -> Task:
+        self.db_session.lock()
+        now = datetime.now()
+        task.id = self.db_session.storage.next_task_id()
+        task.status = task.status or TaskStatus.TODO
+        task.created_at = task.created_at or now
+        task.updated_at = task.updated_at or now
+        self.db_session.put_task(detached_copy(task))
+        return task
+
+    def create_many(self, rows: List[dict]) -> List[Task]:
+        return [self.create(Task(**row)) for row in rows]
+
+    def insert_rows(self, columns: Sequence[str], rows: List[tuple]) -> None:
+        for row in rows:
+            self.create(Task(**dict(zip(columns, row))))
+
+    def update(self, task: Task) -> Task:
+        self.db_session.lock()
+        self.db_session.put_task(apply_changes(self.db_session.storage.tasks.get(task.id), task))
+        return task
+
+    def delete(self, id: int) -> None:
+        self.db_session.lock()
+        if id in self.db_session.storage.tasks:
+            self.db_session.remove_task(id)
+
+    def update_status_many(self, ids_by_status: Dict[TaskStatus, List[int]]) -> List[Task]:
+        """Set each listed task to its target status; DONE also sets ``closed_at``, other statuses clear it"""
+        self.db_session.lock()
+        tasks = self.db_session.storage.tasks
+        updated: List[Task] = []
+        for status, ids in ids_by_status.items():
+            updated.extend(self._update_status(status, [tasks[id] for id in ids if id in tasks]))
+        return updated
+
+    def update_status_where(
+        self,
+        status: TaskStatus,
+        project_id: int,
+        current_status: Optional[TaskStatus] = None
+    ) -> List[Task]:
+        """Set ``status`` on every task of the project (in ``current_status``, if given)"""
+        self.db_session.lock()
+        storage = self.db_session.storage
+        tasks = [storage.tasks[id] for id in storage.project_tasks.get(project_id, {})]
+        if current_status is not None:
+            tasks = [task for task in tasks if task.status == current_status]
+        return self._update_status(status, tasks)
+
+    def _update_status(self, status: TaskStatus, tasks: List[Task]) -> List[Task]:
+        now = datetime.now()
+        updated = []
+        for task in tasks:
+            task = detached_copy(task)
+            task.status = status
+            task.updated_at = now
+            if status != TaskStatus.DONE:
+                task.closed_at = None
+            elif task.closed_at is None:
+                task.closed_at = now
+            self.db_session.put_task(task)
+            updated.append(task)
+        return updated
+
+    def get_overdue_tasks(self) -> List[Task]:
+        # The deadline heap may only be touched under the storage lock
+        self.db_session.lock()
+        storage = self.db_session.storage
+        return [storage.tasks[id] for id in storage.due_task_ids(datetime.now())]
+
+    def close_overdue_task(self, task_id: int) -> Task:
+        task = self.get(task_id)
+        if not task:
+            raise TaskNotFoundError(f"Task with ID {task_id} not found")
+
+        task.status = TaskStatus.DONE
+        task.closed_at = task.updated_at = datetime.now()
+        return self.update(task)
+
+    def get_upcoming_deadlines(self, until: datetime) -> List[Tuple[int, datetime]]:
+        """Return ``(id, deadline)`` of open tasks whose deadline is before ``until``"""
+        self.db_session.lock()
+        storage = self.db_session.storage
+        return [(id, storage.tasks[id].deadline) for id in storage.due_task_ids(until)]
+
+    def close_overdue_tasks(
+        self,
+        with_rows: bool = False,
+        after_id: int = 0,
+        batch_size: Optional[int] = None,
+        task_ids: Optional[List[int]] = None
+    ) -> Tuple[int, List[Tuple[int, str]], Optional[int]]:
+        """Close overdue tasks; same contract as TaskRepository.close_overdue_tasks.
+
+        Without ``task_ids`` the batch is taken from the deadline heap
+        (earliest deadline first) instead of by ascending ID, and
+        ``after_id`` is not needed: closed tasks leave the heap, so the next
+        batch simply continues with the remaining overdue tasks. The
+        returned high-water mark is still the largest ID of the batch.
+        """
+        self.db_session.lock()
+        storage = self.db_session.storage
+        now = datetime.now()
+
+        if task_ids is not None:
+            ids = sorted(id for id in set(task_ids) if id > after_id and _is_overdue(storage.tasks.get(id), now))
+            if batch_size is not None:
+                ids = ids[:batch_size]
+        else:
+            ids = storage.due_task_ids(now, batch_size)
+
+        if batch_size is not None and not ids:
+            return 0, [], None
+
+        rows: List[Tuple[int, str]] = []
+        for id in ids:
+            task = detached_copy(storage.tasks[id])
+            task.status = TaskStatus.DONE
+            task.closed_at = now
+            task.updated_at = now
+            self.db_session.put_task(task)
+            if with_rows:
+                rows.append((task.id, task.title))
+
+        upper_id = max(ids) if batch_size is not None else None
+        return len(ids), rows, upper_id
+
+    def count_by_project(self, project_id: int) -> int:
+        return len(self.db_session.storage.project_tasks.get(project_id, {}))
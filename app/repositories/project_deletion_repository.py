@@ -0,0 +1,34 @@
+from typing import List, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.models.project_deletion import ProjectDeletion
+from app.repositories.base import BaseRepository
+
+class ProjectDeletionRepository(BaseRepository[ProjectDeletion]):
+    def __init__(self, db_session: Session):
+        super().__init__(ProjectDeletion, db_session)
+    
+    def get(self, project_id: int) -> Optional[ProjectDeletion]:
+        return self.db_session.get(ProjectDeletion, project_id)
+    
+    def get_for_update(self, project_id: int) -> Optional[ProjectDeletion]:
+        """Load a deletion and lock it, so concurrent purges of one project take turns"""
+        return self.db_session.query(ProjectDeletion).filter(
+            ProjectDeletion.project_id == project_id
+        ).with_for_update().populate_existing().first()
+    
+    def get_pending_ids(self) -> List[int]:
+        """Projects whose purge has not completed, oldest request first"""
+        return list(self.db_session.execute(
+            select(ProjectDeletion.project_id)
+            .where(ProjectDeletion.completed_at.is_(None))
+            .order_by(ProjectDeletion.requested_at)
+        ).scalars())
+    
+    def replace(self, deletion: ProjectDeletion) -> ProjectDeletion:
+        # SQLite may hand a purged project's id to a new project, which
+        # then replaces the old record
+        self.db_session.execute(
+            delete(ProjectDeletion.__table__).where(ProjectDeletion.__table__.c.project_id == deletion.project_id)
+        )
+        return self.create(deletion)
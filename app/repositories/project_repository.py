@@ -1,26 +1,166 @@
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from datetime import datetime
+from sqlalchemy import Row, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from app.models.project import Project
-from app.repositories.base import BaseRepository
+from app.models.quota_counter import QuotaCounter
+from app.repositories.base import BaseRepository, Keyset
 from app.exceptions.repository_exceptions import ProjectNotFoundError, DuplicateProjectError
 
+# Projects being deleted in the background are hidden from every read
+_visible = Project.__table__.c.deleted_at.is_(None)
+
 class ProjectRepository(BaseRepository[Project]):
     def __init__(self, db_session: Session):
         super().__init__(Project, db_session)
     
+    def get(self, id: int) -> Optional[Project]:
+        return self.db_session.query(Project).filter(Project.id == id, _visible).first()
+    
+    def get_row(self, id: int, fields: Sequence[str]) -> Optional[Row]:
+        return super().get_row(id, fields, _visible)
+    
+    def get_all(self) -> List[Project]:
+        return self.db_session.query(Project).filter(_visible).all()
+    
     def get_by_name(self, name: str) -> Optional[Project]:
+        # Includes hidden projects: their names stay taken until they are purged
         return self.db_session.query(Project).filter(Project.name == name).first()
     
-    def get_all_ordered(self) -> List[Project]:
-        return self.db_session.query(Project).order_by(Project.created_at).all()
+    def get_ids_by_name(self) -> Dict[str, int]:
+        """Every project's id by its name, in one query (hidden ones included, as their names are taken)"""
+        return dict(self.db_session.execute(select(Project.name, Project.id)).all())
+    
+    def insert_rows(self, rows: List[dict]) -> Dict[str, int]:
+        """Insert projects (names not taken yet) with one executemany; returns their ids by name"""
+        if not rows:
+            return {}
+        self.db_session.execute(insert(Project), rows)
+        self._adjust_project_count(len(rows))
+        names = [row["name"] for row in rows]
+        return dict(self.db_session.execute(select(Project.name, Project.id).where(Project.name.in_(names))).all())
+    
+    def get_all_ordered(self, after: Optional[Keyset] = None, limit: Optional[int] = None) -> List[Project]:
+        return self.paginate(self.db_session.query(Project).filter(_visible), after, limit)
+    
+    def get_rows_ordered(self, fields: Sequence[str], after: Optional[Keyset] = None, limit: Optional[int] = None) -> List[Row]:
+        """Page of projects as rows of the columns ``fields``"""
+        return self.paginate_rows(fields, _visible, after=after, limit=limit)
+    
+    def iter_row_batches_by_id(
+        self,
+        fields: Sequence[str],
+        updated_since: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[Row]]:
+        """Every project (changed at or after ``updated_since``) as rows of ``fields``, by id"""
+        columns = Project.__table__.c
+        criteria = [columns.updated_at >= updated_since] if updated_since is not None else []
+        return self.iter_row_batches(fields, _visible, *criteria, order_by=("id",), batch_size=batch_size)
     
     def create(self, project: Project) -> Project:
         # Check for duplicate name
-        if self.get_by_name(project.name):
+        existing = self.get_by_name(project.name)
+        if existing and existing.deleted_at is not None:
+            raise DuplicateProjectError(f"Project with name '{project.name}' is still being deleted")
+        if existing:
             raise DuplicateProjectError(f"Project with name '{project.name}' already exists")
         
+        self._adjust_project_count(1)
         return super().create(project)
     
+    def delete(self, id: int) -> None:
+        """Delete the project (hidden or not); the database deletes its tasks by cascade"""
+        project = self.db_session.get(Project, id)
+        if project:
+            self._adjust_project_count(-1)
+            self.db_session.delete(project)
+            self.db_session.flush()
+    
+    def count_for_update(self) -> int:
+        """Return the project count, locking the counter row until the transaction ends"""
+        self._lock_sqlite()
+        counter = self._lock_counter()
+        if counter is None:
+            # First use on a database created without migrations; concurrent
+            # first creates must not both insert the row
+            self._insert_counter()
+            counter = self._lock_counter()
+        return counter.value
+    
+    def _lock_sqlite(self) -> None:
+        """Take SQLite's database-wide write lock, which stands in for the row locks it cannot take.
+        
+        SQLite ignores FOR UPDATE, and its reads take no lock that lasts the
+        transaction; a write does, even one that changes nothing.
+        """
+        if self.db_session.get_bind().dialect.name == "sqlite":
+            self.db_session.execute(
+                update(QuotaCounter)
+                .where(QuotaCounter.name == QuotaCounter.PROJECTS)
+                .values(value=QuotaCounter.value)
+            )
+    
+    def _lock_counter(self) -> Optional[QuotaCounter]:
+        return self.db_session.query(QuotaCounter).filter(
+            QuotaCounter.name == QuotaCounter.PROJECTS
+        ).with_for_update().populate_existing().first()
+    
+    def _insert_counter(self) -> None:
+        """Insert the counter row with the current count, unless it exists by now"""
+        values = {
+            "name": QuotaCounter.PROJECTS,
+            "value": select(func.count()).select_from(Project.__table__).scalar_subquery(),
+        }
+        dialect = self.db_session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            self.db_session.execute(
+                dialect_insert(QuotaCounter).values(**values).on_conflict_do_nothing(index_elements=["name"])
+            )
+        else:
+            self.db_session.execute(insert(QuotaCounter).values(**values))
+    
+    def _adjust_project_count(self, delta: int) -> None:
+        self.db_session.execute(
+            update(QuotaCounter)
+            .where(QuotaCounter.name == QuotaCounter.PROJECTS)
+            .values(value=QuotaCounter.value + delta)
+        )
+    
+    def get_for_update(self, project_id: int) -> Optional[Project]:
+        """Load a project and lock its row (and so its task_count) until the transaction ends"""
+        self._lock_sqlite()
+        return self.db_session.query(Project).filter(
+            Project.id == project_id,
+            _visible
+        ).with_for_update().populate_existing().first()
+    
+    def get_many_for_update(self, project_ids: Iterable[int]) -> Dict[int, Project]:
+        """Load and lock several projects in one query, keyed by id"""
+        self._lock_sqlite()
+        # Lock in id order so concurrent batches cannot deadlock
+        projects = self.db_session.query(Project).filter(
+            Project.id.in_(set(project_ids)),
+            _visible
+        ).order_by(Project.id).with_for_update().populate_existing().all()
+        return {project.id: project for project in projects}
+    
+    def adjust_task_count(self, project_id: int, delta: int) -> None:
+        self.db_session.execute(
+            update(Project)
+            .where(Project.id == project_id)
+            # Keep updated_at: the project itself did not change
+            .values(task_count=Project.task_count + delta, updated_at=Project.updated_at)
+        )
+    
+    def hide(self, project: Project) -> Project:
+        """Hide the project until a background purge deletes it"""
+        project.deleted_at = datetime.now()
+        self.db_session.flush()
+        return project
+    
     def update(self, project: Project) -> Project:
         # Check for duplicate name
         existing = self.db_session.query(Project).filter(
@@ -34,4 +174,4 @@ class ProjectRepository(BaseRepository[Project]):
         return super().update(project)
     
     def get_with_tasks(self, project_id: int) -> Optional[Project]:
-        return self.db_session.query(Project).filter(Project.id == project_id).first()
\ No newline at end of file
+        return self.db_session.query(Project).filter(Project.id == project_id, _visible).first()
\ No newline at end of file
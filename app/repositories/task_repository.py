@@ -1,27 +1,201 @@
-from typing import List, Optional
+import io
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import Row, and_, delete, exists, func, insert, select, update
 from datetime import datetime
+from app.models.project import Project
 from app.models.task import Task, TaskStatus
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, Keyset
 from app.exceptions.repository_exceptions import TaskNotFoundError
 
+# COPY's text format escapes these inside values
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+# Tasks of a project being deleted in the background are hidden with it
+# (a primary key lookup per task; the export excludes those projects in bulk)
+_projects = Project.__table__.c
+_of_visible_project = exists().where(_projects.id == Task.__table__.c.project_id, _projects.deleted_at.is_(None))
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, TaskStatus):
+        # SQLAlchemy's Enum type stores member names
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return str(value).translate(_COPY_ESCAPES)
+
 class TaskRepository(BaseRepository[Task]):
     def __init__(self, db_session: Session):
         super().__init__(Task, db_session)
     
-    def get_by_project(self, project_id: int) -> List[Task]:
+    def get(self, id: int) -> Optional[Task]:
+        return self.db_session.query(Task).filter(Task.id == id, _of_visible_project).first()
+    
+    def get_row(self, id: int, fields: Sequence[str]) -> Optional[Row]:
+        return super().get_row(id, fields, _of_visible_project)
+    
+    def get_by_project(
+        self,
+        project_id: int,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
+        return self.paginate(
+            self.db_session.query(Task).filter(Task.project_id == project_id),
+            after,
+            limit
+        )
+    
+    def get_rows_by_project(
+        self,
+        project_id: int,
+        fields: Sequence[str],
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        """Page of a project's tasks as rows of the columns ``fields``"""
+        return self.paginate_rows(fields, Task.__table__.c.project_id == project_id, after=after, limit=limit)
+    
+    def iter_row_batches_by_project(
+        self,
+        fields: Sequence[str],
+        updated_since: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[Row]]:
+        """Every task of a visible project (changed at or after ``updated_since``) as rows of ``fields``, grouped by project.
+        
+        Ordered by project and then as in the project's task list, which is
+        the order of ix_tasks_project_id_created_at.
+        """
+        columns = Task.__table__.c
+        criteria = [columns.project_id.not_in(select(_projects.id).where(_projects.deleted_at.is_not(None)))]
+        if updated_since is not None:
+            criteria.append(columns.updated_at >= updated_since)
+        return self.iter_row_batches(
+            fields,
+            *criteria,
+            order_by=("project_id", "created_at", "id"),
+            batch_size=batch_size
+        )
+    
+    def get_updated_at(self, id: int) -> Optional[datetime]:
+        """``updated_at`` of a task without loading the row; None if it does not exist"""
+        return self.db_session.execute(select(Task.updated_at).where(Task.id == id, _of_visible_project)).scalar()
+    
+    def get_project_version(self, project_id: int) -> Tuple[Optional[datetime], int]:
+        """Latest ``updated_at`` and number of a project's tasks (from ix_tasks_project_id_updated_at)"""
+        latest, count = self.db_session.execute(
+            select(func.max(Task.updated_at), func.count()).where(Task.project_id == project_id)
+        ).one()
+        return latest, count
+    
+    def create_many(self, rows: List[dict]) -> List[Task]:
+        """Insert tasks with one multi-row INSERT ... RETURNING"""
+        if not rows:
+            return []
+        
+        if self.db_session.get_bind().dialect.insert_executemany_returning:
+            tasks = self.db_session.scalars(
+                insert(Task).returning(Task, sort_by_parameter_order=True),
+                rows
+            ).all()
+        else:
+            tasks = [Task(**row) for row in rows]
+            self.db_session.add_all(tasks)
+            self.db_session.flush()
+        
+        return tasks
+    
+    def insert_rows(self, columns: Sequence[str], rows: List[tuple]) -> None:
+        """Insert tasks (``rows`` of ``columns``) without loading them back.
+        
+        PostgreSQL (psycopg2) loads them with COPY, which skips per-row
+        statement overhead entirely; other databases get one executemany.
+        """
+        if not rows:
+            return
+        connection = self.db_session.connection()
+        if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+            buffer = io.StringIO()
+            for row in rows:
+                buffer.write("\t".join(_copy_value(value) for value in row))
+                buffer.write("\n")
+            buffer.seek(0)
+            cursor = connection.connection.dbapi_connection.cursor()
+            try:
+                cursor.copy_expert(f"COPY tasks ({', '.join(columns)}) FROM STDIN", buffer)
+            finally:
+                cursor.close()
+        else:
+            # No RETURNING, so this is a single executemany (batched by insertmanyvalues)
+            connection.execute(insert(Task), [dict(zip(columns, row)) for row in rows])
+    
+    def delete_batch_by_project(self, project_id: int, limit: int) -> int:
+        """Delete up to ``limit`` tasks of a project; returns how many"""
+        tasks = Task.__table__
+        result = self.db_session.execute(
+            delete(tasks).where(
+                tasks.c.id.in_(select(tasks.c.id).where(tasks.c.project_id == project_id).limit(limit))
+            )
+        )
+        return result.rowcount
+    
+    def update_status_many(self, ids_by_status: Dict[TaskStatus, List[int]]) -> List[Task]:
+        """Apply one grouped UPDATE per target status.
+        
+        DONE also sets ``closed_at`` (when not already set), like the
+        autoclose path, and any other status clears it. Returns the updated
+        tasks.
+        """
+        tasks: List[Task] = []
+        for status, ids in ids_by_status.items():
+            tasks.extend(self._update_status(status, Task.id.in_(ids)))
+        return tasks
+    
+    def update_status_where(
+        self,
+        status: TaskStatus,
+        project_id: int,
+        current_status: Optional[TaskStatus] = None
+    ) -> List[Task]:
+        """Set ``status`` on every task of the project (in ``current_status``, if given)"""
+        conditions = [Task.project_id == project_id]
+        if current_status is not None:
+            conditions.append(Task.status == current_status)
+        return self._update_status(status, and_(*conditions))
+    
+    def _update_status(self, status: TaskStatus, condition) -> List[Task]:
+        condition = and_(condition, _of_visible_project)
+        now = datetime.now()
+        values = {"status": status, "updated_at": now}
+        if status == TaskStatus.DONE:
+            values["closed_at"] = func.coalesce(Task.closed_at, now)
+        else:
+            values["closed_at"] = None
+        stmt = update(Task).where(condition).values(**values)
+        
+        if self.db_session.get_bind().dialect.update_returning:
+            return list(self.db_session.scalars(stmt.returning(Task)))
+        
+        ids = self.db_session.scalars(select(Task.id).where(condition)).all()
+        self.db_session.execute(stmt.where(Task.id.in_(ids)))
         return self.db_session.query(Task).filter(
-            Task.project_id == project_id
-        ).order_by(Task.created_at).all()
+            Task.id.in_(ids)
+        ).populate_existing().all()
+    
+    def _overdue_condition(self, now: datetime):
+        return and_(
+            Task.deadline < now,
+            Task.status != TaskStatus.DONE,
+            Task.closed_at.is_(None),
+            _of_visible_project
+        )
     
     def get_overdue_tasks(self) -> List[Task]:
         return self.db_session.query(Task).filter(
-            and_(
-                Task.deadline < datetime.now(),
-                Task.status != TaskStatus.DONE,
-                Task.closed_at.is_(None)
-            )
+            self._overdue_condition(datetime.now())
         ).all()
     
     def close_overdue_task(self, task_id: int) -> Task:
@@ -33,5 +207,71 @@ class TaskRepository(BaseRepository[Task]):
         task.closed_at = datetime.now()
         return self.update(task)
     
+    def get_upcoming_deadlines(self, until: datetime) -> List[Tuple[int, datetime]]:
+        """Return ``(id, deadline)`` of open tasks whose deadline is before ``until``"""
+        result = self.db_session.execute(
+            select(Task.id, Task.deadline).where(
+                Task.deadline < until,
+                Task.status != TaskStatus.DONE,
+                Task.closed_at.is_(None),
+                _of_visible_project
+            ).order_by(Task.deadline)
+        )
+        return [tuple(row) for row in result]
+    
+    def close_overdue_tasks(
+        self,
+        with_rows: bool = False,
+        after_id: int = 0,
+        batch_size: Optional[int] = None,
+        task_ids: Optional[List[int]] = None
+    ) -> Tuple[int, List[Tuple[int, str]], Optional[int]]:
+        """Close overdue tasks with a single set-based UPDATE.
+        
+        ``task_ids`` restricts the update to those tasks; any of them that are
+        no longer overdue are left untouched. With ``batch_size`` only the
+        next keyset batch of overdue tasks with ``id > after_id`` is closed.
+        Returns the number of closed tasks, the ``(id, title)`` of each closed
+        task when ``with_rows`` is set, and the highest task ID covered by the
+        batch (``None`` once nothing is left). ``RETURNING`` is used where the
+        dialect supports it, otherwise the rows are selected first.
+        """
+        now = datetime.now()
+        condition = and_(self._overdue_condition(now), Task.id > after_id)
+        if task_ids is not None:
+            condition = and_(condition, Task.id.in_(task_ids))
+        
+        upper_id = None
+        if batch_size is not None:
+            batch = (
+                select(Task.id).where(condition).order_by(Task.id).limit(batch_size)
+            ).subquery()
+            upper_id = self.db_session.execute(select(func.max(batch.c.id))).scalar()
+            if upper_id is None:
+                return 0, [], None
+            condition = and_(condition, Task.id <= upper_id)
+        
+        stmt = (
+            update(Task)
+            .where(condition)
+            .values(status=TaskStatus.DONE, closed_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        
+        rows: List[Tuple[int, str]] = []
+        if with_rows and self.db_session.get_bind().dialect.update_returning:
+            result = self.db_session.execute(stmt.returning(Task.id, Task.title))
+            rows = [tuple(row) for row in result]
+            closed_count = len(rows)
+        else:
+            if with_rows:
+                rows = [
+                    tuple(row) for row in
+                    self.db_session.execute(select(Task.id, Task.title).where(condition))
+                ]
+            closed_count = self.db_session.execute(stmt).rowcount
+        
+        return closed_count, rows, upper_id
+    
     def count_by_project(self, project_id: int) -> int:
-        return self.db_session.query(Task).filter(Task.project_id == project_id).count()
\ No newline at end of file
+        return self.db_session.query(Task).filter(Task.project_id == project_id).count()
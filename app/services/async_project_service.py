@@ -0,0 +1,44 @@
+from typing import List, Optional, Sequence
+from app.db.session import run_sync
+from app.models.project import Project
+from app.models.project_deletion import ProjectDeletion
+from app.repositories.base import Keyset
+from app.services.project_service import ProjectService
+
+class AsyncProjectService:
+    """ProjectService for async callers; see ``run_sync`` for how each call runs"""
+    
+    def __init__(self, db_session):
+        self.db_session = db_session
+    
+    async def _call(self, method, *args):
+        return await run_sync(self.db_session, lambda session: method(ProjectService(session), *args))
+    
+    async def create_project(self, name: str, description: str) -> Project:
+        return await self._call(ProjectService.create_project, name, description)
+    
+    async def get_project(self, project_id: int) -> Project:
+        return await self._call(ProjectService.get_project, project_id)
+    
+    async def get_project_row(self, project_id: int, fields: Sequence[str]) -> tuple:
+        return await self._call(ProjectService.get_project_row, project_id, fields)
+    
+    async def get_project_rows(
+        self,
+        fields: Sequence[str],
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None
+    ) -> List[tuple]:
+        return await self._call(ProjectService.get_project_rows, fields, after, limit)
+    
+    async def update_project(self, project_id: int, name: str, description: str) -> Project:
+        return await self._call(ProjectService.update_project, project_id, name, description)
+    
+    async def delete_project(self, project_id: int) -> None:
+        return await self._call(ProjectService.delete_project, project_id)
+    
+    async def request_project_deletion(self, project_id: int, background: Optional[bool] = None) -> Optional[ProjectDeletion]:
+        return await self._call(ProjectService.request_project_deletion, project_id, background)
+    
+    async def get_project_deletion(self, project_id: int) -> ProjectDeletion:
+        return await self._call(ProjectService.get_project_deletion, project_id)
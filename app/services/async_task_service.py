@@ -0,0 +1,79 @@
+from typing import List, Optional, Sequence, Tuple, Union
+from datetime import datetime
+from app.db.session import run_sync
+from app.models.task import Task, TaskStatus
+from app.repositories.base import Keyset
+from app.services.task_service import TaskService
+from app.exceptions.base import ToDoListException
+
+class AsyncTaskService:
+    """TaskService for async callers; see ``run_sync`` for how each call runs"""
+    
+    def __init__(self, db_session):
+        self.db_session = db_session
+    
+    async def _call(self, method, *args):
+        return await run_sync(self.db_session, lambda session: method(TaskService(session), *args))
+    
+    async def create_task(
+        self,
+        project_id: int,
+        title: str,
+        description: str,
+        deadline: Optional[datetime] = None
+    ) -> Task:
+        return await self._call(TaskService.create_task, project_id, title, description, deadline)
+    
+    async def create_tasks(self, items: List[dict]) -> List[Union[Task, ToDoListException]]:
+        return await self._call(TaskService.create_tasks, items)
+    
+    async def get_task(self, task_id: int) -> Task:
+        return await self._call(TaskService.get_task, task_id)
+    
+    async def get_task_row(self, task_id: int, fields: Sequence[str]) -> tuple:
+        return await self._call(TaskService.get_task_row, task_id, fields)
+    
+    async def get_task_version(self, task_id: int) -> Optional[datetime]:
+        return await self._call(TaskService.get_task_version, task_id)
+    
+    async def get_project_tasks_version(self, project_id: int) -> Tuple[Optional[datetime], int]:
+        return await self._call(TaskService.get_project_tasks_version, project_id)
+    
+    async def get_project_task_rows(
+        self,
+        project_id: int,
+        fields: Sequence[str],
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None
+    ) -> List[tuple]:
+        return await self._call(TaskService.get_project_task_rows, project_id, fields, after, limit)
+    
+    async def update_task_status(self, task_id: int, status: TaskStatus) -> Task:
+        return await self._call(TaskService.update_task_status, task_id, status)
+    
+    async def update_task_statuses(
+        self,
+        changes: List[Tuple[int, str]]
+    ) -> List[Union[Task, ToDoListException]]:
+        return await self._call(TaskService.update_task_statuses, changes)
+    
+    async def update_task_statuses_where(
+        self,
+        status: str,
+        project_id: int,
+        current_status: Optional[str] = None
+    ) -> List[Task]:
+        return await self._call(TaskService.update_task_statuses_where, status, project_id, current_status)
+    
+    async def update_task(
+        self,
+        task_id: int,
+        title: str,
+        description: str,
+        deadline: Optional[datetime],
+        status: TaskStatus
+    ) -> Task:
+        return await self._call(TaskService.update_task, task_id, title, description, deadline, status)
+    
+    async def delete_task(self, task_id: int) -> None:
+        return await self._call(TaskService.delete_task, task_id)
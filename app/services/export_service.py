@@ -0,0 +1,126 @@
+"""
+NDJSON export of every project and task.
+
+One JSON object per line, each with a "type" of "project" or "task". A
+project's line comes before the lines of its tasks. Rows are read through
+server-side cursors a batch at a time, and each batch becomes one chunk of
+output, so memory use does not grow with the size of the export.
+
+``updated_since`` limits the export to rows changed at or after that time,
+for incremental exports. Deletions leave no row behind, so they are not
+part of an incremental export, and a changed task is exported even when
+its project is not.
+"""
+
+import zlib
+from datetime import datetime
+from typing import Iterator, List, Optional
+from sqlalchemy.orm import Session
+from app.json_encoding import dumps
+from app.repositories.factory import project_repository_for, task_repository_for
+from app.exceptions.service_exceptions import ValidationError
+
+try:
+    # Optional: zstd output is only offered when the module is installed
+    import zstandard
+except ImportError:
+    zstandard = None
+
+PROJECT_FIELDS = ("id", "name", "description", "created_at", "updated_at")
+TASK_FIELDS = ("id", "project_id", "title", "description", "status", "deadline", "created_at", "updated_at", "closed_at")
+
+EXPORT_COMPRESSIONS = ("none", "gzip", "zstd")
+
+class _GzipStream:
+    media_type = "application/gzip"
+    extension = ".gz"
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        # Flushed per chunk, so a reader can decompress what has arrived so far
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class _ZstdStream:
+    media_type = "application/zstd"
+    extension = ".zst"
+
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+def stream_compressor(compression: str):
+    """A compressor for the ``compression`` of an export, or None for plain NDJSON"""
+    if compression not in EXPORT_COMPRESSIONS:
+        raise ValidationError(f"Unknown compression '{compression}', expected one of: {', '.join(EXPORT_COMPRESSIONS)}")
+    if compression == "gzip":
+        return _GzipStream()
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValidationError("zstd compression requires the zstandard package")
+        return _ZstdStream()
+    return None
+
+class ExportService:
+    def __init__(self, db_session: Session, batch_size: int = 1000):
+        self.project_repo = project_repository_for(db_session)
+        self.task_repo = task_repository_for(db_session)
+        self.batch_size = batch_size
+
+    def export(self, updated_since: Optional[datetime] = None, compressor=None) -> Iterator[bytes]:
+        """The export as chunks of bytes, compressed by ``compressor`` (from ``stream_compressor``) if given"""
+        chunks = self._lines(updated_since)
+        if compressor is None:
+            return chunks
+        return self._compressed(chunks, compressor)
+
+    def _lines(self, updated_since: Optional[datetime]) -> Iterator[bytes]:
+        # Projects by id and tasks by project id, merged: each project goes out
+        # before the first task of a higher (or its own) project id
+        projects = self._rows(self.project_repo.iter_row_batches_by_id(PROJECT_FIELDS, updated_since, self.batch_size))
+        project = next(projects, None)
+        lines: List[bytes] = []
+        for batch in self.task_repo.iter_row_batches_by_project(TASK_FIELDS, updated_since, self.batch_size):
+            for row in batch:
+                while project is not None and project.id <= row.project_id:
+                    lines.append(self._line("project", PROJECT_FIELDS, project))
+                    project = next(projects, None)
+                lines.append(self._line("task", TASK_FIELDS, row))
+            yield b"".join(lines)
+            lines = []
+        while project is not None:
+            lines.append(self._line("project", PROJECT_FIELDS, project))
+            project = next(projects, None)
+            if len(lines) >= self.batch_size:
+                yield b"".join(lines)
+                lines = []
+        if lines:
+            yield b"".join(lines)
+
+    @staticmethod
+    def _rows(batches: Iterator[list]) -> Iterator[tuple]:
+        for batch in batches:
+            yield from batch
+
+    @staticmethod
+    def _line(type: str, fields, row) -> bytes:
+        item = {"type": type}
+        item.update(zip(fields, row))
+        return dumps(item) + b"\n"
+
+    @staticmethod
+    def _compressed(chunks: Iterator[bytes], compressor) -> Iterator[bytes]:
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.finish()
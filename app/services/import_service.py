@@ -0,0 +1,258 @@
+"""
+Bulk import of projects and tasks from NDJSON or CSV.
+
+Records look like the lines of the export: a "type" of "project" or "task"
+and the fields of one. CSV takes the same fields as columns, with empty
+cells read as missing values.
+
+- project: ``name``, ``description``, and optionally ``id``, the project's
+  id in the source, which tasks of the same import may refer to
+- task: ``title``, ``description``, its project as either ``project`` (the
+  name of a project that exists or was imported before it) or
+  ``project_id`` (the source ``id`` of an imported project), and optionally
+  ``status`` (default todo), ``deadline``, ``created_at`` and ``closed_at``
+
+``updated_at`` is the time of the import, whatever the source says, so
+list ETags and incremental exports see the imported rows as changes.
+
+Records are validated by the same rules as the API, a batch at a time, and
+a record that breaks one is rejected with the reason instead of aborting
+the import. A project whose name is taken is rejected, and so are the
+tasks that refer to it by ``project_id``; tasks naming a project by
+``project`` are added to it, so importing them twice adds them twice.
+"""
+
+import csv
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from sqlalchemy.orm import Session
+from app.cache import cache_for
+from app.json_encoding import loads
+from app.models.task import TaskStatus
+from app.repositories.factory import project_repository_for, task_repository_for
+from app.validators.project_validators import ProjectValidator
+from app.validators.task_validators import TaskValidator
+from app.exceptions.service_exceptions import ValidationError
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+TASK_COLUMNS = ("project_id", "title", "description", "status", "deadline", "created_at", "updated_at", "closed_at")
+
+class RejectedRow(NamedTuple):
+    line: int
+    error: str
+    record: Union[dict, str]
+
+# A parsed record by its line number, or the line that could not be parsed
+Record = Tuple[int, Union[dict, RejectedRow]]
+
+def read_records(lines: Iterable[str], format: str) -> Iterator[Record]:
+    """The records of NDJSON or CSV text, numbered by the line they start on"""
+    if format not in IMPORT_FORMATS:
+        raise ValidationError(f"Unknown format '{format}', expected one of: {', '.join(IMPORT_FORMATS)}")
+    return _read_csv(lines) if format == "csv" else _read_ndjson(lines)
+
+def _read_csv(lines: Iterable[str]) -> Iterator[Record]:
+    reader = csv.DictReader(lines)
+    reader.fieldnames  # reads the header, so line_num starts after it
+    line = reader.line_num + 1
+    for row in reader:
+        # Extra cells without a header land under the key None
+        yield line, {key: value if value != "" else None for key, value in row.items() if key is not None}
+        line = reader.line_num + 1
+
+def _read_ndjson(lines: Iterable[str]) -> Iterator[Record]:
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+        except ValueError as e:
+            yield number, RejectedRow(number, f"Invalid JSON: {e}", line.rstrip("\n"))
+            continue
+        if not isinstance(record, dict):
+            yield number, RejectedRow(number, "Expected a JSON object", line.rstrip("\n"))
+            continue
+        yield number, record
+
+def _datetime(record: dict, field: str) -> Optional[datetime]:
+    value = record.get(field)
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{field} must be an ISO 8601 date and time")
+    # Stored as naive local time, like datetime.now()
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo is not None else parsed
+
+def _text(record: dict, field: str) -> Optional[str]:
+    value = record.get(field)
+    if value is not None and not isinstance(value, str):
+        raise ValidationError(f"{field} must be a string")
+    return value
+
+class ImportService:
+    """Imports one batch of records per unit of work.
+
+    ``project_ids`` (every project's id by name, fetched once) and
+    ``source_names`` (imported projects' names by source id) carry over
+    from batch to batch and are updated with the imported projects.
+    """
+
+    def __init__(self, db_session: Session, ignore_limits: bool = False):
+        self.project_repo = project_repository_for(db_session)
+        self.task_repo = task_repository_for(db_session)
+        self.cache = cache_for(db_session)
+        self.db_session = db_session
+        self.ignore_limits = ignore_limits
+        self.max_projects = int(os.getenv('MAX_NUMBER_OF_PROJECTS', 100))
+        self.max_tasks_per_project = int(os.getenv('MAX_NUMBER_OF_TASKS', 1000))
+
+    def get_project_ids(self) -> Dict[str, int]:
+        return self.project_repo.get_ids_by_name()
+
+    def import_batch(
+        self,
+        records: List[Record],
+        project_ids: Dict[str, int],
+        source_names: Dict[str, str]
+    ) -> Tuple[int, int, List[RejectedRow]]:
+        """Import the valid records; returns (projects, tasks, rejected rows).
+
+        The batch's projects are written first, so its tasks may belong to
+        them wherever they appear in the batch.
+        """
+        rejected: List[RejectedRow] = []
+        projects: List[Tuple[int, dict]] = []
+        tasks: List[Tuple[int, dict]] = []
+        for line, record in records:
+            if isinstance(record, RejectedRow):
+                rejected.append(record)
+            elif record.get("type") == "project":
+                projects.append((line, record))
+            elif record.get("type") == "task":
+                tasks.append((line, record))
+            else:
+                rejected.append(RejectedRow(line, "type must be 'project' or 'task'", record))
+
+        project_count = self._import_projects(projects, project_ids, source_names, rejected)
+        task_count = self._import_tasks(tasks, project_ids, source_names, rejected)
+        rejected.sort(key=lambda row: row.line)
+        return project_count, task_count, rejected
+
+    def _import_projects(
+        self,
+        projects: List[Tuple[int, dict]],
+        project_ids: Dict[str, int],
+        source_names: Dict[str, str],
+        rejected: List[RejectedRow]
+    ) -> int:
+        if not projects:
+            return 0
+        # One locked read of the counter for the whole batch
+        existing = None if self.ignore_limits else self.project_repo.count_for_update()
+        now = datetime.now()
+        rows: Dict[str, dict] = {}
+        source_ids: Dict[str, str] = {}
+        for line, record in projects:
+            try:
+                name = _text(record, "name")
+                description = _text(record, "description")
+                ProjectValidator.validate_name(name)
+                ProjectValidator.validate_description(description)
+                if name in project_ids or name in rows:
+                    raise ValidationError(f"Project with name '{name}' already exists")
+                if existing is not None:
+                    ProjectValidator.validate_project_limits(existing + len(rows), self.max_projects)
+                created_at = _datetime(record, "created_at") or now
+            except ValidationError as e:
+                rejected.append(RejectedRow(line, str(e), record))
+                continue
+            rows[name] = {
+                "name": name,
+                "description": description,
+                "created_at": created_at,
+                "updated_at": now,
+                "task_count": 0,
+            }
+            if record.get("id") is not None:
+                source_ids[name] = str(record["id"])
+
+        project_ids.update(self.project_repo.insert_rows(list(rows.values())))
+        for name, source_id in source_ids.items():
+            source_names[source_id] = name
+        return len(rows)
+
+    def _project_id(self, record: dict, project_ids: Dict[str, int], source_names: Dict[str, str]) -> int:
+        name = _text(record, "project")
+        if name is None:
+            source_id = record.get("project_id")
+            if source_id is None:
+                raise ValidationError("A task needs a project (name) or project_id (source id of an imported project)")
+            name = source_names.get(str(source_id))
+            if name is None:
+                raise ValidationError(f"No imported project has id {source_id} (projects must come before their tasks)")
+        project_id = project_ids.get(name)
+        if project_id is None:
+            raise ValidationError(f"Project '{name}' not found")
+        return project_id
+
+    def _import_tasks(
+        self,
+        tasks: List[Tuple[int, dict]],
+        project_ids: Dict[str, int],
+        source_names: Dict[str, str],
+        rejected: List[RejectedRow]
+    ) -> int:
+        if not tasks:
+            return 0
+        resolved: List[Tuple[int, dict, int]] = []
+        for line, record in tasks:
+            try:
+                resolved.append((line, record, self._project_id(record, project_ids, source_names)))
+            except ValidationError as e:
+                rejected.append(RejectedRow(line, str(e), record))
+
+        # One locked read of the task counts of every project in the batch
+        projects = self.project_repo.get_many_for_update({project_id for _, _, project_id in resolved})
+        task_counts = {project_id: project.task_count for project_id, project in projects.items()}
+        now = datetime.now()
+        rows: List[tuple] = []
+        for line, record, project_id in resolved:
+            try:
+                if project_id not in task_counts:
+                    raise ValidationError(f"Project with ID {project_id} not found")
+                title = _text(record, "title")
+                description = _text(record, "description")
+                TaskValidator.validate_title(title)
+                TaskValidator.validate_description(description)
+                status = TaskValidator.validate_status_string(_text(record, "status") or "todo")
+                deadline = _datetime(record, "deadline")
+                if status != TaskStatus.DONE:
+                    # Finished tasks keep their historic deadlines
+                    TaskValidator.validate_deadline(deadline)
+                if not self.ignore_limits:
+                    TaskValidator.validate_task_limits(task_counts[project_id], self.max_tasks_per_project)
+                created_at = _datetime(record, "created_at") or now
+                closed_at = _datetime(record, "closed_at")
+                if status != TaskStatus.DONE:
+                    # Only finished tasks are closed, as with status updates
+                    closed_at = None
+                elif closed_at is None:
+                    # When the source last changed it, if it says
+                    closed_at = _datetime(record, "updated_at") or now
+            except ValidationError as e:
+                rejected.append(RejectedRow(line, str(e), record))
+                continue
+            task_counts[project_id] += 1
+            rows.append((project_id, title, description, status, deadline, created_at, now, closed_at))
+
+        self.task_repo.insert_rows(TASK_COLUMNS, rows)
+        changed = [project_id for project_id, project in projects.items() if task_counts[project_id] != project.task_count]
+        for project_id in changed:
+            self.project_repo.adjust_task_count(project_id, task_counts[project_id] - projects[project_id].task_count)
+        if self.cache is not None:
+            self.cache.invalidate("project", changed, self.db_session)
+        return len(rows)
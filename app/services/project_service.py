@@ -1,19 +1,44 @@
-from typing import List
+from typing import Callable, List, Optional, Sequence, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
+from app.cache import cache_for
+from app.db.session import is_replica_session, on_commit
 from app.models.project import Project
-from app.repositories.project_repository import ProjectRepository
-from app.repositories.task_repository import TaskRepository
+from app.models.project_deletion import ProjectDeletion
+from app.repositories.base import Keyset, rows_of
+from app.repositories.factory import project_deletion_repository_for, project_repository_for, task_repository_for
 from app.validators.project_validators import ProjectValidator
 from app.exceptions.service_exceptions import LimitExceededError
 from app.exceptions.repository_exceptions import ProjectNotFoundError, DuplicateProjectError
 import os
 
+DeletionListener = Callable[[int], None]
+
 class ProjectService:
+    # Called with the project id once a background deletion is committed
+    deletion_listeners: List[DeletionListener] = []
+    
     def __init__(self, db_session: Session):
-        self.project_repo = ProjectRepository(db_session)
-        self.task_repo = TaskRepository(db_session)
+        self.project_repo = project_repository_for(db_session)
+        self.task_repo = task_repository_for(db_session)
+        self.deletion_repo = project_deletion_repository_for(db_session)
+        self.cache = cache_for(db_session)
+        # A lagging replica must not put old rows into the cache
+        self.fill_cache = not is_replica_session(db_session)
         self.max_projects = int(os.getenv('MAX_NUMBER_OF_PROJECTS', 100))
+        # Projects with more tasks are deleted in the background by default:
+        # half the per-project task limit, so that full projects always are
+        max_tasks_per_project = int(os.getenv('MAX_NUMBER_OF_TASKS', 1000))
+        self.background_delete_min_tasks = int(os.getenv('PROJECT_DELETE_BACKGROUND_MIN_TASKS', max_tasks_per_project // 2))
+    
+    @classmethod
+    def add_deletion_listener(cls, listener: DeletionListener) -> None:
+        cls.deletion_listeners.append(listener)
+    
+    @classmethod
+    def remove_deletion_listener(cls, listener: DeletionListener) -> None:
+        if listener in cls.deletion_listeners:
+            cls.deletion_listeners.remove(listener)
     
     def create_project(self, name: str, description: str) -> Project:
         # Validate inputs using validators
@@ -21,8 +46,8 @@ class ProjectService:
         ProjectValidator.validate_description(description)
         
         # Check project limit
-        projects = self.project_repo.get_all()
-        ProjectValidator.validate_project_limits(len(projects), self.max_projects)
+        project_count = self.project_repo.count_for_update()
+        ProjectValidator.validate_project_limits(project_count, self.max_projects)
         
         project = Project(
             name=name,
@@ -32,16 +57,51 @@ class ProjectService:
         return self.project_repo.create(project)
     
     def get_project(self, project_id: int) -> Project:
+        """The project, as a read-only snapshot when the entity cache is enabled"""
+        if self.cache is not None:
+            project = self.cache.get("project", project_id, lambda: self.project_repo.get(project_id), self.fill_cache)
+        else:
+            project = self.project_repo.get(project_id)
+        if not project:
+            raise ProjectNotFoundError(f"Project with ID {project_id} not found")
+        return project
+    
+    def get_project_row(self, project_id: int, fields: Sequence[str]) -> tuple:
+        """The columns ``fields`` of a project: from its cached snapshot if any, otherwise a select of just those"""
+        if self.cache is not None:
+            project = self.cache.peek("project", project_id)
+            if project is not None:
+                return rows_of([project], fields)[0]
+        row = self.project_repo.get_row(project_id, fields)
+        if row is None:
+            raise ProjectNotFoundError(f"Project with ID {project_id} not found")
+        return row
+    
+    def _invalidate(self, kind: str, ids: List[int]) -> None:
+        """Drop written entities from the entity cache, now and after the commit"""
+        if self.cache is not None:
+            self.cache.invalidate(kind, ids, self.project_repo.db_session)
+    
+    def _get_project_for_write(self, project_id: int) -> Project:
         project = self.project_repo.get(project_id)
         if not project:
             raise ProjectNotFoundError(f"Project with ID {project_id} not found")
         return project
     
-    def get_all_projects(self) -> List[Project]:
-        return self.project_repo.get_all_ordered()
+    def get_all_projects(self, after: Optional[Keyset] = None, limit: Optional[int] = None) -> List[Project]:
+        return self.project_repo.get_all_ordered(after=after, limit=limit)
+    
+    def get_project_rows(
+        self,
+        fields: Sequence[str],
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None
+    ) -> List[tuple]:
+        """Like ``get_all_projects``, as plain rows of the columns ``fields``"""
+        return self.project_repo.get_rows_ordered(fields, after=after, limit=limit)
     
     def update_project(self, project_id: int, name: str, description: str) -> Project:
-        project = self.get_project(project_id)
+        project = self._get_project_for_write(project_id)
         
         # Validate new inputs using validators
         ProjectValidator.validate_name(name)
@@ -51,8 +111,93 @@ class ProjectService:
         project.description = description
         project.updated_at = datetime.now()
         
-        return self.project_repo.update(project)
+        project = self.project_repo.update(project)
+        self._invalidate("project", [project_id])
+        return project
     
     def delete_project(self, project_id: int) -> None:
-        project = self.get_project(project_id)
-        self.project_repo.delete(project_id)
\ No newline at end of file
+        project = self._get_project_for_write(project_id)
+        self.project_repo.delete(project_id)
+        self._invalidate("project", [project_id])
+        if self.cache is not None:
+            # Its tasks are deleted by cascade
+            self.cache.invalidate_project_tasks(project_id, self.project_repo.db_session)
+    
+    def request_project_deletion(self, project_id: int, background: Optional[bool] = None) -> Optional[ProjectDeletion]:
+        """Delete a project now, or hide it and leave its tasks to the background purge.
+        
+        ``background`` defaults to whether the project has more than
+        PROJECT_DELETE_BACKGROUND_MIN_TASKS tasks (half of MAX_NUMBER_OF_TASKS
+        unless set). Returns the deletion
+        record when the deletion was left to the background, None when the
+        project is already gone. The in-memory backend always deletes at once.
+        """
+        project = self.project_repo.get_for_update(project_id)
+        if not project:
+            raise ProjectNotFoundError(f"Project with ID {project_id} not found")
+        if background is None:
+            background = project.task_count > self.background_delete_min_tasks
+        if not background or self.deletion_repo is None:
+            self.delete_project(project_id)
+            return None
+        
+        self.project_repo.hide(project)
+        deletion = self.deletion_repo.replace(ProjectDeletion(
+            project_id=project_id,
+            name=project.name,
+            tasks_total=project.task_count,
+            tasks_deleted=0,
+            requested_at=project.deleted_at
+        ))
+        self._invalidate("project", [project_id])
+        if self.cache is not None:
+            self.cache.invalidate_project_tasks(project_id, self.project_repo.db_session)
+        
+        self._notify_deletion(project_id)
+        return deletion
+    
+    def _notify_deletion(self, project_id: int) -> None:
+        """Tell the deletion listeners about the project once the transaction commits"""
+        if not self.deletion_listeners:
+            return
+        
+        def notify():
+            for listener in self.deletion_listeners:
+                listener(project_id)
+        
+        on_commit(self.project_repo.db_session, notify)
+    
+    def get_project_deletion(self, project_id: int) -> ProjectDeletion:
+        """Progress of the project's background deletion"""
+        deletion = self.deletion_repo.get(project_id) if self.deletion_repo is not None else None
+        if deletion is None:
+            raise ProjectNotFoundError(f"No background deletion of project {project_id}")
+        return deletion
+    
+    def get_pending_deletions(self) -> List[int]:
+        """Projects whose background deletion has not completed"""
+        return self.deletion_repo.get_pending_ids() if self.deletion_repo is not None else []
+    
+    def purge_project_tasks(self, project_id: int, batch_size: int) -> Tuple[int, bool]:
+        """Delete the next ``batch_size`` tasks of a project deleted in the background.
+        
+        Keeps the project's ``task_count`` and the deletion's progress in
+        step with every batch, and deletes the project itself with the last
+        one. Returns how many tasks it deleted and whether the deletion is
+        complete.
+        """
+        deletion = self.deletion_repo.get_for_update(project_id)
+        if deletion is None or deletion.completed_at is not None:
+            return 0, True
+        
+        deleted = self.task_repo.delete_batch_by_project(project_id, batch_size)
+        if deleted:
+            self.project_repo.adjust_task_count(project_id, -deleted)
+            deletion.tasks_deleted += deleted
+        if deleted < batch_size:
+            self.project_repo.delete(project_id)
+            deletion.completed_at = datetime.now()
+            if self.cache is not None:
+                self.cache.invalidate_project_tasks(project_id, self.project_repo.db_session)
+        self.deletion_repo.update(deletion)
+        return deleted, deletion.completed_at is not None
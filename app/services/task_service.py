@@ -1,20 +1,63 @@
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 from datetime import datetime
 from sqlalchemy.orm import Session
+from app.cache import cache_for
+from app.db.session import is_replica_session, on_commit
 from app.models.task import Task, TaskStatus
-from app.repositories.task_repository import TaskRepository
-from app.repositories.project_repository import ProjectRepository
+from app.repositories.base import Keyset, rows_of
+from app.repositories.factory import project_repository_for, task_repository_for
 from app.validators.task_validators import TaskValidator
-from app.exceptions.service_exceptions import LimitExceededError
+from app.exceptions.service_exceptions import LimitExceededError, ValidationError
+from app.exceptions.base import ToDoListException
 from app.exceptions.repository_exceptions import ProjectNotFoundError, TaskNotFoundError
 import os
 
+DeadlineListener = Callable[[int, Optional[datetime]], None]
+
 class TaskService:
+    # Called with (task_id, deadline) after a task is created or edited
+    deadline_listeners: List[DeadlineListener] = []
+    
     def __init__(self, db_session: Session):
-        self.task_repo = TaskRepository(db_session)
-        self.project_repo = ProjectRepository(db_session)
+        self.task_repo = task_repository_for(db_session)
+        self.project_repo = project_repository_for(db_session)
+        self.cache = cache_for(db_session)
+        # A lagging replica must not put old rows into the cache
+        self.fill_cache = not is_replica_session(db_session)
         self.max_tasks_per_project = int(os.getenv('MAX_NUMBER_OF_TASKS', 1000))
     
+    @classmethod
+    def add_deadline_listener(cls, listener: DeadlineListener) -> None:
+        cls.deadline_listeners.append(listener)
+    
+    @classmethod
+    def remove_deadline_listener(cls, listener: DeadlineListener) -> None:
+        if listener in cls.deadline_listeners:
+            cls.deadline_listeners.remove(listener)
+    
+    def _notify_deadlines(self, tasks: List[Task]) -> None:
+        """Tell the deadline listeners about the tasks once the transaction commits"""
+        if not self.deadline_listeners or not tasks:
+            return
+        changes = [(task.id, task.deadline) for task in tasks]
+        
+        def notify():
+            for task_id, deadline in changes:
+                for listener in self.deadline_listeners:
+                    listener(task_id, deadline)
+        
+        on_commit(self.task_repo.db_session, notify)
+    
+    def _invalidate(self, kind: str, ids: List[int]) -> None:
+        """Drop written entities from the entity cache, now and after the commit"""
+        if self.cache is not None:
+            self.cache.invalidate(kind, ids, self.task_repo.db_session)
+    
+    def _project_exists(self, project_id: int) -> bool:
+        if self.cache is not None:
+            return self.cache.get("project", project_id, lambda: self.project_repo.get(project_id), self.fill_cache) is not None
+        return self.project_repo.get(project_id) is not None
+    
     def create_task(
         self, 
         project_id: int, 
@@ -22,8 +65,8 @@ class TaskService:
         description: str, 
         deadline: Optional[datetime] = None
     ) -> Task:
-        # Verify project exists
-        project = self.project_repo.get(project_id)
+        # Verify project exists; its row lock serializes creates in this project only
+        project = self.project_repo.get_for_update(project_id)
         if not project:
             raise ProjectNotFoundError(f"Project with ID {project_id} not found")
         
@@ -33,8 +76,7 @@ class TaskService:
         TaskValidator.validate_deadline(deadline)
         
         # Check task limit for project
-        task_count = self.task_repo.count_by_project(project_id)
-        TaskValidator.validate_task_limits(task_count, self.max_tasks_per_project)
+        TaskValidator.validate_task_limits(project.task_count, self.max_tasks_per_project)
         
         task = Task(
             project_id=project_id,
@@ -44,32 +86,211 @@ class TaskService:
             status=TaskStatus.TODO
         )
         
-        return self.task_repo.create(task)
+        self.project_repo.adjust_task_count(project_id, 1)
+        self._invalidate("project", [project_id])
+        task = self.task_repo.create(task)
+        self._notify_deadlines([task])
+        return task
+    
+    def create_tasks(self, items: List[dict]) -> List[Union[Task, ToDoListException]]:
+        """Create many tasks in one transaction.
+        
+        Each item holds ``project_id``, ``title``, ``description`` and
+        optionally ``deadline``. Returns, in item order, the created task or
+        the error that rejected the item.
+        """
+        projects = self.project_repo.get_many_for_update(item["project_id"] for item in items)
+        task_counts: Dict[int, int] = {
+            project_id: project.task_count for project_id, project in projects.items()
+        }
+        
+        now = datetime.now()
+        results: List[Union[Task, ToDoListException]] = []
+        rows = []
+        for item in items:
+            project_id = item["project_id"]
+            deadline = item.get("deadline")
+            try:
+                if project_id not in projects:
+                    raise ProjectNotFoundError(f"Project with ID {project_id} not found")
+                TaskValidator.validate_title(item["title"])
+                TaskValidator.validate_description(item["description"])
+                TaskValidator.validate_deadline(deadline)
+                TaskValidator.validate_task_limits(task_counts[project_id], self.max_tasks_per_project)
+            except ToDoListException as e:
+                results.append(e)
+                continue
+            
+            task_counts[project_id] += 1
+            results.append(None)
+            rows.append({
+                "project_id": project_id,
+                "title": item["title"],
+                "description": item["description"],
+                "deadline": deadline,
+                "status": TaskStatus.TODO,
+                "created_at": now,
+                "updated_at": now,
+            })
+        
+        changed = [project_id for project_id, project in projects.items() if task_counts[project_id] != project.task_count]
+        for project_id in changed:
+            self.project_repo.adjust_task_count(project_id, task_counts[project_id] - projects[project_id].task_count)
+        self._invalidate("project", changed)
+        
+        created = iter(self.task_repo.create_many(rows))
+        results = [next(created) if result is None else result for result in results]
+        
+        self._notify_deadlines([task for task in results if isinstance(task, Task)])
+        return results
     
     def get_task(self, task_id: int) -> Task:
+        """The task, as a read-only snapshot when the entity cache is enabled"""
+        if self.cache is not None:
+            task = self.cache.get("task", task_id, lambda: self.task_repo.get(task_id), self.fill_cache)
+        else:
+            task = self.task_repo.get(task_id)
+        if not task:
+            raise TaskNotFoundError(f"Task with ID {task_id} not found")
+        return task
+    
+    def get_task_row(self, task_id: int, fields: Sequence[str]) -> tuple:
+        """The columns ``fields`` of a task: from its cached snapshot if any, otherwise a select of just those"""
+        if self.cache is not None:
+            task = self.cache.peek("task", task_id)
+            if task is not None:
+                return rows_of([task], fields)[0]
+        row = self.task_repo.get_row(task_id, fields)
+        if row is None:
+            raise TaskNotFoundError(f"Task with ID {task_id} not found")
+        return row
+    
+    def get_task_version(self, task_id: int) -> Optional[datetime]:
+        """``updated_at`` of a task without loading it; None if it does not exist"""
+        if self.cache is not None:
+            task = self.cache.peek("task", task_id)
+            if task is not None:
+                return task.updated_at
+        return self.task_repo.get_updated_at(task_id)
+    
+    def get_project_tasks_version(self, project_id: int) -> Tuple[Optional[datetime], int]:
+        """``(latest updated_at, count)`` of a project's tasks; changes whenever any page of its list does"""
+        if not self._project_exists(project_id):
+            raise ProjectNotFoundError(f"Project with ID {project_id} not found")
+        return self.task_repo.get_project_version(project_id)
+    
+    def _get_task_for_write(self, task_id: int) -> Task:
         task = self.task_repo.get(task_id)
         if not task:
             raise TaskNotFoundError(f"Task with ID {task_id} not found")
         return task
     
-    def get_project_tasks(self, project_id: int) -> List[Task]:
+    def get_project_tasks(
+        self,
+        project_id: int,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
         # Verify project exists
-        project = self.project_repo.get(project_id)
-        if not project:
+        if not self._project_exists(project_id):
             raise ProjectNotFoundError(f"Project with ID {project_id} not found")
         
-        return self.task_repo.get_by_project(project_id)
+        return self.task_repo.get_by_project(project_id, after=after, limit=limit)
+    
+    def get_project_task_rows(
+        self,
+        project_id: int,
+        fields: Sequence[str],
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None
+    ) -> List[tuple]:
+        """Like ``get_project_tasks``, as plain rows of the columns ``fields``"""
+        if not self._project_exists(project_id):
+            raise ProjectNotFoundError(f"Project with ID {project_id} not found")
+        
+        return self.task_repo.get_rows_by_project(project_id, fields, after=after, limit=limit)
+    
+    @staticmethod
+    def _set_status(task: Task, status: TaskStatus, now: datetime) -> None:
+        """DONE sets ``closed_at`` (when not already set), any other status clears it, as the batch updates do"""
+        if status == TaskStatus.DONE:
+            task.closed_at = task.closed_at or now
+        else:
+            task.closed_at = None
+        task.status = status
     
     def update_task_status(self, task_id: int, status: TaskStatus) -> Task:
-        task = self.get_task(task_id)
+        task = self._get_task_for_write(task_id)
         
         # Validate status using validator
         TaskValidator.validate_status(status)
         
-        task.status = status
         task.updated_at = datetime.now()
+        self._set_status(task, status, task.updated_at)
         
-        return self.task_repo.update(task)
+        task = self.task_repo.update(task)
+        self._invalidate("task", [task_id])
+        self._notify_deadlines([task])
+        return task
+    
+    def update_task_statuses(
+        self,
+        changes: List[Tuple[int, str]]
+    ) -> List[Union[Task, ToDoListException]]:
+        """Apply many ``(task_id, status)`` changes in one transaction.
+        
+        Changes are grouped into one UPDATE per target status. Returns, in
+        change order, the updated task or the error that rejected the change.
+        """
+        errors: Dict[int, ToDoListException] = {}
+        # A task listed more than once ends in its last status, as with sequential PATCHes
+        final_status: Dict[int, TaskStatus] = {}
+        for index, (task_id, status_str) in enumerate(changes):
+            try:
+                final_status[task_id] = TaskValidator.validate_status_string(status_str.lower())
+            except ToDoListException as e:
+                errors[index] = e
+        
+        ids_by_status: Dict[TaskStatus, List[int]] = {}
+        for task_id, status in final_status.items():
+            ids_by_status.setdefault(status, []).append(task_id)
+        
+        updated = {task.id: task for task in self.task_repo.update_status_many(ids_by_status)}
+        
+        results: List[Union[Task, ToDoListException]] = []
+        for index, (task_id, _) in enumerate(changes):
+            if index in errors:
+                results.append(errors[index])
+            elif task_id not in updated:
+                results.append(TaskNotFoundError(f"Task with ID {task_id} not found"))
+            else:
+                results.append(updated[task_id])
+        
+        self._invalidate("task", list(updated))
+        self._notify_deadlines(list(updated.values()))
+        return results
+    
+    def update_task_statuses_where(
+        self,
+        status: str,
+        project_id: int,
+        current_status: Optional[str] = None
+    ) -> List[Task]:
+        """Move every task of a project (in a given status, if any) to ``status``"""
+        if project_id is None:
+            # Otherwise a single UPDATE could touch, and return, every task in the database
+            raise ValidationError("A project_id filter is required")
+        
+        target_status = TaskValidator.validate_status_string(status.lower())
+        if current_status is not None:
+            current_status = TaskValidator.validate_status_string(current_status.lower())
+        if not self._project_exists(project_id):
+            raise ProjectNotFoundError(f"Project with ID {project_id} not found")
+        
+        tasks = self.task_repo.update_status_where(target_status, project_id, current_status)
+        self._invalidate("task", [task.id for task in tasks])
+        self._notify_deadlines(tasks)
+        return tasks
     
     def update_task(
         self, 
@@ -79,7 +300,7 @@ class TaskService:
         deadline: Optional[datetime],
         status: TaskStatus
     ) -> Task:
-        task = self.get_task(task_id)
+        task = self._get_task_for_write(task_id)
         
         # Validate all inputs using validators
         TaskValidator.validate_title(title)
@@ -90,17 +311,45 @@ class TaskService:
         task.title = title
         task.description = description
         task.deadline = deadline
-        task.status = status
         task.updated_at = datetime.now()
+        self._set_status(task, status, task.updated_at)
         
-        return self.task_repo.update(task)
+        task = self.task_repo.update(task)
+        self._invalidate("task", [task_id])
+        self._notify_deadlines([task])
+        return task
     
     def delete_task(self, task_id: int) -> None:
-        task = self.get_task(task_id)
+        task = self._get_task_for_write(task_id)
+        self.project_repo.adjust_task_count(task.project_id, -1)
         self.task_repo.delete(task_id)
+        self._invalidate("task", [task_id])
+        self._invalidate("project", [task.project_id])
     
     def get_overdue_tasks(self) -> List[Task]:
         return self.task_repo.get_overdue_tasks()
     
     def close_overdue_task(self, task_id: int) -> Task:
-        return self.task_repo.close_overdue_task(task_id)
\ No newline at end of file
+        task = self.task_repo.close_overdue_task(task_id)
+        self._invalidate("task", [task_id])
+        return task
+    
+    def get_upcoming_deadlines(self, until: datetime) -> List[Tuple[int, datetime]]:
+        return self.task_repo.get_upcoming_deadlines(until)
+    
+    def close_overdue_tasks(
+        self,
+        with_rows: bool = False,
+        after_id: int = 0,
+        batch_size: Optional[int] = None,
+        task_ids: Optional[List[int]] = None
+    ) -> Tuple[int, List[Tuple[int, str]], Optional[int]]:
+        # The closed IDs are needed to invalidate their cache entries
+        closed_count, rows, upper_id = self.task_repo.close_overdue_tasks(
+            with_rows=with_rows or self.cache is not None,
+            after_id=after_id,
+            batch_size=batch_size,
+            task_ids=task_ids
+        )
+        self._invalidate("task", [task_id for task_id, _ in rows])
+        return closed_count, rows if with_rows else [], upper_id
\ No newline at end of file
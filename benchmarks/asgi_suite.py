@@ -0,0 +1,387 @@
+"""
+Load-test the API in-process and compare the results with stored baselines.
+
+Drives api.app.app through Starlette's TestClient, an in-process ASGI
+client (no server, no sockets), against a temporary SQLite file or the
+database given with --url, e.g. a local Postgres. Every scenario starts
+from an empty schema, seeds what it needs with bulk inserts and then times
+its operations:
+
+    create        100 projects x 1000 tasks, one POST per row
+    list          fetch a full 1000-task project in one page
+    mixed         reads and writes over 100 seeded projects
+    status-churn  single-task status changes
+    autoclose     close 1M overdue tasks in committed batches of 1000
+
+Each scenario reports throughput, p50/p95/p99 latency and SQL queries per
+operation (from the Server-Timing header of SQL_INSTRUMENTATION). The
+results are compared with benchmarks/baselines/<dialect>.json, and the run
+exits with status 1 when throughput drops, or p95 latency or queries per
+operation grow, by more than --threshold.
+
+    poetry run python -m benchmarks.asgi_suite --scale 0.1
+    poetry run python -m benchmarks.asgi_suite --save-baseline
+    poetry run python -m benchmarks.asgi_suite --url postgresql://.../scratch -s list -s mixed
+
+--scale multiplies the number of tasks and operations (not projects).
+Baselines only compare against runs with the same scale. The database given
+with --url is dropped and recreated, so never point it at real data.
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import click
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+CHUNK_SIZE = 50_000
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+# metric -> direction in which it regresses
+CHECKED_METRICS = {"throughput": "lower", "p95_ms": "higher", "queries_per_op": "higher"}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+class Recorder:
+    """Latency and SQL query count of every timed operation of a scenario"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.queries = 0
+        self.rows = 0
+        self.started = time.perf_counter()
+
+    def request(self, client, method: str, url: str, expected=(200,), **kwargs):
+        started = time.perf_counter()
+        response = client.request(method, url, **kwargs)
+        self.latencies.append(time.perf_counter() - started)
+        if response.status_code not in expected:
+            raise click.ClickException(f"{method} {url} returned {response.status_code}: {response.text}")
+        match = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+        if match:
+            self.queries += int(match.group(1))
+        return response
+
+    def call(self, fn: Callable):
+        from app.db.instrumentation import track_queries
+
+        started = time.perf_counter()
+        with track_queries() as stats:
+            result = fn()
+        self.latencies.append(time.perf_counter() - started)
+        self.queries += stats.count
+        return result
+
+    def result(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        operations = len(latencies)
+        result = {
+            "operations": operations,
+            "seconds": round(elapsed, 3),
+            "throughput": round(operations / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "queries_per_op": round(self.queries / operations, 3) if operations else 0.0,
+        }
+        if self.rows:
+            result["rows_per_second"] = round(self.rows / elapsed, 2)
+        return result
+
+
+def reset_schema(engine) -> None:
+    from app.db.base import Base
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def seed(engine, project_count: int, tasks_per_project: int, overdue: bool = False) -> None:
+    """Bulk insert projects with their tasks, keeping the quota counters exact"""
+    from sqlalchemy import insert, select
+
+    from app.models.project import Project
+    from app.models.quota_counter import QuotaCounter
+    from app.models.task import Task, TaskStatus
+
+    now = datetime.now()
+    deadline = now - timedelta(days=1) if overdue else now + timedelta(days=365)
+    total = project_count * tasks_per_project
+
+    with engine.begin() as conn:
+        conn.execute(insert(Project), [
+            {
+                "name": f"project-{i}",
+                "description": "seeded",
+                "created_at": now,
+                "updated_at": now,
+                "task_count": tasks_per_project,
+            }
+            for i in range(project_count)
+        ])
+        conn.execute(insert(QuotaCounter), [{"name": QuotaCounter.PROJECTS, "value": project_count}])
+        project_ids = conn.execute(select(Project.id).order_by(Project.id)).scalars().all()
+
+        rows = []
+        for i in range(total):
+            created_at = now - timedelta(seconds=total - i)
+            rows.append({
+                "project_id": project_ids[i // tasks_per_project],
+                "title": f"task-{i}",
+                "description": "seeded",
+                "status": TaskStatus.TODO,
+                "deadline": deadline,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            if len(rows) == CHUNK_SIZE:
+                conn.execute(insert(Task), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Task), rows)
+
+
+def ids_of(engine, column) -> List[int]:
+    from sqlalchemy import select
+
+    with engine.connect() as conn:
+        return conn.execute(select(column).order_by(column)).scalars().all()
+
+
+def scenario_create(client, engine, scale: float, rng: random.Random) -> Recorder:
+    tasks_per_project = max(int(1000 * scale), 1)
+    recorder = Recorder()
+    for p in range(100):
+        project = recorder.request(
+            client, "POST", "/api/projects", expected=(201,),
+            json={"name": f"project-{p}", "description": "benchmark"},
+        ).json()
+        for t in range(tasks_per_project):
+            recorder.request(client, "POST", "/api/tasks", expected=(201,), json={
+                "project_id": project["id"],
+                "title": f"task-{t}",
+                "description": "benchmark",
+                "deadline": "2099-12-31",
+            })
+    return recorder
+
+
+def scenario_list(client, engine, scale: float, rng: random.Random) -> Recorder:
+    from app.models.project import Project
+
+    seed(engine, 1, 1000)
+    project_id = ids_of(engine, Project.id)[0]
+    recorder = Recorder()
+    for _ in range(max(int(200 * scale), 1)):
+        page = recorder.request(client, "GET", f"/api/projects/{project_id}/tasks", params={"limit": 1000}).json()
+        assert len(page["items"]) == 1000, len(page["items"])
+    return recorder
+
+
+def scenario_mixed(client, engine, scale: float, rng: random.Random) -> Recorder:
+    from app.models.project import Project
+    from app.models.task import Task
+
+    seed(engine, 100, 100)
+    project_ids = ids_of(engine, Project.id)
+    task_ids = ids_of(engine, Task.id)
+    statuses = ["todo", "doing", "done"]
+
+    recorder = Recorder()
+    for i in range(max(int(10_000 * scale), 1)):
+        roll = rng.random()
+        if roll < 0.40:
+            recorder.request(client, "GET", f"/api/tasks/{rng.choice(task_ids)}")
+        elif roll < 0.65:
+            recorder.request(client, "GET", f"/api/projects/{rng.choice(project_ids)}/tasks", params={"limit": 100})
+        elif roll < 0.75:
+            recorder.request(client, "GET", f"/api/projects/{rng.choice(project_ids)}")
+        elif roll < 0.80:
+            recorder.request(client, "GET", "/api/projects", params={"limit": 100})
+        elif roll < 0.90:
+            task = recorder.request(client, "POST", "/api/tasks", expected=(201,), json={
+                "project_id": rng.choice(project_ids),
+                "title": f"mixed-{i}",
+                "description": "benchmark",
+                "deadline": "2099-12-31",
+            }).json()
+            task_ids.append(task["id"])
+        elif roll < 0.95:
+            recorder.request(client, "PATCH", f"/api/tasks/{rng.choice(task_ids)}/status",
+                             json={"status": rng.choice(statuses)})
+        else:
+            recorder.request(client, "PUT", f"/api/tasks/{rng.choice(task_ids)}", json={
+                "title": f"edited-{i}",
+                "description": "benchmark",
+                "status": rng.choice(statuses),
+                "deadline": "2099-12-31T00:00:00",
+            })
+    return recorder
+
+
+def scenario_status_churn(client, engine, scale: float, rng: random.Random) -> Recorder:
+    from app.models.task import Task
+
+    seed(engine, 10, 1000)
+    task_ids = ids_of(engine, Task.id)
+    statuses = ["todo", "doing", "done"]
+
+    recorder = Recorder()
+    for _ in range(max(int(10_000 * scale), 1)):
+        recorder.request(client, "PATCH", f"/api/tasks/{rng.choice(task_ids)}/status",
+                         json={"status": rng.choice(statuses)})
+    return recorder
+
+
+def scenario_autoclose(client, engine, scale: float, rng: random.Random) -> Recorder:
+    from app.db.session import db_session
+    from app.services.task_service import TaskService
+
+    seed(engine, 1000, max(int(1000 * scale), 1), overdue=True)
+
+    session = db_session.get_session()
+    try:
+        task_service = TaskService(session)
+        after_id = 0
+
+        def close_batch():
+            count, _, last_id = task_service.close_overdue_tasks(after_id=after_id, batch_size=1000)
+            session.commit()
+            return count, last_id
+
+        recorder = Recorder()
+        while True:
+            count, last_id = recorder.call(close_batch)
+            if last_id is None:
+                break
+            recorder.rows += count
+            after_id = last_id
+    finally:
+        session.close()
+    return recorder
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "create": scenario_create,
+    "list": scenario_list,
+    "mixed": scenario_mixed,
+    "status-churn": scenario_status_churn,
+    "autoclose": scenario_autoclose,
+}
+
+
+def compare(name: str, result: dict, baseline: Optional[dict], threshold: float) -> List[str]:
+    """Describe every checked metric that regressed beyond the threshold"""
+    if baseline is None:
+        return []
+    regressions = []
+    for metric, direction in CHECKED_METRICS.items():
+        expected, actual = baseline.get(metric), result[metric]
+        if not expected:
+            continue
+        change = (actual - expected) / expected
+        if (direction == "lower" and change < -threshold) or (direction == "higher" and change > threshold):
+            regressions.append(f"{name}: {metric} {expected} -> {actual} ({change:+.1%})")
+    return regressions
+
+
+def format_result(name: str, result: dict) -> str:
+    line = (
+        f"{name:<13} {result['operations']:>8} ops  {result['throughput']:>9.1f} ops/s  "
+        f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  "
+        f"{result['queries_per_op']:>6.2f} queries/op"
+    )
+    if "rows_per_second" in result:
+        line += f"  {result['rows_per_second']:.0f} rows/s"
+    return line
+
+
+@click.command()
+@click.option("--scenario", "-s", "scenarios", multiple=True, type=click.Choice(list(SCENARIOS)),
+              help="Scenario to run (repeatable; default: all)")
+@click.option("--scale", default=1.0, show_default=True, help="Multiplier for task and operation counts")
+@click.option("--url", default=None, help="Scratch database URL (default: temporary SQLite file)")
+@click.option("--baseline", "baseline_path", default=None, help="Baseline file (default: baselines/<dialect>.json)")
+@click.option("--threshold", default=0.2, show_default=True, help="Allowed relative regression, e.g. 0.2 for 20%")
+@click.option("--save-baseline", is_flag=True, help="Store the results as the new baseline")
+@click.option("--seed", "seed_value", default=42, show_default=True)
+def main(scenarios, scale, url, baseline_path, threshold, save_baseline, seed_value):
+    tmp_dir = None
+    if url is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmp_dir.name, 'bench.db')}"
+
+    # The app binds its engine and reads its limits when imported
+    os.environ["DATABASE_URL"] = url
+    os.environ["SQL_INSTRUMENTATION"] = "true"
+    os.environ["DEADLINE_SCHEDULER_IN_API"] = "false"
+    os.environ["MAX_NUMBER_OF_PROJECTS"] = "1000000"
+    os.environ["MAX_NUMBER_OF_TASKS"] = "1000000"
+
+    from fastapi.testclient import TestClient
+
+    from api.app import app
+    from app.db.session import db_session
+
+    # Per-request SQL log lines would dominate the output
+    logging.getLogger("api.sql").setLevel(logging.WARNING)
+    engine = db_session.engine
+
+    if baseline_path is None:
+        baseline_path = os.path.join(BASELINE_DIR, f"{engine.dialect.name}.json")
+    baselines = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baselines = json.load(f)
+
+    results = {}
+    regressions = []
+    with TestClient(app) as client:
+        for name in scenarios or SCENARIOS:
+            reset_schema(engine)
+            result = SCENARIOS[name](client, engine, scale, random.Random(seed_value)).result()
+            result["scale"] = scale
+            results[name] = result
+            click.echo(format_result(name, result))
+
+            baseline = baselines.get(name)
+            if baseline is not None and baseline.get("scale") != scale:
+                click.echo(f"  baseline ran at scale {baseline.get('scale')}, not compared")
+                baseline = None
+            regressions += compare(name, result, baseline, threshold)
+
+    engine.dispose()
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+    if save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump({**baselines, **results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        click.echo(f"Baseline saved to {baseline_path}")
+
+    if regressions:
+        click.echo(click.style(f"\nRegressions beyond {threshold:.0%}:", fg="red", bold=True))
+        for regression in regressions:
+            click.echo(f"  {regression}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Show how the task indexes change the plans of the hot task queries.
+
+Seeds a scratch database with N tasks, then prints the query plan and
+timing of the per-project listing, the per-project count and the overdue
+scan, first without and then with the indexes declared on the Task model.
+
+    poetry run python -m benchmarks.index_plans --tasks 1000000
+    poetry run python -m benchmarks.index_plans --url postgresql://.../scratch
+
+The database given with --url is dropped and recreated, so never point it
+at real data.
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.models.base import Base
+from app.models.project import Project
+from app.models.task import Task, TaskStatus
+
+CHUNK_SIZE = 50_000
+
+
+def seed(engine, task_count: int, tasks_per_project: int, seed_value: int) -> int:
+    """Bulk insert projects and tasks; returns a project id to query"""
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    project_count = max(task_count // tasks_per_project, 1)
+
+    with engine.begin() as conn:
+        conn.execute(insert(Project), [
+            {"name": f"project-{i}", "description": "seeded", "created_at": now, "updated_at": now}
+            for i in range(project_count)
+        ])
+        project_ids = conn.execute(select(Project.id)).scalars().all()
+
+        rows = []
+        for i in range(task_count):
+            deadline = now + timedelta(minutes=rng.randint(-60 * 24 * 30, 60 * 24 * 30))
+            closed = deadline < now and rng.random() < 0.9
+            created_at = now - timedelta(seconds=task_count - i)
+            rows.append({
+                "project_id": project_ids[i % project_count],
+                "title": f"task-{i}",
+                "description": "seeded",
+                "status": TaskStatus.DONE if closed else TaskStatus.TODO,
+                "deadline": deadline,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "closed_at": deadline if closed else None,
+            })
+            if len(rows) == CHUNK_SIZE:
+                conn.execute(insert(Task), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Task), rows)
+
+    return project_ids[len(project_ids) // 2]
+
+
+def hot_queries(project_id: int):
+    now = datetime.now()
+    return [
+        ("get_by_project", select(Task).where(Task.project_id == project_id).order_by(Task.created_at)),
+        ("count_by_project", select(func.count()).select_from(Task).where(Task.project_id == project_id)),
+        ("get_overdue_tasks", select(Task).where(
+            Task.deadline < now,
+            Task.status != TaskStatus.DONE,
+            Task.closed_at.is_(None),
+        )),
+    ]
+
+
+def explain(conn, stmt) -> str:
+    sql = str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    rows = conn.execute(text(prefix + sql)).fetchall()
+    # SQLite returns (id, parent, notused, detail); Postgres a single text column
+    return "\n".join(f"    {row[-1]}" for row in rows)
+
+
+def report(engine, project_id: int, label: str, repeat: int) -> None:
+    click.echo(click.style(f"\n== {label}", fg="cyan", bold=True))
+    with engine.connect() as conn:
+        for name, stmt in hot_queries(project_id):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(stmt).fetchall()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+            click.echo(f"{name}: {elapsed_ms:.2f} ms")
+            click.echo(explain(conn, stmt))
+
+
+@click.command()
+@click.option("--tasks", "task_count", default=1_000_000, show_default=True, help="Number of tasks to seed")
+@click.option("--tasks-per-project", default=1000, show_default=True)
+@click.option("--url", default=None, help="Scratch database URL (default: temporary SQLite file)")
+@click.option("--repeat", default=5, show_default=True, help="Runs per query when timing")
+@click.option("--seed", "seed_value", default=42, show_default=True)
+def main(task_count, tasks_per_project, url, repeat, seed_value):
+    tmp_dir = None
+    if url is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmp_dir.name, 'bench.db')}"
+
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for index in Task.__table__.indexes:
+            index.drop(conn)
+
+    click.echo(f"Seeding {task_count} tasks...")
+    started = time.perf_counter()
+    project_id = seed(engine, task_count, tasks_per_project, seed_value)
+    click.echo(f"Seeded in {time.perf_counter() - started:.1f} s")
+
+    report(engine, project_id, "Without indexes", repeat)
+
+    with engine.begin() as conn:
+        for index in Task.__table__.indexes:
+            index.create(conn)
+        conn.execute(text("ANALYZE"))
+
+    report(engine, project_id, "With indexes", repeat)
+
+    engine.dispose()
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -48,15 +48,96 @@ def menu():
 
 
 @cli.command("scheduler")
-def scheduler():
+@click.option(
+    "--mode",
+    type=click.Choice(["interval", "deadline"]),
+    default=None,
+    help="Poll every AUTOCLOSE_INTERVAL_MINUTES or wake at the next deadline (default: SCHEDULER_MODE or interval)"
+)
+def scheduler(mode):
     from app.commands.scheduler import start_scheduler
-    start_scheduler()
+    start_scheduler(mode)
 
 
 @cli.command("close-overdue")
-def close_overdue():
+@click.option("--verbose", is_flag=True, help="Print every closed task")
+@click.option("--batch-size", type=int, default=None, help="Tasks closed per transaction")
+@click.option("--max-runtime", type=float, default=None, help="Stop after this many seconds")
+@click.option("--sleep", "sleep_between", type=float, default=0.0, help="Seconds to sleep between batches")
+def close_overdue(verbose, batch_size, max_runtime, sleep_between):
     from app.commands.autoclose_overdue import autoclose_overdue_tasks
-    autoclose_overdue_tasks()
+    autoclose_overdue_tasks(
+        verbose=verbose,
+        batch_size=batch_size,
+        max_runtime=max_runtime,
+        sleep_between=sleep_between
+    )
+
+
+@cli.command("seed")
+@click.option("--projects", type=int, required=True, help="Number of projects to create")
+@click.option("--tasks-per-project", type=int, required=True, help="Number of tasks per project")
+@click.option("--seed", "seed_value", type=int, default=0, show_default=True, help="Random seed")
+@click.option("--ignore-limits", is_flag=True, help="Bypass MAX_NUMBER_OF_PROJECTS and MAX_NUMBER_OF_TASKS")
+@click.option("--name-prefix", default="seed", show_default=True, help="Projects are named <prefix>-<n>")
+@click.option("--chunk-size", type=int, default=50_000, show_default=True, help="Tasks per transaction")
+@click.option("--as-of", type=click.DateTime(), default=None, help="Reference time for generated dates (default: now)")
+def seed(projects, tasks_per_project, seed_value, ignore_limits, name_prefix, chunk_size, as_of):
+    import time
+    from app.commands.seed import seed_database
+    started = time.monotonic()
+    project_count, task_count = seed_database(
+        projects=projects,
+        tasks_per_project=tasks_per_project,
+        seed=seed_value,
+        ignore_limits=ignore_limits,
+        name_prefix=name_prefix,
+        chunk_size=chunk_size,
+        now=as_of
+    )
+    click.echo(f"Seeded {project_count} projects and {task_count} tasks in {time.monotonic() - started:.1f} s")
+
+
+@cli.command("storage-stats")
+@click.option("--dir", "directory", default=None, help="Storage directory (default: MEMORY_STORAGE_DIR)")
+def storage_stats(directory):
+    from app.commands.storage_stats import storage_stats
+    storage_stats(directory)
+
+
+@cli.command("export")
+@click.option("--output", "-o", required=True, help="File to write")
+@click.option("--updated-since", type=click.DateTime(), default=None, help="Only rows changed at or after this time")
+@click.option(
+    "--compression",
+    type=click.Choice(["none", "gzip", "zstd"]),
+    default="none",
+    show_default=True,
+    help="Compress the output (zstd needs the zstandard package)"
+)
+@click.option("--batch-size", type=int, default=1000, show_default=True, help="Rows fetched per round trip")
+def export(output, updated_since, compression, batch_size):
+    from app.commands.export import export_data
+    export_data(output=output, updated_since=updated_since, compression=compression, batch_size=batch_size)
+
+
+@cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "format", type=click.Choice(["ndjson", "csv"]), default=None, help="Default: from the file name")
+@click.option("--rejected", "rejected_path", default=None, help="Write rejected rows and the reasons to this NDJSON file")
+@click.option("--batch-size", type=int, default=5000, show_default=True, help="Records validated and committed together")
+@click.option("--ignore-limits", is_flag=True, help="Bypass MAX_NUMBER_OF_PROJECTS and MAX_NUMBER_OF_TASKS")
+def import_(path, format, rejected_path, batch_size, ignore_limits):
+    from app.commands.import_data import import_file
+    import_file(path, format=format, rejected_path=rejected_path, batch_size=batch_size, ignore_limits=ignore_limits)
+
+
+@cli.command("purge-projects")
+@click.option("--batch-size", type=int, default=None, help="Tasks deleted per transaction (default: PROJECT_PURGE_BATCH_SIZE)")
+@click.option("--pause", type=float, default=0.0, show_default=True, help="Seconds to pause between batches")
+def purge_projects(batch_size, pause):
+    from app.commands.purge_projects import purge_pending_projects
+    purge_pending_projects(batch_size=batch_size, pause=pause)
 
 
 @cli.command("init-db")
@@ -0,0 +1,50 @@
+"""The API on a throwaway SQLite database, emptied before each test that uses it."""
+
+import os
+import tempfile
+
+# app.db.session and api.app read these at import, so they are set before anything imports them
+_database_dir = tempfile.mkdtemp(prefix="todolist-tests-")
+os.environ["STORAGE_BACKEND"] = "sql"
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_database_dir, "todolist.db")
+os.environ["DATABASE_REPLICA_URLS"] = ""
+# Hidden projects keep their task rows; the tests purge explicitly when they need to
+os.environ["PROJECT_PURGE_IN_API"] = "false"
+os.environ["DEADLINE_SCHEDULER_IN_API"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+from app.cache import entity_cache
+from app.db.base import Base
+from app.db.session import db_session
+from main import app
+
+
+@pytest.fixture
+def database():
+    """The application's database session factory, with every table empty"""
+    db_session.create_tables()
+    with db_session.unit_of_work() as session:
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+    if entity_cache is not None:
+        entity_cache.clear()
+    # Seeds the project counter again
+    db_session.create_tables()
+    return db_session
+
+
+@pytest.fixture
+def client(database):
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def project(client):
+    """Create a project through the API, returning its id"""
+    def create(name: str = "project") -> int:
+        response = client.post("/api/projects", json={"name": name, "description": "d"})
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+    return create
@@ -0,0 +1,124 @@
+"""ETags of a task and of a project's task list, and the 304s they allow."""
+
+import json
+import pytest
+
+
+@pytest.fixture
+def tasks(client, project):
+    """A project with five tasks: ``(project_id, [task ids])``"""
+    project_id = project("project")
+    ids = []
+    for number in range(5):
+        response = client.post("/api/tasks", json={"project_id": project_id, "title": f"t{number}", "description": "d"})
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    return project_id, ids
+
+
+def first_page(client, project_id: int, etag: str = None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get(f"/api/projects/{project_id}/tasks", params={"limit": 2}, headers=headers)
+
+
+def assert_not_modified(response, etag: str) -> None:
+    assert response.status_code == 304, response.text
+    assert response.headers["etag"] == etag
+    assert not response.content
+
+
+@pytest.mark.parametrize("change", [
+    "patch status", "put", "batch status", "filter status", "create", "delete", "batch create", "import",
+])
+def test_any_change_in_the_project_changes_the_list_etag(client, tasks, change):
+    project_id, ids = tasks
+    etag = first_page(client, project_id).headers["etag"]
+    assert_not_modified(first_page(client, project_id, etag), etag)
+    # The last task is not on the first page
+    last = ids[-1]
+
+    if change == "patch status":
+        response = client.patch(f"/api/tasks/{last}/status", json={"status": "doing"})
+    elif change == "put":
+        response = client.put(f"/api/tasks/{last}", json={"title": "renamed", "description": "d", "status": "todo"})
+    elif change == "batch status":
+        response = client.patch("/api/tasks/status:batch", json={"items": [{"id": last, "status": "done"}]})
+    elif change == "filter status":
+        response = client.patch("/api/tasks/status:batch", json={"filter": {"project_id": project_id}, "status": "doing"})
+    elif change == "create":
+        response = client.post("/api/tasks", json={"project_id": project_id, "title": "new", "description": "d"})
+    elif change == "delete":
+        response = client.delete(f"/api/tasks/{last}")
+    elif change == "batch create":
+        response = client.post("/api/tasks:batch", json={"items": [{"project_id": project_id, "title": "new", "description": "d"}]})
+    else:
+        line = json.dumps({"type": "task", "project": "project", "title": "imported", "description": "d", "created_at": "2000-01-01T00:00:00"})
+        response = client.post("/api/import", content=line, params={"format": "ndjson"})
+    assert response.status_code < 300, response.text
+
+    response = first_page(client, project_id, etag)
+    assert response.status_code == 200, response.text
+    assert response.headers["etag"] != etag
+    assert_not_modified(first_page(client, project_id, response.headers["etag"]), response.headers["etag"])
+
+
+def test_changes_elsewhere_keep_the_list_etag(client, project, tasks):
+    project_id, _ = tasks
+    other_id = project("other")
+    etag = first_page(client, project_id).headers["etag"]
+
+    assert client.post("/api/tasks", json={"project_id": other_id, "title": "elsewhere", "description": "d"}).status_code == 201
+    assert client.put(f"/api/projects/{project_id}", json={"name": "project", "description": "changed"}).status_code == 200
+
+    assert_not_modified(first_page(client, project_id, etag), etag)
+
+
+def test_each_page_and_fieldset_has_its_own_etag(client, tasks):
+    project_id, _ = tasks
+    url = f"/api/projects/{project_id}/tasks"
+    first = client.get(url, params={"limit": 2})
+    etags = {
+        first.headers["etag"],
+        client.get(url, params={"limit": 3}).headers["etag"],
+        client.get(url, params={"limit": 2, "cursor": first.json()["next_cursor"]}).headers["etag"],
+        client.get(url, params={"limit": 2, "fields": "id,title"}).headers["etag"],
+    }
+    assert len(etags) == 4
+    assert client.get(url, params={"limit": 3}, headers={"If-None-Match": first.headers["etag"]}).status_code == 200
+
+
+def test_if_none_match_accepts_weak_and_listed_etags(client, tasks):
+    project_id, ids = tasks
+    etag = first_page(client, project_id).headers["etag"]
+    assert_not_modified(first_page(client, project_id, f'"other", W/{etag}'), etag)
+    assert_not_modified(first_page(client, project_id, "*"), etag)
+
+    task_etag = client.get(f"/api/tasks/{ids[0]}").headers["etag"]
+    response = client.get(f"/api/tasks/{ids[0]}", headers={"If-None-Match": f"W/{task_etag}"})
+    assert_not_modified(response, task_etag)
+
+
+def test_task_etag_changes_with_the_task(client, tasks):
+    _, ids = tasks
+    etag = client.get(f"/api/tasks/{ids[0]}").headers["etag"]
+    assert_not_modified(client.get(f"/api/tasks/{ids[0]}", headers={"If-None-Match": etag}), etag)
+
+    assert client.patch(f"/api/tasks/{ids[0]}/status", json={"status": "done"}).status_code == 200
+
+    response = client.get(f"/api/tasks/{ids[0]}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["status"] == "done"
+
+
+def test_tasks_of_a_hidden_project_are_not_found_instead_of_not_modified(client, tasks):
+    project_id, ids = tasks
+    list_etag = first_page(client, project_id).headers["etag"]
+    task_etag = client.get(f"/api/tasks/{ids[0]}").headers["etag"]
+
+    assert client.delete(f"/api/projects/{project_id}", params={"background": "true"}).status_code == 202
+
+    assert first_page(client, project_id, list_etag).status_code == 404
+    assert first_page(client, project_id, "*").status_code == 404
+    assert client.get(f"/api/tasks/{ids[0]}", headers={"If-None-Match": task_etag}).status_code == 404
+    assert client.get(f"/api/tasks/{ids[0]}", headers={"If-None-Match": "*"}).status_code == 404
@@ -0,0 +1,112 @@
+"""Bulk imports through the API; on SQLite the tasks go in with one executemany."""
+
+import json
+from datetime import datetime
+
+
+def post_import(client, body: str, format: str) -> dict:
+    response = client.post("/api/import", content=body, params={"format": format})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def project_ids(client) -> dict:
+    return {project["name"]: project["id"] for project in client.get("/api/projects").json()["items"]}
+
+
+def tasks_of(client, project_id: int) -> list:
+    return client.get(f"/api/projects/{project_id}/tasks").json()["items"]
+
+
+def rejections(body: dict) -> list:
+    return [(row["line"], row["error"]) for row in body["rejected_rows"]]
+
+
+def test_ndjson_import_commits_the_valid_records(client, project):
+    existing = project("existing")
+    started = datetime.now()
+    records = [
+        {"type": "project", "id": 10, "name": "alpha", "description": "d"},
+        {"type": "task", "project_id": 10, "title": "by id", "description": "d", "created_at": "2024-01-02T03:04:05"},
+        {"type": "task", "project": "alpha", "title": "by name", "description": "d", "status": "done", "closed_at": "2024-02-01T00:00:00"},
+        "{not json",
+        "",
+        {"type": "task", "project": "nope", "title": "t", "description": "d"},
+        {"type": "task", "project_id": 99, "title": "t", "description": "d"},
+        {"type": "task", "project": "alpha", "title": "t", "description": "d", "status": "closed"},
+        {"type": "project", "id": 11, "name": "alpha", "description": "again"},
+        {"type": "task", "project_id": 11, "title": "t", "description": "d"},
+        {"type": "task", "project": "existing", "project_id": 10, "title": "name wins", "description": "d"},
+        [1, 2],
+        {"type": "note"},
+        {"type": "task", "project_id": "b", "title": "by string id", "description": "d"},
+        {"type": "project", "id": "b", "name": "beta", "description": "d"},
+    ]
+    lines = [record if isinstance(record, str) else json.dumps(record) for record in records]
+
+    body = post_import(client, "\n".join(lines), "ndjson")
+
+    assert (body["projects"], body["tasks"], body["rejected"]) == (2, 4, 8)
+    assert [line for line, _ in rejections(body)] == [4, 6, 7, 8, 9, 10, 12, 13]
+    errors = dict(rejections(body))
+    assert errors[4].startswith("Invalid JSON")
+    assert errors[6] == "Project 'nope' not found"
+    assert "No imported project has id 99" in errors[7]
+    assert errors[8].startswith("Status must be one of")
+    assert errors[9] == "Project with name 'alpha' already exists"
+    # The source id of a rejected project leads nowhere
+    assert "No imported project has id 11" in errors[10]
+    assert errors[12] == "Expected a JSON object"
+    assert errors[13] == "type must be 'project' or 'task'"
+    assert body["rejected_rows"][0]["record"] == "{not json"
+
+    ids = project_ids(client)
+    alpha = {task["title"]: task for task in tasks_of(client, ids["alpha"])}
+    assert sorted(alpha) == ["by id", "by name"]
+    assert alpha["by id"]["created_at"] == "2024-01-02T03:04:05"
+    assert datetime.fromisoformat(alpha["by id"]["updated_at"]) >= started
+    assert alpha["by name"]["status"] == "done"
+    assert alpha["by name"]["closed_at"] == "2024-02-01T00:00:00"
+    assert [task["title"] for task in tasks_of(client, existing)] == ["name wins"]
+    # A project's tasks may come before it within a batch
+    assert [task["title"] for task in tasks_of(client, ids["beta"])] == ["by string id"]
+
+
+def test_csv_import_reports_the_lines_rows_start_on(client):
+    body = "\n".join([
+        "type,id,name,description,project,project_id,title,status,deadline",
+        "project,7,gamma,d,,,,,",
+        "task,,,d,,7,by id,,",
+        'task,,,"two',
+        'lines",gamma,,by name,doing,2099-01-01T00:00:00',
+        "task,,,d,gamma,,,,",
+        "task,,,d,gamma,,late,todo,2000-01-01T00:00:00",
+        "task,,,d,gamma,,bad deadline,todo,tomorrow",
+        "task,,,d,,8,unknown id,,",
+    ])
+
+    result = post_import(client, body, "csv")
+
+    assert (result["projects"], result["tasks"], result["rejected"]) == (1, 2, 4)
+    assert rejections(result) == [
+        (6, "Task title cannot be empty"),
+        (7, "Deadline cannot be in the past"),
+        (8, "deadline must be an ISO 8601 date and time"),
+        (9, "No imported project has id 8 (projects must come before their tasks)"),
+    ]
+    tasks = {task["title"]: task for task in tasks_of(client, project_ids(client)["gamma"])}
+    assert sorted(tasks) == ["by id", "by name"]
+    assert tasks["by name"]["description"] == "two\nlines"
+    assert tasks["by name"]["status"] == "doing" and tasks["by name"]["closed_at"] is None
+    assert tasks["by name"]["deadline"] == "2099-01-01T00:00:00"
+
+
+def test_import_counts_against_the_limits(client, project, monkeypatch):
+    monkeypatch.setenv("MAX_NUMBER_OF_TASKS", "2")
+    project("existing")
+    lines = [json.dumps({"type": "task", "project": "existing", "title": f"t{number}", "description": "d"}) for number in range(3)]
+
+    body = post_import(client, "\n".join(lines), "ndjson")
+
+    assert (body["tasks"], body["rejected"]) == (2, 1)
+    assert rejections(body) == [(3, "Cannot exceed maximum of 2 tasks per project")]
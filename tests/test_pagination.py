@@ -0,0 +1,103 @@
+"""Keyset pages of the project and task lists."""
+
+import base64
+import json
+from datetime import datetime
+import pytest
+from sqlalchemy import update
+from api.pagination import MAX_PAGE_SIZE, encode_cursor
+from app.models.project import Project
+
+CREATED_AT = "2024-05-01T12:00:00"
+
+
+def walk(client, url: str, limit: int, **params) -> list:
+    """Every page of ``url``, following next_cursor to the end"""
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={"limit": limit, **params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        pages.append(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+        assert len(pages) <= 100, "the cursor does not advance"
+
+
+def raw_cursor(payload: str) -> str:
+    """A cursor encoding the JSON text ``payload``"""
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def test_project_pages_cover_projects_created_at_the_same_time(client, project, database):
+    ids = [project(f"project-{number}") for number in range(7)]
+    with database.unit_of_work() as session:
+        session.execute(update(Project).values(created_at=datetime.fromisoformat(CREATED_AT)))
+
+    pages = walk(client, "/api/projects", 3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [item["id"] for page in pages for item in page] == ids
+
+
+def test_task_pages_cover_tasks_created_at_the_same_time(client, project):
+    project_id = project("project")
+    lines = [json.dumps({"type": "task", "project": "project", "title": f"t{number}", "description": "d", "created_at": CREATED_AT})
+             for number in range(8)]
+    assert client.post("/api/import", content="\n".join(lines), params={"format": "ndjson"}).json()["tasks"] == 8
+
+    pages = walk(client, f"/api/projects/{project_id}/tasks", 3)
+    sparse_pages = walk(client, f"/api/projects/{project_id}/tasks", 3, fields="title")
+
+    assert [len(page) for page in pages] == [3, 3, 2]
+    tasks = [item for page in pages for item in page]
+    assert [task["title"] for task in tasks] == [f"t{number}" for number in range(8)]
+    assert all(task["created_at"] == CREATED_AT for task in tasks)
+    assert [task["id"] for task in tasks] == sorted(task["id"] for task in tasks)
+    assert [item for page in sparse_pages for item in page] == [{"title": task["title"]} for task in tasks]
+
+
+def test_exact_last_page_has_no_next_cursor(client, project):
+    for number in range(4):
+        project(f"project-{number}")
+
+    assert [len(page) for page in walk(client, "/api/projects", 2)] == [2, 2]
+    assert [len(page) for page in walk(client, "/api/projects", 4)] == [4]
+
+
+@pytest.mark.parametrize("limit, status_code", [(0, 422), (-1, 422), (1, 200), (MAX_PAGE_SIZE, 200), (MAX_PAGE_SIZE + 1, 422)])
+def test_limit_bounds(client, project, limit, status_code):
+    project_id = project()
+
+    assert client.get("/api/projects", params={"limit": limit}).status_code == status_code
+    assert client.get(f"/api/projects/{project_id}/tasks", params={"limit": limit}).status_code == status_code
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    raw_cursor("{"),
+    raw_cursor(f'"{CREATED_AT}"'),
+    raw_cursor(f'["{CREATED_AT}"]'),
+    raw_cursor('["yesterday", 1]'),
+    raw_cursor(f'["{CREATED_AT}", "one"]'),
+    raw_cursor(f'["{CREATED_AT}", [1]]'),
+    raw_cursor(f'["{CREATED_AT}", 1e400]'),
+    raw_cursor(f'["{CREATED_AT}", {10 ** 30}]'),
+])
+def test_malformed_cursor_is_a_bad_request(client, project, cursor):
+    project_id = project()
+
+    for url in ("/api/projects", f"/api/projects/{project_id}/tasks"):
+        response = client.get(url, params={"cursor": cursor})
+        assert response.status_code == 400, response.text
+        assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+def test_cursor_round_trips(client, project):
+    first, second = project("first"), project("second")
+    created_at = datetime.fromisoformat(client.get(f"/api/projects/{first}").json()["created_at"])
+
+    response = client.get("/api/projects", params={"cursor": encode_cursor(created_at, first)})
+
+    assert [item["id"] for item in response.json()["items"]] == [second]
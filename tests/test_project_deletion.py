@@ -0,0 +1,52 @@
+"""Deleting projects, at once or by hiding them for the background purge."""
+
+import json
+from sqlalchemy import func, select
+from app.models.task import Task
+
+
+def import_tasks(client, project_name: str, count: int) -> None:
+    lines = [json.dumps({"type": "task", "project": project_name, "title": f"t{number}", "description": "d"})
+             for number in range(count)]
+    response = client.post("/api/import", content="\n".join(lines), params={"format": "ndjson"})
+    assert response.status_code == 200, response.text
+    assert response.json()["tasks"] == count
+
+
+def task_rows(database, project_id: int) -> int:
+    with database.unit_of_work() as session:
+        return session.scalar(select(func.count()).select_from(Task).where(Task.project_id == project_id))
+
+
+def test_project_over_default_threshold_is_deleted_in_background(client, project, database, monkeypatch):
+    monkeypatch.delenv("PROJECT_DELETE_BACKGROUND_MIN_TASKS", raising=False)
+    monkeypatch.delenv("MAX_NUMBER_OF_TASKS", raising=False)
+    project_id = project("big")
+    # Default threshold: half of the default 1000 task limit
+    import_tasks(client, "big", 501)
+    task_id = client.get(f"/api/projects/{project_id}/tasks", params={"limit": 1}).json()["items"][0]["id"]
+
+    response = client.delete(f"/api/projects/{project_id}")
+
+    assert response.status_code == 202, response.text
+    assert response.headers["location"] == f"/api/projects/{project_id}/deletion"
+    assert response.json()["tasks_total"] == 501
+    # The rows wait for the purge, but nothing reaches them any more
+    assert task_rows(database, project_id) == 501
+    assert client.get(f"/api/projects/{project_id}").status_code == 404
+    assert client.get(f"/api/projects/{project_id}/tasks").status_code == 404
+    assert client.get(f"/api/tasks/{task_id}").status_code == 404
+    assert client.patch(f"/api/tasks/{task_id}/status", json={"status": "done"}).status_code == 404
+
+
+def test_project_at_threshold_is_deleted_at_once(client, project, database, monkeypatch):
+    monkeypatch.setenv("MAX_NUMBER_OF_TASKS", "20")
+    monkeypatch.delenv("PROJECT_DELETE_BACKGROUND_MIN_TASKS", raising=False)
+    project_id = project("small")
+    import_tasks(client, "small", 10)
+
+    response = client.delete(f"/api/projects/{project_id}")
+
+    assert response.status_code == 200, response.text
+    assert task_rows(database, project_id) == 0
+    assert client.get(f"/api/projects/{project_id}/deletion").status_code == 404
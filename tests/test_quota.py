@@ -0,0 +1,87 @@
+"""Project and task limits under concurrent creates on SQLite."""
+
+import threading
+import pytest
+from sqlalchemy import func, select
+from app.exceptions.service_exceptions import ValidationError
+from app.models.project import Project
+from app.models.quota_counter import QuotaCounter
+from app.models.task import Task
+from app.repositories.project_repository import ProjectRepository
+from app.services.project_service import ProjectService
+from app.services.task_service import TaskService
+
+
+def race(database, create, sessions: int = 2) -> list:
+    """Run ``create(session, number)`` in a unit of work per thread, all started together.
+
+    Returns each thread's outcome: what ``create`` returned or the exception it raised.
+    """
+    barrier = threading.Barrier(sessions)
+    outcomes = [None] * sessions
+
+    def run(number: int) -> None:
+        barrier.wait()
+        try:
+            with database.unit_of_work() as session:
+                outcomes[number] = create(session, number)
+        except Exception as error:
+            outcomes[number] = error
+
+    threads = [threading.Thread(target=run, args=(number,)) for number in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def count(database, model, *criteria) -> int:
+    with database.unit_of_work() as session:
+        return session.scalar(select(func.count()).select_from(model).where(*criteria))
+
+
+def test_project_limit_holds_across_sessions(database, monkeypatch):
+    monkeypatch.setenv("MAX_NUMBER_OF_PROJECTS", "3")
+    with database.unit_of_work() as session:
+        for number in range(2):
+            ProjectService(session).create_project(f"existing-{number}", "d")
+
+    outcomes = race(database, lambda session, number: ProjectService(session).create_project(f"racer-{number}", "d").id, 4)
+
+    assert sum(isinstance(outcome, int) for outcome in outcomes) == 1
+    assert all(isinstance(outcome, (int, ValidationError)) for outcome in outcomes), outcomes
+    assert count(database, Project) == 3
+    with database.unit_of_work() as session:
+        assert session.scalars(select(QuotaCounter)).one().value == 3
+
+
+def test_task_limit_holds_across_sessions(database, monkeypatch):
+    monkeypatch.setenv("MAX_NUMBER_OF_TASKS", "3")
+    with database.unit_of_work() as session:
+        project_id = ProjectService(session).create_project("project", "d").id
+        for number in range(2):
+            TaskService(session).create_task(project_id, f"existing-{number}", "d")
+
+    outcomes = race(database, lambda session, number: TaskService(session).create_task(project_id, f"racer-{number}", "d").id, 4)
+
+    assert sum(isinstance(outcome, int) for outcome in outcomes) == 1
+    assert all(isinstance(outcome, (int, ValidationError)) for outcome in outcomes), outcomes
+    assert count(database, Task, Task.project_id == project_id) == 3
+    with database.unit_of_work() as session:
+        assert session.get(Project, project_id).task_count == 3
+
+
+@pytest.mark.parametrize("sessions", [2, 4])
+def test_counter_row_is_seeded_once(database, sessions):
+    with database.unit_of_work() as session:
+        session.add_all([Project(name="a", description="d"), Project(name="b", description="d")])
+        session.execute(QuotaCounter.__table__.delete())
+
+    outcomes = race(database, lambda session, number: ProjectRepository(session).count_for_update(), sessions)
+
+    assert outcomes == [2] * sessions
+    with database.unit_of_work() as session:
+        assert [(counter.name, counter.value) for counter in session.scalars(select(QuotaCounter))] == [
+            (QuotaCounter.PROJECTS, 2)
+        ]
@@ -0,0 +1,57 @@
+"""Creating tasks in batches: per-item results, with the valid items committed."""
+
+
+def titles(client, project_id: int) -> list:
+    response = client.get(f"/api/projects/{project_id}/tasks")
+    assert response.status_code == 200, response.text
+    return [task["title"] for task in response.json()["items"]]
+
+
+def test_mixed_batch_commits_the_valid_items(client, project, monkeypatch):
+    monkeypatch.setenv("MAX_NUMBER_OF_TASKS", "3")
+    project_id = project()
+    assert client.post("/api/tasks", json={"project_id": project_id, "title": "existing", "description": "d"}).status_code == 201
+
+    response = client.post("/api/tasks:batch", json={"items": [
+        {"project_id": project_id, "title": "first", "description": "d"},
+        {"project_id": 9999, "title": "orphan", "description": "d"},
+        {"project_id": project_id, "title": "late", "description": "d", "deadline": "2000-01-01T10:00:00"},
+        {"project_id": project_id, "title": "second", "description": "d", "deadline": "2099-01-01T10:00:00"},
+        {"project_id": project_id, "title": "over quota", "description": "d"},
+    ]})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 3)
+    results = body["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert [result["status_code"] for result in results] == [201, 404, 400, 201, 400]
+    assert "9999" in results[1]["error"]
+    assert "maximum of 3 tasks" in results[4]["error"]
+    assert all(result["task"] is None for result in results if result["error"] is not None)
+    created = [results[0]["task"], results[3]["task"]]
+    assert [task["title"] for task in created] == ["first", "second"]
+    assert created[1]["deadline"] == "2099-01-01T10:00:00"
+    assert all(task["project_id"] == project_id and task["status"] == "todo" for task in created)
+
+    assert titles(client, project_id) == ["existing", "first", "second"]
+    for task in created:
+        assert client.get(f"/api/tasks/{task['id']}").json() == task
+
+
+def test_batch_of_rejected_items_creates_nothing(client, project, monkeypatch):
+    monkeypatch.setenv("MAX_NUMBER_OF_TASKS", "1")
+    project_id = project()
+
+    response = client.post("/api/tasks:batch", json={"items": [
+        {"project_id": 9999, "title": "orphan", "description": "d"},
+        {"project_id": project_id, "title": "   ", "description": "d"},
+    ]})
+
+    assert response.status_code == 200, response.text
+    assert [result["status_code"] for result in response.json()["results"]] == [404, 400]
+    assert titles(client, project_id) == []
+    # The rejected item did not use up the project's only slot
+    response = client.post("/api/tasks:batch", json={"items": [{"project_id": project_id, "title": "t", "description": "d"}]})
+    assert response.json()["succeeded"] == 1
+    assert titles(client, project_id) == ["t"]
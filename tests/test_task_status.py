@@ -0,0 +1,116 @@
+"""Status changes of single tasks and batches, and the closed_at they keep in step."""
+
+import pytest
+from app.db.session import db_session
+
+
+@pytest.fixture(params=["returning", "select"])
+def update_returning(request, monkeypatch):
+    """Run the test with UPDATE ... RETURNING, and again with the select-then-update fallback"""
+    if request.param == "select":
+        engines = [db_session.engine] + ([db_session.async_engine.sync_engine] if db_session.async_engine else [])
+        for engine in engines:
+            monkeypatch.setattr(engine.dialect, "update_returning", False)
+    return request.param
+
+
+@pytest.fixture
+def task(client):
+    """Create a task through the API, returning it"""
+    def create(project_id: int, title: str) -> dict:
+        response = client.post("/api/tasks", json={"project_id": project_id, "title": title, "description": "d"})
+        assert response.status_code == 201, response.text
+        return response.json()
+    return create
+
+
+def get_task(client, task_id: int) -> dict:
+    response = client.get(f"/api/tasks/{task_id}")
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_batch_applies_the_last_status_of_each_task(client, project, task, update_returning):
+    project_id = project()
+    first, second, third = (task(project_id, title)["id"] for title in ("first", "second", "third"))
+
+    response = client.patch("/api/tasks/status:batch", json={"items": [
+        {"id": first, "status": "done"},
+        {"id": second, "status": "doing"},
+        {"id": first, "status": "todo"},
+        {"id": 9999, "status": "done"},
+        {"id": third, "status": "DONE"},
+        {"id": second, "status": "closed"},
+    ]})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (4, 2)
+    results = body["results"]
+    assert [result["status_code"] for result in results] == [200, 200, 200, 404, 200, 400]
+    assert "9999" in results[3]["error"]
+    # Both changes of the first task report where it ended up
+    assert results[0]["task"]["status"] == results[2]["task"]["status"] == "todo"
+    assert results[0]["task"]["closed_at"] is None
+    assert results[4]["task"]["status"] == "done" and results[4]["task"]["closed_at"] is not None
+
+    assert get_task(client, first)["status"] == "todo"
+    assert get_task(client, second)["status"] == "doing"
+    done = get_task(client, third)
+    assert done["status"] == "done" and done["closed_at"] is not None
+
+
+def test_batch_keeps_closed_at_in_step_with_the_status(client, project, task, update_returning):
+    project_id = project()
+    task_id = task(project_id, "task")["id"]
+
+    closed_at = client.patch("/api/tasks/status:batch", json={"items": [{"id": task_id, "status": "done"}]}).json()["results"][0]["task"]["closed_at"]
+    assert closed_at is not None
+    # Marking a closed task done again keeps when it was closed
+    again = client.patch("/api/tasks/status:batch", json={"items": [{"id": task_id, "status": "done"}]}).json()["results"][0]["task"]
+    assert again["closed_at"] == closed_at
+
+    reopened = client.patch("/api/tasks/status:batch", json={"items": [{"id": task_id, "status": "doing"}]}).json()["results"][0]["task"]
+    assert reopened["status"] == "doing" and reopened["closed_at"] is None
+    assert get_task(client, task_id)["closed_at"] is None
+
+
+def test_filter_moves_the_matching_tasks_of_one_project(client, project, task, update_returning):
+    project_id, other_id = project("project"), project("other")
+    todo, doing = task(project_id, "todo")["id"], task(project_id, "doing")["id"]
+    other = task(other_id, "other")["id"]
+    client.patch(f"/api/tasks/{doing}/status", json={"status": "doing"})
+
+    response = client.patch("/api/tasks/status:batch", json={"filter": {"project_id": project_id, "status": "todo"}, "status": "done"})
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [(result["task"]["id"], result["task"]["status"]) for result in results] == [(todo, "done")]
+    assert results[0]["task"]["closed_at"] is not None
+    assert get_task(client, doing)["status"] == "doing"
+    assert get_task(client, other)["status"] == "todo"
+
+
+def test_filter_needs_an_existing_project(client, project, update_returning):
+    response = client.patch("/api/tasks/status:batch", json={"filter": {"project_id": 9999}, "status": "done"})
+    assert response.status_code == 404, response.text
+
+    response = client.patch("/api/tasks/status:batch", json={"filter": {"status": "todo"}, "status": "done"})
+    assert response.status_code == 422, response.text
+
+
+def test_single_updates_keep_closed_at_in_step_with_the_status(client, project, task):
+    project_id = project()
+    task_id = task(project_id, "task")["id"]
+
+    closed = client.patch(f"/api/tasks/{task_id}/status", json={"status": "done"}).json()
+    assert closed["status"] == "done" and closed["closed_at"] is not None
+    assert client.patch(f"/api/tasks/{task_id}/status", json={"status": "done"}).json()["closed_at"] == closed["closed_at"]
+
+    edited = client.put(f"/api/tasks/{task_id}", json={"title": "renamed", "description": "d", "status": "done"}).json()
+    assert edited["title"] == "renamed" and edited["closed_at"] == closed["closed_at"]
+
+    reopened = client.put(f"/api/tasks/{task_id}", json={"title": "renamed", "description": "d", "status": "todo"}).json()
+    assert reopened["status"] == "todo" and reopened["closed_at"] is None
+    assert client.patch(f"/api/tasks/{task_id}/status", json={"status": "doing"}).json()["closed_at"] is None
+    assert get_task(client, task_id)["closed_at"] is None